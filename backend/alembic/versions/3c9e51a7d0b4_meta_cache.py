@@ -0,0 +1,36 @@
+"""meta synthesis cache
+
+Revision ID: 3c9e51a7d0b4
+Revises: 8447eb7a3a22
+Create Date: 2026-10-17 14:02:37.519204
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e51a7d0b4'
+down_revision: str | None = '8447eb7a3a22'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'meta_cache',
+        sa.Column('key', sa.String(), primary_key=True),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('comments', sa.JSON(), nullable=False),
+        sa.Column('verdict', sa.String(), nullable=False),
+        sa.Column('confidence', sa.Float(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('last_used_at', sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('meta_cache')
@@ -0,0 +1,40 @@
+"""secondary indexes for hot queries
+
+Revision ID: 6e2f0b8c4a17
+Revises: 3c9e51a7d0b4
+Create Date: 2026-10-17 15:40:12.802115
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2f0b8c4a17'
+down_revision: str | None = '3c9e51a7d0b4'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEXES = (
+    ('ix_documents_archived_created', 'documents', ['is_archived', 'created_at']),
+    ('ix_review_jobs_created', 'review_jobs', ['created_at']),
+    ('ix_review_jobs_status', 'review_jobs', ['status']),
+    ('ix_reviews_document_created', 'reviews', ['document_id', 'created_at']),
+    ('ix_reviews_document_status_created', 'reviews', ['document_id', 'status', 'created_at']),
+    ('ix_reviews_job', 'reviews', ['job_id']),
+    ('ix_comments_review', 'comments', ['review_id']),
+    ('ix_meta_comments_review', 'meta_comments', ['review_id']),
+    ('ix_review_cache_last_used', 'review_cache', ['last_used_at']),
+    ('ix_review_cache_created', 'review_cache', ['created_at']),
+    ('ix_meta_cache_last_used', 'meta_cache', ['last_used_at']),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,30 @@
+"""review job token usage
+
+Revision ID: 8447eb7a3a22
+Revises: d172fbb5c1e4
+Create Date: 2026-10-17 11:21:05.317402
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8447eb7a3a22'
+down_revision: str | None = 'd172fbb5c1e4'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+USAGE_COLUMNS = ('input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_write_tokens')
+
+
+def upgrade() -> None:
+    for name in USAGE_COLUMNS:
+        op.add_column('review_jobs', sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    for name in reversed(USAGE_COLUMNS):
+        op.drop_column('review_jobs', name)
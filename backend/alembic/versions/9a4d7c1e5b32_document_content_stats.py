@@ -0,0 +1,52 @@
+"""document content stats
+
+Revision ID: 9a4d7c1e5b32
+Revises: 6e2f0b8c4a17
+Create Date: 2026-10-17 16:21:48.330912
+
+"""
+import hashlib
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d7c1e5b32'
+down_revision: str | None = '6e2f0b8c4a17'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('content_length', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('documents', sa.Column('line_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('documents', sa.Column('content_hash', sa.String(), nullable=False, server_default=''))
+
+    # Backfill existing documents; new writes set the columns from the ORM
+    conn = op.get_bind()
+    documents = sa.table(
+        'documents',
+        sa.column('id', sa.String()),
+        sa.column('content', sa.Text()),
+        sa.column('content_length', sa.Integer()),
+        sa.column('line_count', sa.Integer()),
+        sa.column('content_hash', sa.String()),
+    )
+    for doc_id, content in conn.execute(sa.select(documents.c.id, documents.c.content)).all():
+        conn.execute(
+            documents.update()
+            .where(documents.c.id == doc_id)
+            .values(
+                content_length=len(content),
+                line_count=len(content.splitlines()),
+                content_hash=hashlib.sha256(content.encode('utf-8')).hexdigest(),
+            )
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'content_hash')
+    op.drop_column('documents', 'line_count')
+    op.drop_column('documents', 'content_length')
@@ -0,0 +1,35 @@
+"""review result cache
+
+Revision ID: b1494bb6de9e
+Revises: 4fdcf58f2e67
+Create Date: 2026-10-17 09:12:41.208113
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1494bb6de9e'
+down_revision: str | None = '4fdcf58f2e67'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'review_cache',
+        sa.Column('key', sa.String(), primary_key=True),
+        sa.Column('persona_id', sa.String(), nullable=False),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('comments', sa.JSON(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('last_used_at', sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('review_cache')
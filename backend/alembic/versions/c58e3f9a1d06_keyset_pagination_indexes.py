@@ -0,0 +1,37 @@
+"""keyset pagination indexes
+
+Revision ID: c58e3f9a1d06
+Revises: 9a4d7c1e5b32
+Create Date: 2026-10-17 16:58:03.114527
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e3f9a1d06'
+down_revision: str | None = '9a4d7c1e5b32'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Listing indexes gain id, the keyset tiebreaker: (name, table, old columns, new columns)
+WIDENED = (
+    ('ix_documents_archived_created', 'documents', ['is_archived', 'created_at'], ['is_archived', 'created_at', 'id']),
+    ('ix_review_jobs_created', 'review_jobs', ['created_at'], ['created_at', 'id']),
+    ('ix_reviews_document_created', 'reviews', ['document_id', 'created_at'], ['document_id', 'created_at', 'id']),
+)
+
+
+def upgrade() -> None:
+    for name, table, _, columns in WIDENED:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, columns)
+    op.create_index('ix_documents_created', 'documents', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_created', table_name='documents')
+    for name, table, columns, _ in reversed(WIDENED):
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, columns)
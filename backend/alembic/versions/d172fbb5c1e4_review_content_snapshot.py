@@ -0,0 +1,26 @@
+"""review content snapshot
+
+Revision ID: d172fbb5c1e4
+Revises: b1494bb6de9e
+Create Date: 2026-10-17 10:03:19.554870
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd172fbb5c1e4'
+down_revision: str | None = 'b1494bb6de9e'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column('reviews', sa.Column('content_snapshot', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('reviews', 'content_snapshot')
@@ -0,0 +1,69 @@
+"""full text search
+
+Revision ID: e4a81f6c2b90
+Revises: c58e3f9a1d06
+Create Date: 2026-10-17 18:12:40.207316
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a81f6c2b90'
+down_revision: str | None = 'c58e3f9a1d06'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Searched tables: (table, FTS5 columns on SQLite, to_tsvector() input on PostgreSQL)
+SEARCHED = (
+    ('documents', ('title', 'content'), "title || ' ' || content"),
+    ('comments', ('content',), 'content'),
+    ('meta_comments', ('content',), 'content'),
+)
+
+
+def _fts5(table: str, columns: tuple) -> list:
+    fts = f'{table}_fts'
+    cols = ', '.join(columns)
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {', '.join('new.' + c for c in columns)});"
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) "
+        f"VALUES ('delete', old.rowid, {', '.join('old.' + c for c in columns)});"
+    )
+    return [
+        (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{cols}, content='{table}', content_rowid='rowid', tokenize='porter unicode61')"
+        ),
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF {cols} ON {table} BEGIN {delete} {insert} END",
+        # Index the rows that are already there
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, columns, vector in SEARCHED:
+        if dialect == 'sqlite':
+            for statement in _fts5(table, columns):
+                op.execute(statement)
+        elif dialect == 'postgresql':
+            op.create_index(
+                f'ix_{table}_search', table, [sa.text(f"to_tsvector('english', {vector})")], postgresql_using='gin',
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, _, _ in reversed(SEARCHED):
+        if dialect == 'sqlite':
+            for trigger in ('insert', 'delete', 'update'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{trigger}')
+            op.execute(f'DROP TABLE IF EXISTS {table}_fts')
+        elif dialect == 'postgresql':
+            op.drop_index(f'ix_{table}_search', table_name=table)
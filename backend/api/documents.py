@@ -1,34 +1,54 @@
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, load_only, selectinload
 
-from database import get_db, DbDocument
+from api.pagination import DEFAULT_PAGE_SIZE, Page, page_rows, paginate
+from database import DbDocument, DbReview, get_db
+from services.db_writer import db_writer
 
 router = APIRouter()
 
 
-class DocumentOut(BaseModel):
+class DocumentSummary(BaseModel):
+    """A document without its body; the content itself is served by ``/{doc_id}/content``."""
     id: str
     title: str
-    description: Optional[str] = None
-    content: str
+    description: str | None = None
+    content_length: int = 0
+    line_count: int = 0
+    content_hash: str = ""
     is_archived: bool = False
     created_at: str
     updated_at: str
     review_count: int = 0
 
 
+# Columns behind each summary field; review_count is a subquery, not a column
+SUMMARY_COLUMNS = {
+    "title": DbDocument.title,
+    "description": DbDocument.description,
+    "content_length": DbDocument.content_length,
+    "line_count": DbDocument.line_count,
+    "content_hash": DbDocument.content_hash,
+    "is_archived": DbDocument.is_archived,
+    "created_at": DbDocument.created_at,
+    "updated_at": DbDocument.updated_at,
+}
+
+
 class DocumentCreate(BaseModel):
     title: str
     content: str
-    description: Optional[str] = None
+    description: str | None = None
 
 
-@router.post("/", response_model=DocumentOut)
-async def create_document(doc: DocumentCreate, db: Session = Depends(get_db)):
+@router.post("/", response_model=DocumentSummary)
+async def create_document(doc: DocumentCreate, db: AsyncSession = Depends(get_db)):
     doc_id = str(uuid.uuid4())[:8]
     now = datetime.utcnow()
     db_doc = DbDocument(
@@ -39,76 +59,145 @@ async def create_document(doc: DocumentCreate, db: Session = Depends(get_db)):
         created_at=now,
         updated_at=now,
     )
-    db.add(db_doc)
-    db.commit()
-    db.refresh(db_doc)
+    await db_writer.add(db_doc)
 
-    return _doc_out(db_doc)
+    return _doc_out(db_doc, review_count=0)
 
 
-def _doc_out(d: DbDocument) -> DocumentOut:
-    return DocumentOut(
+def _doc_out(d: DbDocument, review_count: int) -> DocumentSummary:
+    return DocumentSummary(
         id=d.id,
         title=d.title,
         description=d.description,
-        content=d.content,
+        content_length=d.content_length,
+        line_count=d.line_count,
+        content_hash=d.content_hash,
         is_archived=bool(d.is_archived),
         created_at=d.created_at.isoformat(),
         updated_at=d.updated_at.isoformat(),
-        review_count=len(d.reviews),
+        review_count=review_count,
     )
 
 
-@router.get("/", response_model=List[DocumentOut])
-async def list_documents(include_archived: bool = False, db: Session = Depends(get_db)):
-    query = db.query(DbDocument)
-    if not include_archived:
-        query = query.filter(DbDocument.is_archived == False)
-    docs = query.order_by(DbDocument.created_at.desc()).all()
-    return [_doc_out(d) for d in docs]
+def _partial_out(row, selected: set[str]) -> dict:
+    d = row.DbDocument
+    out = {}
+    for field in DocumentSummary.model_fields:
+        if field not in selected:
+            continue
+        value = row.review_count if field == "review_count" else getattr(d, field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        out[field] = bool(value) if field == "is_archived" else value
+    return out
+
+
+def _with_review_count():
+    """Documents plus their review count, counted in SQL (an index lookup, no review rows loaded)."""
+    review_count = (
+        select(func.count(DbReview.id))
+        .where(DbReview.document_id == DbDocument.id)
+        .correlate(DbDocument)
+        .scalar_subquery()
+    )
+    return select(DbDocument, review_count.label("review_count"))
 
 
-@router.get("/{doc_id}", response_model=DocumentOut)
-async def get_document(doc_id: str, db: Session = Depends(get_db)):
-    d = db.query(DbDocument).filter(DbDocument.id == doc_id).first()
-    if not d:
+async def _get_document(db: AsyncSession, doc_id: str) -> tuple[DbDocument, int]:
+    query = _with_review_count().options(defer(DbDocument.content, raiseload=True))
+    row = (await db.execute(query.where(DbDocument.id == doc_id))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Document not found")
-    return _doc_out(d)
+    return row.DbDocument, row.review_count
+
+
+def _parse_fields(fields: str | None) -> set[str] | None:
+    """``?fields=title,line_count`` -> the requested summary fields (``id`` is always included)."""
+    if fields is None:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(requested - set(DocumentSummary.model_fields))
+    if unknown:
+        hint = " (document content is served by /{doc_id}/content)" if "content" in unknown else ""
+        raise HTTPException(status_code=400, detail=f"Unknown document fields: {', '.join(unknown)}{hint}")
+    return requested | {"id"}
+
+
+@router.get("/", responses={200: {"model": Page[DocumentSummary]}})
+async def list_documents(
+    include_archived: bool = False,
+    fields: str | None = None,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    db: AsyncSession = Depends(get_db),
+):
+    """A page of document summaries, newest first; ``?fields=`` trims each one to the listed fields."""
+    selected = _parse_fields(fields)
+    if selected is None:
+        query = _with_review_count().options(defer(DbDocument.content, raiseload=True))
+    else:
+        # Load only the requested columns, and count reviews only if asked to
+        columns = [SUMMARY_COLUMNS[f] for f in selected if f in SUMMARY_COLUMNS]
+        query = _with_review_count() if "review_count" in selected else select(DbDocument)
+        # created_at is always loaded: the next cursor is built from it
+        query = query.options(load_only(DbDocument.id, DbDocument.created_at, *columns, raiseload=True))
+    if not include_archived:
+        query = query.where(DbDocument.is_archived == False)
+    rows = (await db.execute(paginate(query, DbDocument, cursor, limit))).all()
+    rows, next_cursor = page_rows(rows, limit, lambda row: row.DbDocument)
+    if selected is None:
+        items = [_doc_out(row.DbDocument, row.review_count).model_dump() for row in rows]
+    else:
+        items = [_partial_out(row, selected) for row in rows]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/{doc_id}", response_model=DocumentSummary)
+async def get_document(doc_id: str, db: AsyncSession = Depends(get_db)):
+    return _doc_out(*await _get_document(db, doc_id))
 
 
 @router.get("/{doc_id}/content")
-async def get_document_content(doc_id: str, db: Session = Depends(get_db)):
-    d = db.query(DbDocument).filter(DbDocument.id == doc_id).first()
-    if not d:
+async def get_document_content(doc_id: str, db: AsyncSession = Depends(get_db)):
+    content = await db.scalar(select(DbDocument.content).where(DbDocument.id == doc_id))
+    if content is None:
         raise HTTPException(status_code=404, detail="Document not found")
-    return {"content": d.content}
+    return {"content": content}
 
 
-@router.post("/{doc_id}/archive")
-async def archive_document(doc_id: str, db: Session = Depends(get_db)):
-    d = db.query(DbDocument).filter(DbDocument.id == doc_id).first()
-    if not d:
+async def _set_archived(db: AsyncSession, doc_id: str, archived: bool) -> DocumentSummary:
+    result = await db_writer.write(
+        lambda w: w.execute(update(DbDocument).where(DbDocument.id == doc_id).values(is_archived=archived))
+    )
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Document not found")
-    d.is_archived = True
-    db.commit()
-    return _doc_out(d)
+    return _doc_out(*await _get_document(db, doc_id))
 
 
-@router.post("/{doc_id}/restore")
-async def restore_document(doc_id: str, db: Session = Depends(get_db)):
-    d = db.query(DbDocument).filter(DbDocument.id == doc_id).first()
-    if not d:
-        raise HTTPException(status_code=404, detail="Document not found")
-    d.is_archived = False
-    db.commit()
-    return _doc_out(d)
+@router.post("/{doc_id}/archive", response_model=DocumentSummary)
+async def archive_document(doc_id: str, db: AsyncSession = Depends(get_db)):
+    return await _set_archived(db, doc_id, True)
+
+
+@router.post("/{doc_id}/restore", response_model=DocumentSummary)
+async def restore_document(doc_id: str, db: AsyncSession = Depends(get_db)):
+    return await _set_archived(db, doc_id, False)
 
 
 @router.delete("/{doc_id}")
-async def delete_document(doc_id: str, db: Session = Depends(get_db)):
-    d = db.query(DbDocument).filter(DbDocument.id == doc_id).first()
-    if not d:
+async def delete_document(doc_id: str):
+    async def delete(w: AsyncSession) -> bool:
+        # The delete cascades through reviews; load them up front (no lazy loads in async)
+        reviews = selectinload(DbDocument.reviews)
+        d = await w.scalar(
+            select(DbDocument)
+            .options(reviews.selectinload(DbReview.comments), reviews.selectinload(DbReview.meta_comments))
+            .where(DbDocument.id == doc_id)
+        )
+        if d:
+            await w.delete(d)
+        return d is not None
+
+    if not await db_writer.write(delete):
         raise HTTPException(status_code=404, detail="Document not found")
-    db.delete(d)
-    db.commit()
     return {"message": "Document deleted"}
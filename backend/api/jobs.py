@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends
-from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, DbReviewJob
+from api.pagination import Page, page_rows, paginate
+from database import DbReviewJob, get_db
+from services.review_jobs import review_jobs
 
 router = APIRouter()
 
@@ -12,19 +16,24 @@ class JobOut(BaseModel):
     id: str
     document_id: str
     status: str
-    provider: Optional[str] = None
-    model: Optional[str] = None
+    provider: str | None = None
+    model: str | None = None
     trigger: str = "manual"
-    error_message: Optional[str] = None
+    error_message: str | None = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
     created_at: str
-    completed_at: Optional[str] = None
+    completed_at: str | None = None
 
 
-@router.get("/", response_model=List[JobOut])
-async def list_jobs(limit: int = 20, db: Session = Depends(get_db)):
-    """List recent review jobs"""
-    jobs = db.query(DbReviewJob).order_by(DbReviewJob.created_at.desc()).limit(limit).all()
-    return [
+@router.get("/", response_model=Page[JobOut])
+async def list_jobs(cursor: str | None = None, limit: int = 20, db: AsyncSession = Depends(get_db)):
+    """List review jobs, newest first, a page at a time"""
+    jobs = (await db.scalars(paginate(select(DbReviewJob), DbReviewJob, cursor, limit))).all()
+    jobs, next_cursor = page_rows(jobs, limit, lambda j: j)
+    items = [
         JobOut(
             id=j.id,
             document_id=j.document_id,
@@ -33,8 +42,40 @@ async def list_jobs(limit: int = 20, db: Session = Depends(get_db)):
             model=j.model,
             trigger=j.trigger,
             error_message=j.error_message,
+            input_tokens=j.input_tokens or 0,
+            output_tokens=j.output_tokens or 0,
+            cache_read_tokens=j.cache_read_tokens or 0,
+            cache_write_tokens=j.cache_write_tokens or 0,
             created_at=j.created_at.isoformat(),
             completed_at=j.completed_at.isoformat() if j.completed_at else None,
         )
         for j in jobs
     ]
+    return Page[JobOut](items=items, next_cursor=next_cursor)
+
+
+@router.get("/{job_id}/events")
+async def job_events(
+    job_id: str,
+    after: int = 0,
+    last_event_id: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Follow a review job's events, resuming after ``Last-Event-ID`` (or ``?after=``)."""
+    if review_jobs.get(job_id) is None:
+        if not await db.get(DbReviewJob, job_id):
+            raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(
+            status_code=410,
+            detail="Event log for this job is no longer available; load the review instead",
+        )
+    if last_event_id:
+        try:
+            after = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an integer")
+    return StreamingResponse(
+        review_jobs.stream(job_id, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+    )
@@ -0,0 +1,68 @@
+"""Keyset pagination for listings, newest first on ``(created_at, id)``.
+
+A cursor is the ``(created_at, id)`` of the last row of a page, opaque to
+clients (URL-safe base64). The next page seeks straight to it through a
+``(..., created_at, id)`` index, so every page costs the same however deep
+into the history it is; offsets would re-read every skipped row.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Generic, TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import Select, tuple_
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None  # pass back as ?cursor= for the next page; null on the last one
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def check_limit(limit: int) -> int:
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def paginate(query: Select, model, cursor: str | None, limit: int) -> Select:
+    """Order ``query`` newest first and start it after ``cursor``.
+
+    Fetches one row more than the page so ``page_rows`` can tell whether
+    another page follows without a count query.
+    """
+    if cursor:
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(*decode_cursor(cursor)))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(check_limit(limit) + 1)
+
+
+def page_rows(rows: list, limit: int, key) -> tuple[list, str | None]:
+    """Split a ``paginate`` result into the page and the cursor of the next one.
+
+    ``key`` maps a row to the object carrying ``created_at`` and ``id``.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = key(rows[-1])
+    return rows, encode_cursor(last.created_at, last.id)
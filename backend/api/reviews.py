@@ -1,16 +1,28 @@
+import json
+import logging
 import re
 import uuid
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from typing import Literal
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
-from typing import List, Optional
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-import json
-
-from database import get_db, DbDocument, DbReview, DbReviewJob, DbComment, DbMetaComment
-from services.review_service import ReviewService
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from api.pagination import DEFAULT_PAGE_SIZE, Page, page_rows, paginate
+from core.config import get_settings
+from database import DbComment, DbDocument, DbMetaComment, DbReview, DbReviewJob, get_db
+from models.meta_comment import MetaSynthesisResult
+from services import meta_cache
+from services.db_writer import db_writer
+from services.llm_scheduler import priority_for_trigger
 from services.meta_service import MetaService
+from services.review_jobs import review_jobs, review_request_key
+from services.review_service import REVIEW_ERROR_PREFIX, ReviewService
+
+logger = logging.getLogger("vos.meta")
 
 router = APIRouter()
 review_service = ReviewService()
@@ -18,13 +30,17 @@ meta_service = MetaService()
 
 
 class ReviewRequest(BaseModel):
-    persona_ids: Optional[List[str]] = None
-    model: Optional[str] = "claude-sonnet-4-5-20250929"
+    persona_ids: list[str] | None = None
+    model: str | None = "claude-sonnet-4-5-20250929"
+    bypass_cache: bool = False  # force fresh LLM calls even if a cached result exists
+    incremental: bool = False  # only re-review paragraphs changed since the last completed review
+    trigger: Literal["manual", "ci", "webhook"] = "manual"  # ci/webhook reviews yield to interactive ones
+    auto_meta: bool = False  # synthesize the meta review on this stream once the personas finish
 
 
 class RawUploadRequest(BaseModel):
     content: str
-    title: Optional[str] = None
+    title: str | None = None
 
 
 class UploadResponse(BaseModel):
@@ -36,10 +52,10 @@ class UploadResponse(BaseModel):
 class ReviewSummary(BaseModel):
     id: str
     document_id: str
-    persona_ids: List[str]
+    persona_ids: list[str]
     status: str
     created_at: str
-    completed_at: Optional[str] = None
+    completed_at: str | None = None
     comment_count: int = 0
 
 
@@ -66,20 +82,20 @@ class MetaCommentOut(BaseModel):
     content: str
     start_line: int
     end_line: int
-    sources: List[MetaCommentSourceOut]
+    sources: list[MetaCommentSourceOut]
     category: str
     priority: str
     created_at: str
 
 
 class MetaReviewOut(BaseModel):
-    comments: List[MetaCommentOut]
+    comments: list[MetaCommentOut]
     verdict: str  # ship_it, fix_first, major_rework
     confidence: float  # 0.0 - 1.0
 
 
 class ReviewDetail(ReviewSummary):
-    comments: List[CommentOut] = []
+    comments: list[CommentOut] = []
 
 
 def extract_title_from_markdown(content: str, filename: str) -> str:
@@ -92,7 +108,7 @@ def extract_title_from_markdown(content: str, filename: str) -> str:
 
 
 @router.post("/upload", response_model=UploadResponse)
-async def upload_document(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_document(file: UploadFile = File(...)):
     if not file.filename or not file.filename.endswith('.md'):
         raise HTTPException(status_code=400, detail="Only .md files are supported")
 
@@ -112,14 +128,13 @@ async def upload_document(file: UploadFile = File(...), db: Session = Depends(ge
         description=f"Uploaded from {file.filename}",
         content=content_str,
     )
-    db.add(db_doc)
-    db.commit()
+    await db_writer.add(db_doc)
 
     return UploadResponse(document_id=doc_id, title=title, message="Document uploaded successfully")
 
 
 @router.post("/upload/raw", response_model=UploadResponse)
-async def upload_raw(req: RawUploadRequest, db: Session = Depends(get_db)):
+async def upload_raw(req: RawUploadRequest):
     if not req.content.strip():
         raise HTTPException(status_code=400, detail="Content cannot be empty")
     title = req.title or extract_title_from_markdown(req.content, "untitled.md")
@@ -131,8 +146,7 @@ async def upload_raw(req: RawUploadRequest, db: Session = Depends(get_db)):
         description="Uploaded via paste",
         content=req.content,
     )
-    db.add(db_doc)
-    db.commit()
+    await db_writer.add(db_doc)
 
     return UploadResponse(document_id=doc_id, title=title, message="Document created successfully")
 
@@ -142,9 +156,42 @@ async def list_personas():
     return {"personas": [p.model_dump() for p in review_service.list_personas()]}
 
 
+async def _load_previous_review(db: AsyncSession, doc_id: str) -> dict | None:
+    """Return the last completed review of a document in the shape review_document expects."""
+    prev = await db.scalar(
+        select(DbReview)
+        .options(selectinload(DbReview.comments))
+        .where(
+            DbReview.document_id == doc_id,
+            DbReview.status == "completed",
+            DbReview.content_snapshot.isnot(None),
+        )
+        .order_by(DbReview.created_at.desc())
+        .limit(1)
+    )
+    if not prev:
+        return None
+    # Personas whose previous run failed get a full review again
+    failed = {c.persona_id for c in prev.comments if c.content.startswith(REVIEW_ERROR_PREFIX)}
+    return {
+        "content": prev.content_snapshot,
+        "persona_ids": [pid for pid in prev.persona_ids if pid not in failed],
+        "comments": [
+            {
+                "persona_id": c.persona_id,
+                "content": c.content,
+                "start_line": c.start_line,
+                "end_line": c.end_line,
+            }
+            for c in prev.comments
+            if not c.content.startswith(REVIEW_ERROR_PREFIX)
+        ],
+    }
+
+
 @router.post("/{doc_id}/review")
-async def start_review(doc_id: str, request: ReviewRequest, db: Session = Depends(get_db)):
-    db_doc = db.query(DbDocument).filter(DbDocument.id == doc_id).first()
+async def start_review(doc_id: str, request: ReviewRequest, db: AsyncSession = Depends(get_db)):
+    db_doc = await db.get(DbDocument, doc_id)
     if not db_doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
@@ -155,17 +202,41 @@ async def start_review(doc_id: str, request: ReviewRequest, db: Session = Depend
 
     model_name = request.model or "claude-sonnet-4-5-20250929"
 
-    # Create job record
+    # An identical review already in flight: follow its events instead of fanning out again
+    request_key = review_request_key(
+        db_doc.content, valid_ids, model_name,
+        auto_meta=request.auto_meta,
+        incremental=request.incremental,
+        bypass_cache=request.bypass_cache,
+        priority=priority_for_trigger(request.trigger),
+    )
+    shared = review_jobs.attach(request_key, len(valid_ids))
+    if shared is not None:
+        return StreamingResponse(
+            review_jobs.stream(shared.job_id),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Job-Id": shared.job_id,
+                "X-Coalesced": "true",
+            },
+        )
+
+    previous_review = None
+    if request.incremental:
+        previous_review = await _load_previous_review(db, doc_id)
+
+    # Create job record; a background worker moves it to running when it starts
     job_id = str(uuid.uuid4())[:8]
     db_job = DbReviewJob(
         id=job_id,
         document_id=doc_id,
         status="queued",
-        provider="anthropic",
+        provider=get_settings().llm_provider,
         model=model_name,
-        trigger="manual",
+        trigger=request.trigger,
     )
-    db.add(db_job)
 
     review_id = str(uuid.uuid4())[:8]
     db_review = DbReview(
@@ -174,107 +245,55 @@ async def start_review(doc_id: str, request: ReviewRequest, db: Session = Depend
         persona_ids=valid_ids,
         status="running",
         job_id=job_id,
+        content_snapshot=db_doc.content,
     )
-    db.add(db_review)
-
-    # Mark job as running
-    db_job.status = "running"
-    db.commit()
+    await db_writer.add(db_job, db_review)
 
     doc_content = db_doc.content
 
-    async def generate():
-        all_comments = []
-        try:
-            async for event in review_service.review_document(
-                document_id=doc_id,
-                content=doc_content,
-                version_hash="HEAD",
-                persona_ids=valid_ids,
-                model=model_name,
-            ):
-                # Inject review_id into done event so frontend can call meta endpoint
-                if event.get("type") == "done":
-                    event["review_id"] = review_id
-                    event["job_id"] = job_id
-
-                yield f"data: {json.dumps(event, default=str)}\n\n"
-
-                if event.get("type") == "comment":
-                    all_comments.append(event["comment"])
-
-                if event.get("type") == "done":
-                    persist_db = next(get_db())
-                    try:
-                        for c in all_comments:
-                            db_comment = DbComment(
-                                id=c["id"],
-                                review_id=review_id,
-                                document_id=doc_id,
-                                persona_id=c["persona_id"],
-                                persona_name=c["persona_name"],
-                                persona_color=c["persona_color"],
-                                content=c["content"],
-                                start_line=c["anchor"]["start_line"],
-                                end_line=c["anchor"]["end_line"],
-                            )
-                            persist_db.add(db_comment)
-
-                        review = persist_db.query(DbReview).filter(DbReview.id == review_id).first()
-                        if review:
-                            review.status = "completed"
-                            review.completed_at = datetime.utcnow()
-
-                        job = persist_db.query(DbReviewJob).filter(DbReviewJob.id == job_id).first()
-                        if job:
-                            job.status = "completed"
-                            job.completed_at = datetime.utcnow()
-
-                        persist_db.commit()
-                    finally:
-                        persist_db.close()
-        except Exception as e:
-            from core.errors import classify_anthropic_error
-            import logging
-            err_logger = logging.getLogger("vos.review")
-
-            vos_err = classify_anthropic_error(e)
-            err_logger.error("Review stream failed [%s]: %s", vos_err.code, vos_err.message)
-
-            # Emit error event to frontend before closing stream
-            error_event = {
-                "type": "error",
-                "error": vos_err.code,
-                "detail": vos_err.message,
-            }
-            yield f"data: {json.dumps(error_event)}\n\n"
-
-            persist_db = next(get_db())
-            try:
-                job = persist_db.query(DbReviewJob).filter(DbReviewJob.id == job_id).first()
-                if job:
-                    job.status = "failed"
-                    job.error_message = vos_err.message
-                    job.completed_at = datetime.utcnow()
-                review = persist_db.query(DbReview).filter(DbReview.id == review_id).first()
-                if review:
-                    review.status = "failed"
-                    review.completed_at = datetime.utcnow()
-                persist_db.commit()
-            finally:
-                persist_db.close()
+    def run():
+        events = review_service.review_document(
+            document_id=doc_id,
+            content=doc_content,
+            version_hash="HEAD",
+            persona_ids=valid_ids,
+            model=model_name,
+            use_cache=not request.bypass_cache,
+            previous_review=previous_review,
+            priority=priority_for_trigger(request.trigger),
+        )
+        if request.auto_meta:
+            return meta_service.follow_review(events, _persona_weights(valid_ids))
+        return events
 
+    # The review runs in the job pool; this response only follows its events,
+    # so a disconnect here does not stop it (resume via /jobs/{id}/events).
+    review_jobs.submit(job_id, review_id, doc_id, run, key=request_key)
     return StreamingResponse(
-        generate(),
+        review_jobs.stream(job_id),
         media_type="text/event-stream",
-        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Job-Id": job_id},
     )
 
 
-@router.get("/{doc_id}/reviews", response_model=List[ReviewSummary])
-async def list_reviews(doc_id: str, db: Session = Depends(get_db)):
-    reviews = db.query(DbReview).filter(DbReview.document_id == doc_id).order_by(DbReview.created_at.desc()).all()
-    return [
+@router.get("/{doc_id}/reviews", response_model=Page[ReviewSummary])
+async def list_reviews(
+    doc_id: str,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    db: AsyncSession = Depends(get_db),
+):
+    # Comments are counted in SQL (an index lookup per review), never loaded
+    comment_count = (
+        select(func.count(DbComment.id))
+        .where(DbComment.review_id == DbReview.id)
+        .correlate(DbReview)
+        .scalar_subquery()
+    )
+    query = select(DbReview, comment_count.label("comment_count")).where(DbReview.document_id == doc_id)
+    rows = (await db.execute(paginate(query, DbReview, cursor, limit))).all()
+    rows, next_cursor = page_rows(rows, limit, lambda row: row.DbReview)
+    items = [
         ReviewSummary(
             id=r.id,
             document_id=r.document_id,
@@ -282,19 +301,16 @@ async def list_reviews(doc_id: str, db: Session = Depends(get_db)):
             status=r.status,
             created_at=r.created_at.isoformat(),
             completed_at=r.completed_at.isoformat() if r.completed_at else None,
-            comment_count=len(r.comments),
+            comment_count=comment_count,
         )
-        for r in reviews
+        for r, comment_count in rows
     ]
+    return Page[ReviewSummary](items=items, next_cursor=next_cursor)
 
 
 @router.get("/{doc_id}/reviews/{review_id}", response_model=ReviewDetail)
-async def get_review(doc_id: str, review_id: str, db: Session = Depends(get_db)):
-    review = db.query(DbReview).filter(
-        DbReview.id == review_id, DbReview.document_id == doc_id
-    ).first()
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
+async def get_review(doc_id: str, review_id: str, db: AsyncSession = Depends(get_db)):
+    review = await _get_review(db, doc_id, review_id)
 
     return ReviewDetail(
         id=review.id,
@@ -320,11 +336,15 @@ async def get_review(doc_id: str, review_id: str, db: Session = Depends(get_db))
     )
 
 
-@router.get("/{doc_id}/reviews/latest/comments", response_model=List[CommentOut])
-async def get_latest_comments(doc_id: str, db: Session = Depends(get_db)):
-    review = db.query(DbReview).filter(
-        DbReview.document_id == doc_id, DbReview.status == "completed"
-    ).order_by(DbReview.created_at.desc()).first()
+@router.get("/{doc_id}/reviews/latest/comments", response_model=list[CommentOut])
+async def get_latest_comments(doc_id: str, db: AsyncSession = Depends(get_db)):
+    review = await db.scalar(
+        select(DbReview)
+        .options(selectinload(DbReview.comments))
+        .where(DbReview.document_id == doc_id, DbReview.status == "completed")
+        .order_by(DbReview.created_at.desc())
+        .limit(1)
+    )
 
     if not review:
         return []
@@ -344,37 +364,23 @@ async def get_latest_comments(doc_id: str, db: Session = Depends(get_db)):
     ]
 
 
-@router.post("/{doc_id}/reviews/{review_id}/meta", response_model=MetaReviewOut)
-async def synthesize_meta_review(doc_id: str, review_id: str, db: Session = Depends(get_db)):
-    """Synthesize individual persona comments into unified meta-review feedback."""
-    review = db.query(DbReview).filter(
-        DbReview.id == review_id, DbReview.document_id == doc_id
-    ).first()
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
+def _meta_comment_out(mc) -> MetaCommentOut:
+    """MetaCommentOut from a DbMetaComment row or a freshly synthesized MetaComment."""
+    sources = mc.sources if isinstance(mc, DbMetaComment) else [s.model_dump() for s in mc.sources]
+    return MetaCommentOut(
+        id=mc.id,
+        content=mc.content,
+        start_line=mc.start_line,
+        end_line=mc.end_line,
+        sources=sources,
+        category=mc.category,
+        priority=mc.priority,
+        created_at=mc.created_at.isoformat(),
+    )
 
-    # Check for cached meta comments
-    existing = db.query(DbMetaComment).filter(DbMetaComment.review_id == review_id).all()
-    if existing:
-        return MetaReviewOut(
-            comments=[
-                MetaCommentOut(
-                    id=mc.id,
-                    content=mc.content,
-                    start_line=mc.start_line,
-                    end_line=mc.end_line,
-                    sources=mc.sources,
-                    category=mc.category,
-                    priority=mc.priority,
-                    created_at=mc.created_at.isoformat(),
-                )
-                for mc in existing
-            ],
-            verdict=review.meta_verdict or "ship_it",
-            confidence=review.meta_confidence or 0.0,
-        )
 
-    # Build comments list from DB
+def _meta_inputs(review: DbReview) -> tuple[list[dict], dict[str, float]]:
+    """Persona comments and weights that feed a meta synthesis of ``review``."""
     comments_data = [
         {
             "id": c.id,
@@ -386,81 +392,197 @@ async def synthesize_meta_review(doc_id: str, review_id: str, db: Session = Depe
             "end_line": c.end_line,
         }
         for c in review.comments
+        # Placeholders of failed personas are not findings (follow_review skips them too)
+        if not c.content.startswith(REVIEW_ERROR_PREFIX)
     ]
 
-    # Build persona weight map from review service
+    return comments_data, _persona_weights(review.persona_ids)
+
+
+def _persona_weights(persona_ids: list[str]) -> dict[str, float]:
+    """persona_id -> weight for the personas that still exist."""
     persona_weights = {}
-    for pid in review.persona_ids:
+    for pid in persona_ids:
         persona = review_service.get_persona(pid)
         if persona:
             persona_weights[pid] = persona.weight
+    return persona_weights
 
-    # Run synthesis
-    result = await meta_service.synthesize(comments_data, persona_weights=persona_weights)
-
-    # Cache verdict and confidence on the review
-    review.meta_verdict = result.verdict
-    review.meta_confidence = result.confidence
-
-    # Cache meta comments in DB
-    for mc in result.comments:
-        db_mc = DbMetaComment(
-            id=mc.id,
-            review_id=review_id,
-            content=mc.content,
-            start_line=mc.start_line,
-            end_line=mc.end_line,
-            sources=[s.model_dump() for s in mc.sources],
-            category=mc.category,
-            priority=mc.priority,
-            created_at=mc.created_at,
-        )
-        db.add(db_mc)
-    db.commit()
 
-    return MetaReviewOut(
-        comments=[
-            MetaCommentOut(
+async def _persist_meta(review_id: str, result: MetaSynthesisResult, cache_as: tuple[str, str] | None = None):
+    """Save a synthesis on the review (replacing any earlier one): verdict, confidence, DbMetaComments.
+
+    With ``cache_as=(key, model)`` the synthesis also goes into the meta cache, in the same transaction.
+    """
+    async def save(db: AsyncSession):
+        await db.execute(delete(DbMetaComment).where(DbMetaComment.review_id == review_id))
+        await db.execute(
+            update(DbReview)
+            .where(DbReview.id == review_id)
+            .values(meta_verdict=result.verdict, meta_confidence=result.confidence)
+        )
+        db.add_all(
+            DbMetaComment(
                 id=mc.id,
+                review_id=review_id,
                 content=mc.content,
                 start_line=mc.start_line,
                 end_line=mc.end_line,
                 sources=[s.model_dump() for s in mc.sources],
                 category=mc.category,
                 priority=mc.priority,
-                created_at=mc.created_at.isoformat(),
+                created_at=mc.created_at,
             )
             for mc in result.comments
-        ],
+        )
+        if cache_as is not None:
+            await meta_cache.store(db, *cache_as, result)
+
+    await db_writer.write(save)
+
+
+async def _get_review(db: AsyncSession, doc_id: str, review_id: str) -> DbReview:
+    """The review with its persona comments loaded."""
+    review = await db.scalar(
+        select(DbReview)
+        .options(selectinload(DbReview.comments))
+        .where(DbReview.id == review_id, DbReview.document_id == doc_id)
+    )
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    return review
+
+
+async def _stored_meta(db: AsyncSession, review_id: str) -> list[DbMetaComment]:
+    return list(await db.scalars(select(DbMetaComment).where(DbMetaComment.review_id == review_id)))
+
+
+def _meta_cache_key(comments_data: list[dict], persona_weights: dict[str, float], local: bool | None) -> tuple[str, str]:
+    """(synthesizer, shared cache key) for a synthesis of ``comments_data``."""
+    model = meta_service.synthesizer(comments_data, local)
+    return model, meta_cache.meta_cache_key(comments_data, persona_weights, model)
+
+
+@router.post("/{doc_id}/reviews/{review_id}/meta", response_model=MetaReviewOut)
+async def synthesize_meta_review(
+    doc_id: str,
+    review_id: str,
+    local: bool | None = None,
+    force: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """Synthesize individual persona comments into unified meta-review feedback.
+
+    ``local=true`` uses the deterministic local synthesizer, ``local=false``
+    always calls the LLM; by default small reviews are synthesized locally.
+    Results are cached per comment set, so a review whose comments match an
+    earlier one reuses its synthesis; ``force=true`` recomputes it.
+    """
+    review = await _get_review(db, doc_id, review_id)
+
+    # Check for cached meta comments
+    existing = [] if force else await _stored_meta(db, review_id)
+    if existing:
+        return MetaReviewOut(
+            comments=[_meta_comment_out(mc) for mc in existing],
+            verdict=review.meta_verdict or "ship_it",
+            confidence=review.meta_confidence or 0.0,
+        )
+
+    comments_data, persona_weights = _meta_inputs(review)
+    model, cache_key = _meta_cache_key(comments_data, persona_weights, local)
+    result = None if force else await meta_cache.load(db, cache_key)
+    if result is not None:
+        await _persist_meta(review_id, result)
+    else:
+        result = await meta_service.synthesize(comments_data, persona_weights=persona_weights, local=local)
+        await _persist_meta(review_id, result, cache_as=None if result.fallback else (cache_key, model))
+
+    return MetaReviewOut(
+        comments=[_meta_comment_out(mc) for mc in result.comments],
         verdict=result.verdict,
         confidence=result.confidence,
     )
 
 
+@router.post("/{doc_id}/reviews/{review_id}/meta/stream")
+async def stream_meta_review(
+    doc_id: str,
+    review_id: str,
+    local: bool | None = None,
+    force: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """SSE variant of the meta-review POST (same ``local`` and ``force`` flags).
+
+    Emits a ``meta_comment`` event per finding as soon as the model finishes
+    writing it, then a ``meta_verdict`` event with verdict and confidence.
+    Findings are persisted once the verdict is known. A review that was
+    already synthesized, or whose comment set was, is replayed from the
+    cache (``cached: true``).
+    """
+    review = await _get_review(db, doc_id, review_id)
+    existing = [] if force else await _stored_meta(db, review_id)
+
+    def frame(event: dict) -> str:
+        return f"data: {json.dumps(event, default=str)}\n\n"
+
+    async def replay():
+        for mc in existing:
+            yield frame({"type": "meta_comment", "comment": _meta_comment_out(mc).model_dump()})
+        yield frame({
+            "type": "meta_verdict",
+            "verdict": review.meta_verdict or "ship_it",
+            "confidence": review.meta_confidence or 0.0,
+            "cached": True,
+        })
+
+    async def synthesize():
+        comments_data, persona_weights = _meta_inputs(review)
+        model, cache_key = _meta_cache_key(comments_data, persona_weights, local)
+        try:
+            cached = None if force else await meta_cache.load(db, cache_key)
+            if cached is not None:
+                await _persist_meta(review_id, cached)
+                for mc in cached.comments:
+                    yield frame({"type": "meta_comment", "comment": _meta_comment_out(mc).model_dump()})
+                yield frame({"type": "meta_verdict", "verdict": cached.verdict,
+                             "confidence": cached.confidence, "cached": True})
+                return
+
+            async for event in meta_service.synthesize_stream(
+                comments_data, persona_weights=persona_weights, local=local
+            ):
+                if event["type"] == "meta_comment":
+                    yield frame({"type": "meta_comment", "comment": _meta_comment_out(event["comment"]).model_dump()})
+                    continue
+                result = event["result"]
+                await _persist_meta(review_id, result, cache_as=None if result.fallback else (cache_key, model))
+                verdict = {"type": "meta_verdict", "verdict": result.verdict, "confidence": result.confidence}
+                for flag in ("fallback", "local"):
+                    if event.get(flag):
+                        verdict[flag] = True
+                yield frame(verdict)
+        except Exception:
+            # synthesize_stream already falls back on LLM errors; this is the cache or persistence failing
+            logger.exception("Meta stream for review %s failed", review_id)
+            yield frame({"type": "error", "error": "meta_failed", "detail": "Failed to save meta review"})
+
+    return StreamingResponse(
+        replay() if existing else synthesize(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+    )
+
+
 @router.get("/{doc_id}/reviews/{review_id}/meta", response_model=MetaReviewOut)
-async def get_meta_comments(doc_id: str, review_id: str, db: Session = Depends(get_db)):
+async def get_meta_comments(doc_id: str, review_id: str, db: AsyncSession = Depends(get_db)):
     """Retrieve cached meta comments for a review."""
-    review = db.query(DbReview).filter(
-        DbReview.id == review_id, DbReview.document_id == doc_id
-    ).first()
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
+    review = await _get_review(db, doc_id, review_id)
 
-    meta_comments = db.query(DbMetaComment).filter(DbMetaComment.review_id == review_id).all()
+    meta_comments = await _stored_meta(db, review_id)
     return MetaReviewOut(
-        comments=[
-            MetaCommentOut(
-                id=mc.id,
-                content=mc.content,
-                start_line=mc.start_line,
-                end_line=mc.end_line,
-                sources=mc.sources,
-                category=mc.category,
-                priority=mc.priority,
-                created_at=mc.created_at.isoformat(),
-            )
-            for mc in meta_comments
-        ],
+        comments=[_meta_comment_out(mc) for mc in meta_comments],
         verdict=review.meta_verdict or "ship_it",
         confidence=review.meta_confidence or 0.0,
     )
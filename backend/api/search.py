@@ -0,0 +1,60 @@
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.pagination import check_limit
+from database import get_db
+from services.search import KINDS, SearchQueryError, search_index
+
+router = APIRouter()
+
+
+class SearchHit(BaseModel):
+    kind: str  # document, comment, meta_comment
+    id: str
+    document_id: str | None = None
+    document_title: str | None = None
+    review_id: str | None = None
+    persona_id: str | None = None  # comments
+    persona_name: str | None = None
+    category: str | None = None  # meta comments
+    priority: str | None = None
+    start_line: int | None = None
+    end_line: int | None = None
+    snippet: str  # HTML: escaped text with matches wrapped in <mark>…</mark>
+    score: float  # higher is better
+
+
+class SearchResults(BaseModel):
+    items: list[SearchHit]
+
+
+@router.get("/", response_model=SearchResults)
+async def search(
+    q: str,
+    kind: list[str] = Query(default=[]),
+    persona: str | None = None,
+    category: str | None = None,
+    priority: str | None = None,
+    document_id: str | None = None,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_db),
+):
+    """Ranked full-text search over documents, review comments and meta comments.
+
+    ``kind`` (repeatable) narrows the kinds searched. Filters a kind can't
+    satisfy leave it out: persona matches comments and meta comments (any
+    source persona), category and priority only meta comments.
+    """
+    unknown = sorted(set(kind) - set(KINDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(unknown)} (expected {', '.join(KINDS)})")
+    try:
+        hits = await search_index.search(
+            db, q, kinds=kind or None, limit=check_limit(limit),
+            persona=persona, category=category, priority=priority, document_id=document_id,
+        )
+    except SearchQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SearchResults(items=[SearchHit(**hit) for hit in hits])
@@ -1,14 +1,14 @@
 import os
-import sys
 import shutil
+import sys
+
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from typing import List, Optional
-from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db, DATABASE_URL
 from core.config import get_settings
+from database import DATABASE_URL, get_db
 
 router = APIRouter()
 
@@ -29,8 +29,8 @@ class VersionInfo(BaseModel):
 
 class HealthResponse(BaseModel):
     status: str  # healthy, degraded, unhealthy
-    checks: List[CheckDetail]
-    versions: Optional[VersionInfo] = None
+    checks: list[CheckDetail]
+    versions: VersionInfo | None = None
 
 
 def _get_versions() -> VersionInfo:
@@ -53,7 +53,7 @@ def _get_versions() -> VersionInfo:
 
 
 @router.get("/", response_model=HealthResponse)
-async def system_status(db: Session = Depends(get_db)):
+async def system_status(db: AsyncSession = Depends(get_db)):
     """Check system health with dependency checks and version info."""
     checks = []
 
@@ -61,7 +61,7 @@ async def system_status(db: Session = Depends(get_db)):
     is_pg = "postgresql" in DATABASE_URL
     db_label = "PostgreSQL" if is_pg else "SQLite"
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         checks.append(CheckDetail(name="database", status="healthy", message=f"{db_label} connection OK"))
     except Exception as e:
         checks.append(CheckDetail(name="database", status="unhealthy", message=f"Database error: {e}"))
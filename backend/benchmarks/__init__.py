@@ -0,0 +1 @@
+"""Performance benchmarks for the VOS backend (run as ``python -m benchmarks.<name>``)."""
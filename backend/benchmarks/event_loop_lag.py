@@ -0,0 +1,276 @@
+"""Event-loop lag under mixed database read/write and review load.
+
+While review streams run against the mock LLM, reader tasks repeat the
+queries behind the review-list endpoint (plus a document insert every few
+reads), and a probe measures how late a short ``asyncio.sleep`` wakes up.
+Each scenario runs the same workload twice:
+
+- ``sync``: a synchronous ``Session`` on the event loop, as the handlers
+  used to do, so every query stalls everything else in the process
+- ``async``: the ``AsyncSession`` the handlers use now (aiosqlite runs the
+  query on its own thread while the loop keeps serving)
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.event_loop_lag --readers 8 --reviews 4 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import selectinload
+
+from benchmarks.review_throughput import (
+    _git_commit,
+    asgi_stream,
+    bench_environment,
+    make_document,
+    percentiles,
+    run_client,
+)
+from database import DbComment, DbDocument, DbReview
+from services.db_writer import db_writer
+from services.review_jobs import review_jobs
+from services.review_service import PERSONAS
+
+DEFAULT_OUT = os.path.join(os.path.dirname(__file__), "results", "event_loop_lag.json")
+PROBE_INTERVAL = 0.005  # seconds between probe wake-ups
+WRITE_EVERY = 5  # reads per document insert
+
+
+def seed(session_factory, documents: int, reviews_per_doc: int, comments_per_review: int) -> list[str]:
+    """Documents with completed reviews, so the read queries have rows to load."""
+    db = session_factory()
+    doc_ids = []
+    try:
+        for d in range(documents):
+            doc_id = f"lag-{d}"
+            doc_ids.append(doc_id)
+            db.merge(DbDocument(id=doc_id, title=f"Lag {d}", content=make_document(20, d)))
+            for r in range(reviews_per_doc):
+                review_id = f"{doc_id}-r{r}"
+                db.merge(DbReview(id=review_id, document_id=doc_id, persona_ids=["p"], status="completed"))
+                for c in range(comments_per_review):
+                    db.merge(DbComment(
+                        id=f"{review_id}-c{c}", review_id=review_id, document_id=doc_id, persona_id="p",
+                        persona_name="P", persona_color="#000", content=f"Comment {c} " * 20,
+                        start_line=c, end_line=c,
+                    ))
+        db.commit()
+    finally:
+        db.close()
+    return doc_ids
+
+
+def _reviews_query(doc_id: str):
+    return (
+        select(DbReview)
+        .options(selectinload(DbReview.comments))
+        .where(DbReview.document_id == doc_id)
+        .order_by(DbReview.created_at.desc())
+    )
+
+
+def _new_document() -> DbDocument:
+    return DbDocument(id=f"w-{uuid.uuid4().hex[:8]}", title="w", content="w")
+
+
+async def sync_reader(session_factory, doc_ids: list[str], offset: int, stop: asyncio.Event) -> dict:
+    """The old handler shape: blocking queries inside a coroutine."""
+    counts = {"reads": 0, "lock_errors": 0}
+    while not stop.is_set():
+        db = session_factory()
+        try:
+            reviews = db.scalars(_reviews_query(doc_ids[(offset + counts["reads"]) % len(doc_ids)])).all()
+            sum(len(r.comments) for r in reviews)
+            db.rollback()
+            if counts["reads"] % WRITE_EVERY == 0:
+                db.add(_new_document())
+                db.commit()
+        except OperationalError:
+            # Blocking the loop while an async connection holds the write lock: SQLite gives up
+            counts["lock_errors"] += 1
+            db.rollback()
+        finally:
+            db.close()
+        counts["reads"] += 1
+        await asyncio.sleep(0)  # a handler returns to the loop between requests
+    return counts
+
+
+async def async_reader(async_factory, doc_ids: list[str], offset: int, stop: asyncio.Event) -> dict:
+    counts = {"reads": 0, "lock_errors": 0}
+    while not stop.is_set():
+        async with async_factory() as db:
+            try:
+                reviews = (await db.scalars(_reviews_query(doc_ids[(offset + counts["reads"]) % len(doc_ids)]))).all()
+                sum(len(r.comments) for r in reviews)
+                await db.rollback()
+                if counts["reads"] % WRITE_EVERY == 0:
+                    db.add(_new_document())
+                    await db.commit()
+            except OperationalError:
+                counts["lock_errors"] += 1
+                await db.rollback()
+        counts["reads"] += 1
+    return counts
+
+
+async def probe(stop: asyncio.Event) -> list[float]:
+    """How late each ``sleep(PROBE_INTERVAL)`` wakes up, in seconds."""
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - started - PROBE_INTERVAL))
+    return lags
+
+
+async def run_mode(
+    mode: str,
+    session_factory,
+    async_factory,
+    doc_ids: list[str],
+    readers: int,
+    reviews: int,
+    personas: int,
+    duration: float,
+) -> dict:
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop))
+    if mode == "sync":
+        reader_tasks = [asyncio.create_task(sync_reader(session_factory, doc_ids, i, stop)) for i in range(readers)]
+    else:
+        reader_tasks = [asyncio.create_task(async_reader(async_factory, doc_ids, i, stop)) for i in range(readers)]
+
+    # Fresh documents so the reviews are neither cached nor coalesced across modes
+    db = session_factory()
+    review_docs = []
+    try:
+        for i in range(reviews):
+            doc_id = f"lag-review-{mode}-{i}"
+            db.merge(DbDocument(id=doc_id, title=f"Review {i}", content=make_document(10, 100 + i)))
+            review_docs.append(doc_id)
+        db.commit()
+    finally:
+        db.close()
+    persona_ids = [p.id for p in PERSONAS[:personas]]
+    review_tasks = [asyncio.create_task(run_client(asgi_stream, d, persona_ids)) for d in review_docs]
+
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    stop.set()
+    counts = await asyncio.gather(*reader_tasks)
+    reads = sum(c["reads"] for c in counts)
+    lags = await probe_task
+    results = await asyncio.gather(*review_tasks)
+    wall = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "readers": readers,
+        "reviews": reviews,
+        "lag_ms": {**percentiles(lags), "max": round(max(lags) * 1000, 1) if lags else None},
+        "probes": len(lags),
+        "reads": reads,
+        "reads_per_sec": round(reads / duration, 1),
+        "lock_errors": sum(c["lock_errors"] for c in counts),
+        "reviews_completed": sum(1 for r in results if r["total"] is not None),
+        "review_total_ms": percentiles([r["total"] for r in results if r["total"] is not None]),
+        "wall_s": round(wall, 3),
+    }
+
+
+async def run_benchmark(
+    readers: int = 8,
+    reviews: int = 4,
+    personas: int = 3,
+    duration: float = 5.0,
+    documents: int = 50,
+    reviews_per_doc: int = 3,
+    comments_per_review: int = 40,
+    ttft_ms: int = 200,
+    tokens_per_second: float = 400.0,
+    modes: tuple[str, ...] = ("sync", "async"),
+) -> dict:
+    config = {
+        "readers": readers, "reviews": reviews, "personas": personas, "duration_s": duration,
+        "documents": documents, "reviews_per_doc": reviews_per_doc, "comments_per_review": comments_per_review,
+        "ttft_ms": ttft_ms, "tokens_per_second": tokens_per_second,
+    }
+    scenarios = []
+    with bench_environment(ttft_ms, tokens_per_second, workers=4, max_in_flight=8) as session_factory:
+        async_factory = db_writer.session_factory
+        doc_ids = seed(session_factory, documents, reviews_per_doc, comments_per_review)
+        for mode in modes:
+            scenarios.append(await run_mode(
+                mode, session_factory, async_factory, doc_ids, readers, reviews, personas, duration,
+            ))
+        await review_jobs.shutdown()
+        await db_writer.shutdown()
+    return {
+        "benchmark": "event_loop_lag",
+        "created_at": datetime.now(UTC).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": config,
+        "scenarios": scenarios,
+    }
+
+
+def _print_report(report: dict):
+    print(f"{'mode':>6} {'lag p50':>8} {'p95':>7} {'p99':>7} {'max':>7} {'reads/s':>8} {'locked':>7} "
+          f"{'reviews':>8} {'review p50':>11}")
+    for s in report["scenarios"]:
+        lag = s["lag_ms"]
+        print(
+            f"{s['mode']:>6} {lag['p50']!s:>8} {lag['p95']!s:>7} {lag['p99']!s:>7} {lag['max']!s:>7} "
+            f"{s['reads_per_sec']:>8} {s['lock_errors']:>7} {s['reviews_completed']:>8} "
+            f"{s['review_total_ms']['p50']!s:>11}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--readers", type=int, default=8, help="concurrent reader tasks")
+    parser.add_argument("--reviews", type=int, default=4, help="concurrent review streams")
+    parser.add_argument("--personas", type=int, default=3, help="personas per review")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of load per mode")
+    parser.add_argument("--documents", type=int, default=50, help="seeded documents")
+    parser.add_argument("--comments", type=int, default=40, help="comments per seeded review")
+    parser.add_argument("--ttft-ms", type=int, default=200)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("vos").setLevel(logging.WARNING)
+    report = asyncio.run(run_benchmark(
+        readers=args.readers,
+        reviews=args.reviews,
+        personas=args.personas,
+        duration=args.duration,
+        documents=args.documents,
+        comments_per_review=args.comments,
+        ttft_ms=args.ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+    ))
+    _print_report(report)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
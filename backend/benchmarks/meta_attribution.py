@@ -0,0 +1,175 @@
+"""Micro-benchmark: meta-review grouping and source attribution at scale.
+
+Compares the CommentIndex used by MetaService with the previous approach of
+scanning every comment for every finding, on synthetic reviews with many
+comments (10k by default):
+
+    python -m benchmarks.meta_attribution --comments 10000 --findings 50
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from functools import partial
+
+from benchmarks.review_throughput import _git_commit
+from services.comment_index import CommentIndex
+
+DEFAULT_OUT = os.path.join(os.path.dirname(__file__), "results", "meta_attribution.json")
+PERSONAS = ["Devil's Advocate", "Supportive Editor", "Technical Architect", "Casual Reader",
+            "Security Reviewer", "Accessibility Advocate", "Executive Summary"]
+
+
+def make_comments(n: int, seed: int = 0) -> list[dict]:
+    """``n`` comments spread over a document of roughly ``n / 2`` lines."""
+    rng = random.Random(seed)
+    lines = max(10, n // 2)
+    comments = []
+    for i in range(n):
+        start = rng.randrange(lines)
+        name = rng.choice(PERSONAS)
+        comments.append({
+            "id": f"c{i}",
+            "persona_id": name.lower().replace(" ", "-"),
+            "persona_name": name,
+            "persona_color": "#6366f1",
+            "content": f"Comment {i}.",
+            "start_line": start,
+            "end_line": start + rng.randrange(3),
+        })
+    return comments
+
+
+def make_findings(comments: list[dict], n: int, seed: int = 0) -> list[dict]:
+    """Findings citing 2-3 personas and 1-3 line ranges each (1-indexed, like the model's)."""
+    rng = random.Random(seed + 1)
+    lines = max(c["end_line"] for c in comments) + 1
+    findings = []
+    for _ in range(n):
+        ranges = []
+        for _ in range(rng.randint(1, 3)):
+            start = rng.randrange(lines)
+            ranges.append([start + 1, start + 1 + rng.randrange(20)])
+        findings.append({"contributing_personas": rng.sample(PERSONAS, rng.randint(2, 3)), "line_ranges": ranges})
+    return findings
+
+
+def linear_attribution(comments: list[dict], findings: list[dict]) -> list[list[dict]]:
+    """The previous approach: regroup, then scan all comments per finding (persona names only)."""
+    sorted_comments = sorted(comments, key=lambda c: (c["start_line"], c["end_line"]))
+    groups = []
+    for c in sorted_comments:
+        if groups and c["start_line"] <= groups[-1]["end_line"] + 2:
+            groups[-1]["end_line"] = max(groups[-1]["end_line"], c["end_line"])
+            groups[-1]["comments"].append(c)
+        else:
+            groups.append({"start_line": c["start_line"], "end_line": c["end_line"], "comments": [c]})
+    result = []
+    for item in findings:
+        names = set(item["contributing_personas"])
+        result.append([c for g in groups for c in g["comments"] if c["persona_name"] in names])
+    return result
+
+
+def linear_range_attribution(comments: list[dict], findings: list[dict]) -> list[list[dict]]:
+    """The new semantics (persona and line ranges) with a full scan per finding, for reference."""
+    result = []
+    for item in findings:
+        names = set(item["contributing_personas"])
+        ranges = [(a - 1, b - 1) for a, b in item["line_ranges"]]
+        result.append([
+            c for c in comments
+            if c["persona_name"] in names and any(c["start_line"] <= b and c["end_line"] >= a for a, b in ranges)
+        ])
+    return result
+
+
+def index_attribution(comments: list[dict], findings: list[dict]) -> list[list[dict]]:
+    index = CommentIndex(comments)
+    index.groups()
+    return [
+        index.attribute(item["contributing_personas"], [(a - 1, b - 1) for a, b in item["line_ranges"]])
+        for item in findings
+    ]
+
+
+def best_ms(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+
+def run_benchmark(comment_counts: list[int], findings: int, repeat: int = 5) -> dict:
+    scenarios = []
+    for n in comment_counts:
+        comments = make_comments(n)
+        items = make_findings(comments, findings)
+        # Same comments cited as the reference implementation of the new semantics
+        indexed = index_attribution(comments, items)
+        reference = linear_range_attribution(comments, items)
+        agree = all(
+            not ref or {c["id"] for c in got} == {c["id"] for c in ref}
+            for got, ref in zip(indexed, reference)
+        )
+        index = CommentIndex(comments)
+        scenarios.append({
+            "comments": n,
+            "findings": findings,
+            "linear_ms": best_ms(partial(linear_attribution, comments, items), repeat),
+            "linear_ranges_ms": best_ms(partial(linear_range_attribution, comments, items), repeat),
+            "index_ms": best_ms(partial(index_attribution, comments, items), repeat),
+            "index_build_ms": best_ms(partial(CommentIndex, comments), repeat),
+            "index_groups_ms": best_ms(index.groups, repeat),
+            "avg_sources_linear": round(sum(map(len, linear_attribution(comments, items))) / findings, 1),
+            "avg_sources_index": round(sum(map(len, indexed)) / findings, 1),
+            "matches_reference": agree,
+        })
+    return {
+        "benchmark": "meta_attribution",
+        "created_at": datetime.now(UTC).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {"comment_counts": comment_counts, "findings": findings, "repeat": repeat},
+        "scenarios": scenarios,
+    }
+
+
+def _print_report(report: dict):
+    print(f"{'comments':>9} {'linear ms':>10} {'ranges ms':>10} {'index ms':>9} {'build ms':>9} "
+          f"{'groups ms':>10} {'src/lin':>8} {'src/idx':>8}")
+    for s in report["scenarios"]:
+        print(
+            f"{s['comments']:>9} {s['linear_ms']:>10} {s['linear_ranges_ms']:>10} {s['index_ms']:>9} "
+            f"{s['index_build_ms']:>9} {s['index_groups_ms']:>10} "
+            f"{s['avg_sources_linear']:>8} {s['avg_sources_index']:>8}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--comments", default="100,1000,10000", help="comment counts")
+    parser.add_argument("--findings", type=int, default=50, help="findings to attribute per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best is kept)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark([int(x) for x in args.comments.split(",")], args.findings, args.repeat)
+    _print_report(report)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.out}")
+    return 0 if all(s["matches_reference"] for s in report["scenarios"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
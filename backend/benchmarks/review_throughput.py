@@ -0,0 +1,433 @@
+"""End-to-end review throughput benchmark.
+
+Drives the real FastAPI app with N concurrent clients, each streaming
+``POST /api/v1/reviews/{doc_id}/review``. The mock LLM provider stands in
+for Anthropic, with configurable latency. Each scenario (document size x
+persona count) reports:
+
+- time to first event, time to first comment and total review time (p50/p95/p99)
+- events/sec across all clients
+- DB persist time of finished reviews
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.review_throughput --sizes 10,50,200 --personas 1,3,6 --clients 8
+    python -m benchmarks.review_throughput --compare benchmarks/results/baseline.json
+
+``--transport asgi`` (default) calls the ASGI app in-process and timestamps
+every body chunk as the app sends it. ``httpx.ASGITransport`` only returns
+once the whole body is buffered, so it cannot measure time to first event.
+``--transport uvicorn`` serves the app on a local port and streams over real
+HTTP.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from core.config import get_settings
+from core.observability import metrics
+from database import Base, DbDocument, apply_sqlite_profile, async_url, get_db
+from main import app
+from services.db_writer import db_writer
+from services.review_jobs import review_jobs
+from services.review_service import PERSONAS
+
+DEFAULT_OUT = os.path.join(os.path.dirname(__file__), "results", "review_throughput.json")
+
+
+# ----------------------------------------------------------------------
+# Environment
+# ----------------------------------------------------------------------
+@contextmanager
+def bench_environment(
+    ttft_ms: int,
+    tokens_per_second: float,
+    workers: int,
+    max_in_flight: int,
+):
+    """Temporary DB, mock provider and unthrottled limits; restored on exit."""
+    settings = get_settings()
+    overrides = {
+        "llm_provider": "mock",
+        "mock_llm_ttft_ms": ttft_ms,
+        "mock_llm_tokens_per_second": tokens_per_second,
+        "mock_llm_rate_limit_rate": 0.0,
+        "mock_llm_server_error_rate": 0.0,
+        "rate_limit_enabled": False,
+        "llm_requests_per_minute": 0,
+        "llm_tokens_per_minute": 0,
+        "llm_max_in_flight_per_model": max_in_flight,
+        "review_workers": workers,
+    }
+    saved = {key: getattr(settings, key) for key in overrides}
+    saved_factory = db_writer.session_factory
+    saved_get_db = app.dependency_overrides.get(get_db)
+
+    tmpdir = tempfile.mkdtemp(prefix="vos-bench-")
+    url = f"sqlite:///{tmpdir}/bench.db"
+    engine = apply_sqlite_profile(create_engine(url, connect_args={"check_same_thread": False}))
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # What the app and its review jobs use; no pool, as each run may bring its own event loop
+    async_factory = async_sessionmaker(
+        apply_sqlite_profile(create_async_engine(async_url(url), poolclass=NullPool)),
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+    async def bench_db():
+        async with async_factory() as db:
+            yield db
+
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    app.dependency_overrides[get_db] = bench_db
+    db_writer.session_factory = async_factory
+    try:
+        yield session_factory
+    finally:
+        for key, value in saved.items():
+            setattr(settings, key, value)
+        if saved_get_db is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = saved_get_db
+        db_writer.session_factory = saved_factory
+        engine.dispose()
+
+
+def make_document(paragraphs: int, variant: int = 0) -> str:
+    """Deterministic markdown with a heading every five paragraphs."""
+    parts = [f"# Benchmark document {variant}"]
+    for i in range(paragraphs):
+        if i and i % 5 == 0:
+            parts.append(f"## Section {i // 5}")
+        parts.append(
+            f"Paragraph {i} describes component {i % 7} of the system. It explains how requests "
+            f"flow through stage {i % 3}, which assumptions hold, and what happens on failure."
+        )
+    return "\n\n".join(parts)
+
+
+# ----------------------------------------------------------------------
+# Transports
+# ----------------------------------------------------------------------
+async def asgi_stream(path: str, body: bytes) -> AsyncIterator[bytes]:
+    """POST to the ASGI app in-process, yielding body chunks as they are sent."""
+    chunks: asyncio.Queue = asyncio.Queue()
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path} returned HTTP {message['status']}")
+        if message["type"] == "http.response.body":
+            if message.get("body"):
+                await chunks.put(message["body"])
+            if not message.get("more_body"):
+                await chunks.put(None)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    try:
+        while True:
+            getter = asyncio.ensure_future(chunks.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                task.result()  # surface app errors
+                return
+            chunk = getter.result()
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        disconnected.set()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+class UvicornServer:
+    """Serves the app on an ephemeral local port for real-HTTP streaming."""
+
+    async def __aenter__(self):
+        import httpx
+        import uvicorn
+
+        config = uvicorn.Config(app, host="127.0.0.1", port=0, lifespan="off", log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            await asyncio.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        self._server.should_exit = True
+        await self._task
+
+    async def stream(self, path: str, body: bytes) -> AsyncIterator[bytes]:
+        headers = {"content-type": "application/json"}
+        async with self.client.stream("POST", path, content=body, headers=headers) as resp:
+            resp.raise_for_status()
+            async for chunk in resp.aiter_bytes():
+                yield chunk
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99 of ``samples`` (seconds) in milliseconds."""
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+async def run_client(stream, doc_id: str, persona_ids: list[str]) -> dict:
+    """Stream one review and time its events (seconds from request start)."""
+    body = json.dumps({"persona_ids": persona_ids, "bypass_cache": True}).encode()
+    start = time.perf_counter()
+    result = {"ttfe": None, "ttfc": None, "total": None, "events": 0, "error": None}
+    buffer = b""
+    async for chunk in stream(f"/api/v1/reviews/{doc_id}/review", body):
+        now = time.perf_counter() - start
+        buffer += chunk
+        *frames, buffer = buffer.split(b"\n\n")
+        for frame in frames:
+            data = next((line[6:] for line in frame.split(b"\n") if line.startswith(b"data: ")), None)
+            if data is None:
+                continue
+            event = json.loads(data)
+            result["events"] += 1
+            if result["ttfe"] is None:
+                result["ttfe"] = now
+            if event["type"] == "comment" and result["ttfc"] is None:
+                result["ttfc"] = now
+            elif event["type"] == "done":
+                result["total"] = now
+            elif event["type"] == "error":
+                result["error"] = event.get("detail")
+    return result
+
+
+async def run_scenario(
+    stream,
+    session_factory,
+    paragraphs: int,
+    personas: int,
+    clients: int,
+) -> dict:
+    persona_ids = [p.id for p in PERSONAS[:personas]]
+    # One document per client so identical requests are not coalesced into one job
+    db = session_factory()
+    doc_ids = []
+    try:
+        for i in range(clients):
+            doc_id = f"b{paragraphs}-{personas}-{i}"
+            db.merge(DbDocument(id=doc_id, title=f"Benchmark {i}", content=make_document(paragraphs, i)))
+            doc_ids.append(doc_id)
+        db.commit()
+    finally:
+        db.close()
+
+    metrics._persist_durations.clear()
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_client(stream, d, persona_ids) for d in doc_ids))
+    wall = time.perf_counter() - started
+    persist = list(metrics._persist_durations)
+
+    events = sum(r["events"] for r in results)
+    return {
+        "paragraphs": paragraphs,
+        "personas": personas,
+        "clients": clients,
+        "completed": sum(1 for r in results if r["total"] is not None),
+        "errors": sum(1 for r in results if r["error"] or r["total"] is None),
+        "time_to_first_event_ms": percentiles([r["ttfe"] for r in results if r["ttfe"] is not None]),
+        "time_to_first_comment_ms": percentiles([r["ttfc"] for r in results if r["ttfc"] is not None]),
+        "total_ms": percentiles([r["total"] for r in results if r["total"] is not None]),
+        "events": events,
+        "events_per_sec": round(events / wall, 1) if wall else None,
+        "wall_s": round(wall, 3),
+        "db_persist_ms": percentiles(persist),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(
+    sizes: list[int],
+    persona_counts: list[int],
+    clients: int,
+    ttft_ms: int = 200,
+    tokens_per_second: float = 400.0,
+    workers: int = 4,
+    max_in_flight: int = 8,
+    transport: str = "asgi",
+) -> dict:
+    config = {
+        "sizes": sizes,
+        "personas": persona_counts,
+        "clients": clients,
+        "ttft_ms": ttft_ms,
+        "tokens_per_second": tokens_per_second,
+        "workers": workers,
+        "max_in_flight": max_in_flight,
+        "transport": transport,
+    }
+    scenarios = []
+    with bench_environment(ttft_ms, tokens_per_second, workers, max_in_flight) as session_factory:
+        if transport == "uvicorn":
+            async with UvicornServer() as server:
+                for size in sizes:
+                    for count in persona_counts:
+                        scenarios.append(await run_scenario(server.stream, session_factory, size, count, clients))
+        else:
+            for size in sizes:
+                for count in persona_counts:
+                    scenarios.append(await run_scenario(asgi_stream, session_factory, size, count, clients))
+        await review_jobs.shutdown()
+        await db_writer.shutdown()
+    return {
+        "benchmark": "review_throughput",
+        "created_at": datetime.now(UTC).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": config,
+        "scenarios": scenarios,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Scenarios whose p95 total or first-comment time grew by more than ``threshold``."""
+    def key(s):
+        return (s["paragraphs"], s["personas"], s["clients"])
+
+    previous = {key(s): s for s in baseline.get("scenarios", [])}
+    regressions = []
+    for scenario in current["scenarios"]:
+        old = previous.get(key(scenario))
+        if old is None:
+            continue
+        for metric in ("total_ms", "time_to_first_comment_ms"):
+            before, after = old[metric]["p95"], scenario[metric]["p95"]
+            if before and after and after > before * (1 + threshold):
+                regressions.append(
+                    f"{metric} p95 {before} -> {after} ms "
+                    f"(paragraphs={scenario['paragraphs']}, personas={scenario['personas']})"
+                )
+    return regressions
+
+
+def _print_report(report: dict):
+    header = f"{'paras':>6} {'pers':>5} {'ok':>4} {'ttfe p50':>9} {'ttfc p50':>9} {'total p50':>10} {'p95':>8} {'p99':>8} {'ev/s':>8} {'persist p95':>12}"
+    print(header)
+    for s in report["scenarios"]:
+        print(
+            f"{s['paragraphs']:>6} {s['personas']:>5} {s['completed']:>4} "
+            f"{s['time_to_first_event_ms']['p50']!s:>9} {s['time_to_first_comment_ms']['p50']!s:>9} "
+            f"{s['total_ms']['p50']!s:>10} {s['total_ms']['p95']!s:>8} {s['total_ms']['p99']!s:>8} "
+            f"{s['events_per_sec']!s:>8} {s['db_persist_ms']['p95']!s:>12}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="10,50,200", help="document sizes in paragraphs")
+    parser.add_argument("--personas", default="1,3,6", help="persona counts")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent SSE clients per scenario")
+    parser.add_argument("--ttft-ms", type=int, default=200)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--workers", type=int, default=4, help="review job workers")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="LLM calls in flight per model")
+    parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="where to write the JSON report")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p95 regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("vos").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = asyncio.run(run_benchmark(
+        sizes=[int(x) for x in args.sizes.split(",")],
+        persona_counts=[int(x) for x in args.personas.split(",")],
+        clients=args.clients,
+        ttft_ms=args.ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        transport=args.transport,
+    ))
+    _print_report(report)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Full-text search latency at 100k review comments.
+
+Seeds a fresh SQLite database (with the production profile) with documents,
+persona comments and meta comments whose words follow a Zipf distribution, so
+queries range from words in most comments to words in a handful. Then it runs
+each query class through ``search_index`` and reports latency percentiles and
+how many comments the query matches. There are two modes:
+
+- ``capped``: each kind ranks only its newest ``search_candidate_limit``
+  matches (the default setting)
+- ``exact``: bm25 over every match, for comparison
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.search_latency --comments 100000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.meta_attribution import PERSONAS
+from benchmarks.review_throughput import _git_commit, make_document, percentiles
+from core.config import get_settings
+from database import (
+    Base,
+    DbComment,
+    DbDocument,
+    DbMetaComment,
+    DbReview,
+    apply_sqlite_profile,
+    async_url,
+    content_stats,
+)
+from services.search import Fts5Backend, parse_query, search_index
+
+DEFAULT_OUT = os.path.join(os.path.dirname(__file__), "results", "search_latency.json")
+MODES = ("capped", "exact")
+VOCABULARY = 5000
+OPENERS = ["Consider clarifying", "This paragraph never explains", "Readers may miss", "Add an example of",
+           "The section contradicts", "Please define", "It is unclear how", "Security impact of"]
+CATEGORIES = ["structure", "clarity", "technical", "security", "accessibility"]
+PRIORITIES = ["critical", "high", "medium", "low"]
+
+
+def _vocabulary(seed: int) -> list[str]:
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ren", "sto", "var", "quel", "dri", "pan", "tes", "os", "ul", "ber", "zin"]
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words, key=lambda w: (len(w), w))  # rank 0 is the most frequent
+
+
+def _text(rng: random.Random, words: list[str], weights: list[float], length: int) -> str:
+    return f"{rng.choice(OPENERS)} {' '.join(rng.choices(words, weights, k=length))}."
+
+
+def seed(url: str, comments: int, documents: int, reviews_per_doc: int, meta_every: int, seed_: int = 0) -> list[str]:
+    """Seed the database; returns the vocabulary, most frequent word first."""
+    rng = random.Random(seed_)
+    words = _vocabulary(seed_)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    personas = [name.lower().replace(" ", "-") for name in PERSONAS]
+    engine = apply_sqlite_profile(create_engine(url))
+    Base.metadata.create_all(bind=engine)
+    base = datetime(2026, 1, 1)
+    doc_rows, review_rows, comment_rows, meta_rows = [], [], [], []
+    for d in range(documents):
+        content = make_document(10, d)
+        length, lines, digest = content_stats(content)
+        doc_rows.append({
+            "id": f"doc-{d}", "title": f"Doc {d}", "content": content,
+            "content_length": length, "line_count": lines, "content_hash": digest,
+        })
+        for r in range(reviews_per_doc):
+            review_rows.append({"id": f"doc-{d}-r{r}", "document_id": f"doc-{d}", "persona_ids": personas, "status": "completed"})
+    for i in range(comments):
+        review = review_rows[i % len(review_rows)]
+        persona = rng.randrange(len(personas))
+        comment_rows.append({
+            "id": f"c{i}", "review_id": review["id"], "document_id": review["document_id"],
+            "persona_id": personas[persona], "persona_name": PERSONAS[persona], "persona_color": "#6366f1",
+            "content": _text(rng, words, weights, rng.randint(8, 30)), "start_line": i % 40, "end_line": i % 40 + 1,
+            "created_at": base + timedelta(seconds=i),
+        })
+        if i % meta_every == 0:
+            meta_rows.append({
+                "id": f"m{i}", "review_id": review["id"], "content": _text(rng, words, weights, rng.randint(15, 40)),
+                "start_line": i % 40, "end_line": i % 40 + 1, "category": rng.choice(CATEGORIES),
+                "priority": rng.choice(PRIORITIES), "created_at": base + timedelta(seconds=i),
+                "sources": [{"persona_id": p, "persona_name": p, "persona_color": "#000", "original_content": ""}
+                            for p in rng.sample(personas, 2)],
+            })
+    with engine.begin() as conn:
+        conn.execute(insert(DbDocument), doc_rows)
+        conn.execute(insert(DbReview), review_rows)
+        conn.execute(insert(DbComment), comment_rows)
+        conn.execute(insert(DbMetaComment), meta_rows)
+    engine.dispose()
+    return words
+
+
+def query_classes(words: list[str]) -> dict[str, dict]:
+    """Query mix: ``{name: {"q": ..., **filters}}``."""
+    return {
+        "common_word": {"q": words[0]},  # in most comments
+        "mid_word": {"q": words[50]},
+        "rare_word": {"q": words[2000]},
+        "two_words": {"q": f"{words[5]} {words[40]}"},
+        "phrase": {"q": f'"{OPENERS[2]}"'},
+        "prefix": {"q": words[300][:4] + "*"},
+        "persona_filter": {"q": words[50], "persona": "security-reviewer"},
+        "meta_filters": {"q": words[20], "category": "security", "priority": "high"},
+    }
+
+
+async def run_mode(mode: str, url: str, words: list[str], repeat: int) -> dict:
+    settings = get_settings()
+    previous = settings.search_candidate_limit
+    if mode == "exact":
+        settings.search_candidate_limit = 1 << 62
+    engine = apply_sqlite_profile(create_async_engine(async_url(url)))
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    queries = {}
+    try:
+        async with factory() as db:
+            for name, params in query_classes(words).items():
+                params = dict(params)
+                q = params.pop("q")
+                matches = (await db.execute(
+                    text("SELECT count(*) FROM comments_fts WHERE comments_fts MATCH :match"),
+                    {"match": Fts5Backend.match_expression(parse_query(q))},
+                )).scalar()
+                latencies, hits = [], []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    hits = await search_index.search(db, q, **params)
+                    latencies.append(time.perf_counter() - started)
+                queries[name] = {"query": q, **params, "comment_matches": matches, "hits": len(hits), "ms": percentiles(latencies)}
+    finally:
+        settings.search_candidate_limit = previous
+        await engine.dispose()
+    return {"mode": mode, "queries": queries}
+
+
+async def run_benchmark(
+    comments: int = 100_000,
+    documents: int = 200,
+    reviews_per_doc: int = 3,
+    meta_every: int = 10,
+    repeat: int = 50,
+    modes: tuple[str, ...] = MODES,
+) -> dict:
+    config = {
+        "comments": comments, "documents": documents, "reviews_per_doc": reviews_per_doc,
+        "meta_comments": (comments + meta_every - 1) // meta_every, "repeat": repeat,
+        "search_candidate_limit": get_settings().search_candidate_limit,
+    }
+    tmpdir = tempfile.mkdtemp(prefix="vos-bench-")
+    try:
+        url = f"sqlite:///{tmpdir}/bench.db"
+        started = time.perf_counter()
+        words = seed(url, comments, documents, reviews_per_doc, meta_every)
+        config["seed_s"] = round(time.perf_counter() - started, 1)
+        scenarios = [await run_mode(mode, url, words, repeat) for mode in modes]
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return {
+        "benchmark": "search_latency",
+        "created_at": datetime.now(UTC).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": config,
+        "scenarios": scenarios,
+    }
+
+
+def _print_report(report: dict):
+    print(f"{'mode':>7} {'query':>15} {'matches':>8} {'hits':>5} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+    for s in report["scenarios"]:
+        for name, q in s["queries"].items():
+            ms = q["ms"]
+            print(f"{s['mode']:>7} {name:>15} {q['comment_matches']:>8} {q['hits']:>5} "
+                  f"{ms['p50']!s:>7} {ms['p95']!s:>7} {ms['p99']!s:>7}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--comments", type=int, default=100_000, help="persona comments to index")
+    parser.add_argument("--documents", type=int, default=200, help="documents (3 reviews each)")
+    parser.add_argument("--meta-every", type=int, default=10, help="one meta comment per this many comments")
+    parser.add_argument("--repeat", type=int, default=50, help="runs of each query")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("vos").setLevel(logging.WARNING)
+    report = asyncio.run(run_benchmark(
+        comments=args.comments, documents=args.documents, meta_every=args.meta_every, repeat=args.repeat,
+    ))
+    _print_report(report)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
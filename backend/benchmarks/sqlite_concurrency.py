@@ -0,0 +1,271 @@
+"""Mixed read/write concurrency on SQLite, before and after the production profile.
+
+Reader tasks repeat the review-list query (reviews of a document with their
+comment counts) while writer tasks persist reviews the way review jobs do:
+a batch of comments plus a status update in one transaction, with the odd
+document upload in between. Each mode gets a fresh database file:
+
+- ``baseline``: SQLite defaults (rollback journal, ``synchronous=FULL``) and
+  every writer committing through its own session, as before
+- ``tuned``: the WAL/pragma profile applied by ``database.apply_sqlite_profile``
+  with all writes going through a ``DbWriter`` (one writer, group commit)
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.sqlite_concurrency --readers 8 --writers 8 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.review_throughput import _git_commit, make_document, percentiles
+from database import (
+    Base,
+    DbComment,
+    DbDocument,
+    DbReview,
+    apply_sqlite_profile,
+    async_url,
+)
+from services.db_writer import DbWriter
+
+DEFAULT_OUT = os.path.join(os.path.dirname(__file__), "results", "sqlite_concurrency.json")
+UPLOAD_EVERY = 5  # review writes per document upload
+MODES = ("baseline", "tuned")
+
+
+def seed(url: str, documents: int, reviews_per_doc: int, comments_per_review: int) -> list[str]:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    doc_ids = []
+    try:
+        for d in range(documents):
+            doc_id = f"doc-{d}"
+            doc_ids.append(doc_id)
+            db.add(DbDocument(id=doc_id, title=f"Doc {d}", content=make_document(20, d)))
+            for r in range(reviews_per_doc):
+                review_id = f"{doc_id}-r{r}"
+                db.add(DbReview(id=review_id, document_id=doc_id, persona_ids=["p"], status="completed"))
+                db.add_all(_comments(doc_id, review_id, comments_per_review))
+        db.commit()
+    finally:
+        db.close()
+        engine.dispose()
+    return doc_ids
+
+
+def _comments(doc_id: str, review_id: str, count: int) -> list[DbComment]:
+    return [
+        DbComment(
+            id=f"{review_id}-c{c}", review_id=review_id, document_id=doc_id, persona_id="p",
+            persona_name="P", persona_color="#000", content=f"Comment {c} " * 20, start_line=c, end_line=c,
+        )
+        for c in range(count)
+    ]
+
+
+def _review_list(doc_id: str):
+    comment_count = (
+        select(func.count(DbComment.id)).where(DbComment.review_id == DbReview.id).correlate(DbReview).scalar_subquery()
+    )
+    return (
+        select(DbReview.id, comment_count)
+        .where(DbReview.document_id == doc_id)
+        .order_by(DbReview.created_at.desc(), DbReview.id.desc())
+        .limit(50)
+    )
+
+
+def _review_write(doc_id: str, comments: int):
+    """What a finished review job writes: its comments and the status update, in one transaction."""
+    review_id = uuid.uuid4().hex[:12]
+    rows = [
+        {
+            "id": f"{review_id}-c{c}", "review_id": review_id, "document_id": doc_id, "persona_id": "p",
+            "persona_name": "P", "persona_color": "#000", "content": f"Comment {c} " * 20,
+            "start_line": c, "end_line": c,
+        }
+        for c in range(comments)
+    ]
+
+    async def write(db):
+        db.add(DbReview(id=review_id, document_id=doc_id, persona_ids=["p"], status="running"))
+        await db.flush()
+        await db.execute(insert(DbComment), rows)
+        await db.execute(update(DbReview).where(DbReview.id == review_id).values(status="completed"))
+
+    return write
+
+
+def _upload():
+    async def write(db):
+        db.add(DbDocument(id=uuid.uuid4().hex[:12], title="Upload", content=make_document(5, 0)))
+
+    return write
+
+
+async def reader(factory, doc_ids: list[str], offset: int, stop: asyncio.Event) -> dict:
+    stats = {"reads": 0, "latencies": [], "lock_errors": 0}
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            async with factory() as db:
+                (await db.execute(_review_list(doc_ids[(offset + stats["reads"]) % len(doc_ids)]))).all()
+        except OperationalError:
+            stats["lock_errors"] += 1
+        else:
+            stats["latencies"].append(time.perf_counter() - started)
+        stats["reads"] += 1
+    return stats
+
+
+async def writer(submit, doc_ids: list[str], offset: int, comments: int, stop: asyncio.Event) -> dict:
+    stats = {"writes": 0, "latencies": [], "lock_errors": 0}
+    while not stop.is_set():
+        n = stats["writes"] + stats["lock_errors"]
+        write = _upload() if n % UPLOAD_EVERY == UPLOAD_EVERY - 1 else _review_write(doc_ids[(offset + n) % len(doc_ids)], comments)
+        started = time.perf_counter()
+        try:
+            await submit(write)
+        except OperationalError:
+            stats["lock_errors"] += 1
+        else:
+            stats["writes"] += 1
+            stats["latencies"].append(time.perf_counter() - started)
+    return stats
+
+
+async def run_mode(mode: str, url: str, doc_ids: list[str], readers: int, writers: int, comments: int, duration: float) -> dict:
+    engine = create_async_engine(async_url(url), pool_size=readers + writers + 1, max_overflow=0)
+    if mode == "tuned":
+        apply_sqlite_profile(engine)
+    factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    if mode == "tuned":
+        db_writer = DbWriter(factory, serialize=True)
+        submit = db_writer.write
+    else:
+        db_writer = None
+
+        async def submit(write):
+            async with factory() as db:
+                await write(db)
+                await db.commit()
+
+    stop = asyncio.Event()
+    reader_tasks = [asyncio.create_task(reader(factory, doc_ids, i, stop)) for i in range(readers)]
+    writer_tasks = [asyncio.create_task(writer(submit, doc_ids, i, comments, stop)) for i in range(writers)]
+    await asyncio.sleep(duration)
+    stop.set()
+    read_stats = await asyncio.gather(*reader_tasks)
+    write_stats = await asyncio.gather(*writer_tasks)
+    if db_writer is not None:
+        await db_writer.shutdown()
+    async with engine.connect() as conn:
+        journal_mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+    await engine.dispose()
+
+    reads = sum(s["reads"] for s in read_stats)
+    writes = sum(s["writes"] for s in write_stats)
+    return {
+        "mode": mode,
+        "journal_mode": journal_mode,
+        "readers": readers,
+        "writers": writers,
+        "reads_per_sec": round(reads / duration, 1),
+        "writes_per_sec": round(writes / duration, 1),
+        "read_ms": percentiles([t for s in read_stats for t in s["latencies"]]),
+        "write_ms": percentiles([t for s in write_stats for t in s["latencies"]]),
+        "read_lock_errors": sum(s["lock_errors"] for s in read_stats),
+        "write_lock_errors": sum(s["lock_errors"] for s in write_stats),
+    }
+
+
+async def run_benchmark(
+    readers: int = 8,
+    writers: int = 8,
+    duration: float = 5.0,
+    documents: int = 50,
+    reviews_per_doc: int = 3,
+    comments_per_review: int = 40,
+    modes: tuple[str, ...] = MODES,
+) -> dict:
+    config = {
+        "readers": readers, "writers": writers, "duration_s": duration, "documents": documents,
+        "reviews_per_doc": reviews_per_doc, "comments_per_review": comments_per_review,
+    }
+    scenarios = []
+    for mode in modes:
+        tmpdir = tempfile.mkdtemp(prefix="vos-bench-")
+        try:
+            url = f"sqlite:///{tmpdir}/bench.db"
+            doc_ids = seed(url, documents, reviews_per_doc, comments_per_review)
+            scenarios.append(await run_mode(mode, url, doc_ids, readers, writers, comments_per_review, duration))
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    return {
+        "benchmark": "sqlite_concurrency",
+        "created_at": datetime.now(UTC).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": config,
+        "scenarios": scenarios,
+    }
+
+
+def _print_report(report: dict):
+    print(f"{'mode':>8} {'journal':>8} {'reads/s':>8} {'read p50':>9} {'p99':>7} "
+          f"{'writes/s':>9} {'write p50':>10} {'p99':>7} {'locked':>7}")
+    for s in report["scenarios"]:
+        read, write = s["read_ms"], s["write_ms"]
+        print(
+            f"{s['mode']:>8} {s['journal_mode']:>8} {s['reads_per_sec']:>8} {read['p50']!s:>9} {read['p99']!s:>7} "
+            f"{s['writes_per_sec']:>9} {write['p50']!s:>10} {write['p99']!s:>7} "
+            f"{s['read_lock_errors'] + s['write_lock_errors']:>7}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--readers", type=int, default=8, help="concurrent reader tasks")
+    parser.add_argument("--writers", type=int, default=8, help="concurrent writer tasks")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of load per mode")
+    parser.add_argument("--documents", type=int, default=50, help="seeded documents")
+    parser.add_argument("--comments", type=int, default=40, help="comments per review (seeded and written)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("vos").setLevel(logging.WARNING)
+    report = asyncio.run(run_benchmark(
+        readers=args.readers,
+        writers=args.writers,
+        duration=args.duration,
+        documents=args.documents,
+        comments_per_review=args.comments,
+    ))
+    _print_report(report)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,88 @@
-from pydantic_settings import BaseSettings
 from functools import lru_cache
 
+from pydantic_settings import BaseSettings
+
 
 class Settings(BaseSettings):
     anthropic_api_key: str = ""
     database_url: str = "sqlite:///./vos.db"
+    # SQLite profile, applied to every new connection
+    sqlite_journal_mode: str = "WAL"  # readers never block the writer, nor it them
+    sqlite_synchronous: str = "NORMAL"  # fsync at checkpoints only; safe with WAL
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 20_000
+    # All writes go through one writer task that group-commits whatever queued
+    # up meanwhile (None: only on SQLite, which allows one writer at a time)
+    db_single_writer: bool | None = None
+    db_writer_max_batch: int = 100
+    # Full-text search ranks at most this many of the newest matches per kind
+    # (documents, comments, meta comments); narrower queries are ranked exactly
+    search_candidate_limit: int = 500
+    # Check the SQLite search indexes against their tables at startup and
+    # rebuild drifted ones (after a VACUUM); reads the whole index, ~0.4s per 100k comments
+    search_repair_on_startup: bool = True
     repos_base_path: str = "/tmp/vos-repos"
     debug: bool = False
     rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 60
     csrf_enabled: bool = True
+    # Persona review result cache (keyed on content/prompt/model)
+    review_cache_enabled: bool = True
+    review_cache_ttl_seconds: int = 7 * 24 * 3600
+    review_cache_max_entries: int = 5000
+    # Incremental re-review: unchanged neighbours sent with each changed paragraph
+    incremental_context_paragraphs: int = 1
+    # Chunked (map-reduce) review of long documents, sizes in estimated tokens
+    review_chunk_threshold_tokens: int = 12_000
+    review_chunk_tokens: int = 4_000
+    review_chunk_parallelism: int = 3  # windows in flight per persona
+    # Background review jobs
+    review_workers: int = 4
+    review_job_retention_seconds: int = 900  # how long finished jobs' event logs stay resumable
+    # Streamed comments are written in batches of this many, or after this long
+    review_comment_batch_size: int = 25
+    review_comment_flush_seconds: float = 0.5
+    # Auto meta-review: weighted share of personas finished before a speculative
+    # synthesis starts (1.0 waits for all of them, i.e. no speculation)
+    meta_speculative_share: float = 1.0
+    # Hierarchical meta synthesis: comments per map batch (one prompt up to this
+    # many) and map calls in flight
+    meta_batch_comments: int = 80
+    meta_batch_parallelism: int = 3
+    # Reviews with at most this many comments get the local (non-LLM) meta synthesis
+    meta_local_max_comments: int = 5
+    # Meta synthesis cache, keyed on the comment set (shared across reviews)
+    meta_cache_enabled: bool = True
+    meta_cache_ttl_seconds: int = 7 * 24 * 3600
+    meta_cache_max_entries: int = 1000
+    # LLM provider: "anthropic", or "mock" for offline load tests and CI
+    llm_provider: str = "anthropic"
+    mock_llm_ttft_ms: int = 300
+    mock_llm_tokens_per_second: float = 200.0  # 0 streams instantly
+    mock_llm_rate_limit_rate: float = 0.0  # fraction of calls failing with 429
+    mock_llm_server_error_rate: float = 0.0  # fraction of calls failing with 500
+    mock_llm_retry_after_seconds: float | None = None
+    mock_llm_seed: int = 0
+    # Shared LLM client pool
+    llm_max_connections: int = 50
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_seconds: float = 60.0
+    llm_timeout_seconds: float = 120.0
+    llm_warm_on_startup: bool = True
+    llm_warm_connections: int = 2
+    # Global LLM scheduler (0 disables a budget)
+    llm_requests_per_minute: int = 50
+    llm_tokens_per_minute: int = 200_000
+    llm_max_in_flight_per_model: int = 8
+    llm_model_max_in_flight: dict[str, int] = {}  # per-model overrides, e.g. {"claude-opus-4-1": 2}
+    llm_max_retries: int = 4
+    llm_backoff_base_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 30.0
+    # Provider prompt caching of the shared document block
+    prompt_cache_enabled: bool = True
+    prompt_cache_min_tokens: int = 1024
+    prompt_cache_warmup: bool = True  # start one persona first so the rest read its cache entry
+    prompt_cache_warmup_timeout_seconds: float = 15.0
 
     class Config:
         env_file = ".env"
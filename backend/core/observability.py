@@ -5,7 +5,6 @@ import uuid
 from collections import defaultdict
 from contextlib import contextmanager
 from threading import Lock
-from typing import Optional
 
 logger = logging.getLogger("vos.http")
 
@@ -15,7 +14,7 @@ logger = logging.getLogger("vos.http")
 _request_id_ctx: dict[int, str] = {}  # task-id -> request-id
 
 
-def get_request_id() -> Optional[str]:
+def get_request_id() -> str | None:
     """Return the current request ID, if inside a request context."""
     import asyncio
     try:
@@ -46,6 +45,35 @@ class _Metrics:
         self.reviews_failed: int = 0
         self.persona_completions: int = 0
         self._review_durations: list[float] = []
+        # Review result cache
+        self.review_cache_hits: int = 0
+        self.review_cache_misses: int = 0
+        self.review_cache_evictions: int = 0
+        # Meta synthesis cache
+        self.meta_cache_hits: int = 0
+        self.meta_cache_misses: int = 0
+        # Identical concurrent review requests attached to an in-flight job
+        self.reviews_coalesced: int = 0
+        self.coalesced_persona_calls_saved: int = 0
+        self.coalesced_tokens_saved: int = 0
+        # Streaming latency (seconds since review start)
+        self._time_to_first_comment: list[float] = []
+        self._comment_latencies: list[float] = []
+        # Time to persist a finished review (comments + status) to the DB
+        self._persist_durations: list[float] = []
+        # Comments written in batches while their review is still streaming
+        self.comment_batches: int = 0
+        self.comments_written: int = 0
+        self._comment_batch_durations: list[float] = []
+        # Single database writer: transactions committed and the writes grouped into them
+        self.db_write_batches: int = 0
+        self.db_writes: int = 0
+        self._db_write_durations: list[float] = []
+        # Full-text search queries
+        self.searches: int = 0
+        self._search_durations: list[float] = []
+        # LLM token usage (summed over reviews)
+        self.llm_tokens: dict[str, int] = defaultdict(int)
         self._started_at = time.time()
 
     def record_request(self, method: str, status_code: int, duration: float):
@@ -78,6 +106,88 @@ class _Metrics:
         with self._lock:
             self.persona_completions += 1
 
+    def record_review_cache_lookup(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.review_cache_hits += 1
+            else:
+                self.review_cache_misses += 1
+
+    def record_review_cache_eviction(self, count: int):
+        with self._lock:
+            self.review_cache_evictions += count
+
+    def record_meta_cache_lookup(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.meta_cache_hits += 1
+            else:
+                self.meta_cache_misses += 1
+
+    def record_review_coalesced(self, persona_calls: int):
+        with self._lock:
+            self.reviews_coalesced += 1
+            self.coalesced_persona_calls_saved += persona_calls
+
+    def record_coalesced_tokens_saved(self, tokens: int):
+        with self._lock:
+            self.coalesced_tokens_saved += tokens
+
+    def record_time_to_first_comment(self, seconds: float):
+        with self._lock:
+            self._time_to_first_comment.append(seconds)
+            if len(self._time_to_first_comment) > 500:
+                self._time_to_first_comment = self._time_to_first_comment[-500:]
+
+    def record_comment_latency(self, seconds: float):
+        with self._lock:
+            self._comment_latencies.append(seconds)
+            if len(self._comment_latencies) > self._max_latencies:
+                self._comment_latencies = self._comment_latencies[-self._max_latencies:]
+
+    def record_review_persist(self, seconds: float):
+        with self._lock:
+            self._persist_durations.append(seconds)
+            if len(self._persist_durations) > 500:
+                self._persist_durations = self._persist_durations[-500:]
+
+    def record_comment_batch(self, rows: int, seconds: float):
+        with self._lock:
+            self.comment_batches += 1
+            self.comments_written += rows
+            self._comment_batch_durations.append(seconds)
+            if len(self._comment_batch_durations) > 500:
+                self._comment_batch_durations = self._comment_batch_durations[-500:]
+
+    def record_db_write_batch(self, writes: int, seconds: float):
+        with self._lock:
+            self.db_write_batches += 1
+            self.db_writes += writes
+            self._db_write_durations.append(seconds)
+            if len(self._db_write_durations) > 500:
+                self._db_write_durations = self._db_write_durations[-500:]
+
+    def record_search(self, seconds: float):
+        with self._lock:
+            self.searches += 1
+            self._search_durations.append(seconds)
+            if len(self._search_durations) > 500:
+                self._search_durations = self._search_durations[-500:]
+
+    def record_llm_usage(self, usage: dict[str, int]):
+        with self._lock:
+            for key, value in usage.items():
+                self.llm_tokens[key] += value
+
+    @staticmethod
+    def _percentiles_ms(samples: list[float]) -> dict:
+        ordered = sorted(samples) if samples else [0]
+        return {
+            "p50": round(ordered[len(ordered) // 2] * 1000, 1),
+            "p95": round(ordered[int(len(ordered) * 0.95)] * 1000, 1),
+            "sample_size": len(samples),
+        }
+
     def snapshot(self) -> dict:
         with self._lock:
             latencies = sorted(self._latencies) if self._latencies else [0]
@@ -105,6 +215,43 @@ class _Metrics:
                         sum(self._review_durations) / len(self._review_durations), 2
                     ) if self._review_durations else 0,
                 },
+                "review_latency_ms": {
+                    "time_to_first_comment": self._percentiles_ms(self._time_to_first_comment),
+                    "comment": self._percentiles_ms(self._comment_latencies),
+                    "persist": self._percentiles_ms(self._persist_durations),
+                    "comment_batch": self._percentiles_ms(self._comment_batch_durations),
+                },
+                "comment_writes": {
+                    "batches": self.comment_batches,
+                    "comments": self.comments_written,
+                },
+                "db_writer": {
+                    "transactions": self.db_write_batches,
+                    "writes": self.db_writes,
+                    "transaction_ms": self._percentiles_ms(self._db_write_durations),
+                },
+                "search": {
+                    "queries": self.searches,
+                    "latency_ms": self._percentiles_ms(self._search_durations),
+                },
+                "llm_tokens": dict(self.llm_tokens),
+                "review_cache": {
+                    "hits": self.review_cache_hits,
+                    "misses": self.review_cache_misses,
+                    "evictions": self.review_cache_evictions,
+                    "hit_rate": round(
+                        self.review_cache_hits / (self.review_cache_hits + self.review_cache_misses), 3
+                    ) if (self.review_cache_hits + self.review_cache_misses) else 0,
+                },
+                "meta_cache": {
+                    "hits": self.meta_cache_hits,
+                    "misses": self.meta_cache_misses,
+                },
+                "review_coalescing": {
+                    "coalesced_requests": self.reviews_coalesced,
+                    "persona_calls_saved": self.coalesced_persona_calls_saved,
+                    "tokens_saved": self.coalesced_tokens_saved,
+                },
             }
 
 
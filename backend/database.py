@@ -1,9 +1,26 @@
+import hashlib
 import logging
-
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, Float, Boolean, ForeignKey, JSON
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship
 from datetime import datetime
 
+from sqlalchemy import (
+    DDL,
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    create_engine,
+    event,
+    text,
+)
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker, validates
+
 from core.config import get_settings
 
 logger = logging.getLogger("vos.db")
@@ -12,11 +29,28 @@ _settings = get_settings()
 DATABASE_URL = _settings.database_url
 
 
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    settings = get_settings()
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kb)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def apply_sqlite_profile(engine):
+    """Tune every connection ``engine`` opens (sync or async engine)."""
+    event.listen(getattr(engine, "sync_engine", engine), "connect", _sqlite_pragmas)
+    return engine
+
+
 def _build_engine(url: str):
     """Create a SQLAlchemy engine with driver-appropriate settings."""
     if url.startswith("sqlite"):
         # SQLite: single-threaded, no connection pool needed
-        return create_engine(url, connect_args={"check_same_thread": False})
+        return apply_sqlite_profile(create_engine(url, connect_args={"check_same_thread": False}))
     else:
         # PostgreSQL (or other): use connection pooling
         return create_engine(
@@ -27,18 +61,67 @@ def _build_engine(url: str):
         )
 
 
+def async_url(url: str) -> str:
+    """The same database through an asyncio driver: aiosqlite for SQLite, asyncpg for PostgreSQL."""
+    scheme, sep, rest = url.partition("://")
+    if scheme in ("sqlite", "sqlite+pysqlite"):
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if scheme in ("postgresql", "postgres", "postgresql+psycopg2"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+def _build_async_engine(url: str):
+    """Async engine for request handlers and review jobs (queries never block the event loop)."""
+    if url.startswith("sqlite"):
+        return apply_sqlite_profile(create_async_engine(async_url(url)))
+    return create_async_engine(async_url(url), pool_size=5, max_overflow=10, pool_pre_ping=True)
+
+
+# Sync engine: migrations, startup seeding and the thread-offloaded review cache
 engine = _build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = _build_async_engine(DATABASE_URL)
+# Objects stay usable after commit, since a response is often built from them afterwards
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+# Full-text search (services/search.py). PostgreSQL searches GIN indexes over
+# to_tsvector(); SQLite keeps an FTS5 index next to each searched table (see
+# fts5_ddl below). Queries must build the same to_tsvector() expressions, or
+# PostgreSQL won't use the indexes.
+SEARCH_LANGUAGE = "english"
+SEARCH_VECTORS = {
+    "documents": "title || ' ' || content",
+    "comments": "content",
+    "meta_comments": "content",
+}
+FTS_COLUMNS = {"documents": ("title", "content"), "comments": ("content",), "meta_comments": ("content",)}
+
+
+def tsvector_index(name: str, expression: str) -> Index:
+    """GIN index over ``to_tsvector(expression)``, created on PostgreSQL only."""
+    vector = text(f"to_tsvector('{SEARCH_LANGUAGE}', {expression})")
+    return Index(name, vector, postgresql_using="gin").ddl_if(dialect="postgresql")
+
 
 class DbDocument(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Document list pages, with and without archived documents (id breaks created_at ties)
+        Index("ix_documents_archived_created", "is_archived", "created_at", "id"),
+        Index("ix_documents_created", "created_at", "id"),
+        tsvector_index("ix_documents_search", SEARCH_VECTORS["documents"]),
+    )
 
     id = Column(String, primary_key=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     content = Column(Text, nullable=False)
+    # Derived from content on every write, so listings never have to load it
+    content_length = Column(Integer, default=0, nullable=False)
+    line_count = Column(Integer, default=0, nullable=False)
+    content_hash = Column(String, default="", nullable=False)
     repo_path = Column(String, nullable=True)
     is_archived = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -46,6 +129,16 @@ class DbDocument(Base):
 
     reviews = relationship("DbReview", back_populates="document", cascade="all, delete-orphan")
 
+    @validates("content")
+    def _set_content_stats(self, key, content):
+        self.content_length, self.line_count, self.content_hash = content_stats(content)
+        return content
+
+
+def content_stats(content: str) -> tuple[int, int, str]:
+    """``(length in characters, number of lines, sha256 hex)`` of a document body."""
+    return len(content), len(content.splitlines()), hashlib.sha256(content.encode("utf-8")).hexdigest()
+
 
 class DbPersona(Base):
     __tablename__ = "personas"
@@ -64,6 +157,10 @@ class DbPersona(Base):
 
 class DbReviewJob(Base):
     __tablename__ = "review_jobs"
+    __table_args__ = (
+        Index("ix_review_jobs_created", "created_at", "id"),  # job list pages
+        Index("ix_review_jobs_status", "status"),  # interrupted-job recovery
+    )
 
     id = Column(String, primary_key=True)
     document_id = Column(String, ForeignKey("documents.id"), nullable=False)
@@ -72,6 +169,11 @@ class DbReviewJob(Base):
     model = Column(String, nullable=True)
     trigger = Column(String, default="manual")  # manual, ci, webhook
     error_message = Column(Text, nullable=True)
+    # LLM token usage summed over all persona calls (cache_* from provider prompt caching)
+    input_tokens = Column(Integer, default=0, nullable=False)
+    output_tokens = Column(Integer, default=0, nullable=False)
+    cache_read_tokens = Column(Integer, default=0, nullable=False)
+    cache_write_tokens = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
 
@@ -80,12 +182,18 @@ class DbReviewJob(Base):
 
 class DbReview(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_document_created", "document_id", "created_at", "id"),  # review list pages
+        Index("ix_reviews_document_status_created", "document_id", "status", "created_at"),  # latest completed
+        Index("ix_reviews_job", "job_id"),
+    )
 
     id = Column(String, primary_key=True)
     document_id = Column(String, ForeignKey("documents.id"), nullable=False)
     job_id = Column(String, ForeignKey("review_jobs.id"), nullable=True)
     persona_ids = Column(JSON, nullable=False)
     status = Column(String, default="pending")  # pending, running, completed, failed
+    content_snapshot = Column(Text, nullable=True)  # document content as reviewed (for incremental re-review)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
 
@@ -100,6 +208,10 @@ class DbReview(Base):
 
 class DbComment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_review", "review_id"),
+        tsvector_index("ix_comments_search", SEARCH_VECTORS["comments"]),
+    )
 
     id = Column(String, primary_key=True)
     review_id = Column(String, ForeignKey("reviews.id"), nullable=False)
@@ -117,6 +229,10 @@ class DbComment(Base):
 
 class DbMetaComment(Base):
     __tablename__ = "meta_comments"
+    __table_args__ = (
+        Index("ix_meta_comments_review", "review_id"),
+        tsvector_index("ix_meta_comments_search", SEARCH_VECTORS["meta_comments"]),
+    )
 
     id = Column(String, primary_key=True)
     review_id = Column(String, ForeignKey("reviews.id"), nullable=False)
@@ -131,15 +247,80 @@ class DbMetaComment(Base):
     review = relationship("DbReview", back_populates="meta_comments")
 
 
+class DbReviewCacheEntry(Base):
+    __tablename__ = "review_cache"
+    __table_args__ = (
+        Index("ix_review_cache_last_used", "last_used_at"),  # LRU eviction
+        Index("ix_review_cache_created", "created_at"),  # TTL eviction
+    )
+
+    key = Column(String, primary_key=True)  # sha256 of (content, prompt, model, template version)
+    persona_id = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    comments = Column(JSON, nullable=False)  # [{content, start_line, end_line}]
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DbMetaCacheEntry(Base):
+    __tablename__ = "meta_cache"
+    __table_args__ = (
+        Index("ix_meta_cache_last_used", "last_used_at"),  # LRU eviction
+    )
+
+    key = Column(String, primary_key=True)  # sha256 of (comment set, persona weights, synthesizer)
+    model = Column(String, nullable=False)  # meta model, or "local"
+    comments = Column(JSON, nullable=False)  # MetaComment dumps
+    verdict = Column(String, nullable=False)
+    confidence = Column(Float, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+
+def fts5_ddl(table: str, columns: tuple[str, ...]) -> list[str]:
+    """FTS5 index over ``table`` and the triggers that keep it in sync.
+
+    The index has external content: it stores tokens only and reads text back
+    from ``table`` by rowid, so ``snippet()`` works without a second copy of
+    every comment. Rowids of tables without an INTEGER PRIMARY KEY may change
+    on VACUUM; ``services.search.search_index.repair()`` runs at startup and
+    rebuilds an index that no longer matches its table.
+    """
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {', '.join('new.' + c for c in columns)});"
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) "
+        f"VALUES ('delete', old.rowid, {', '.join('old.' + c for c in columns)});"
+    )
+    return [
+        (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{cols}, content='{table}', content_rowid='rowid', tokenize='porter unicode61')"
+        ),
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF {cols} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+
+for _table, _columns in FTS_COLUMNS.items():
+    for _statement in fts5_ddl(_table, _columns):
+        event.listen(Base.metadata.tables[_table], "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    # Triggers go with their table; the index table doesn't
+    event.listen(
+        Base.metadata.tables[_table], "before_drop", DDL(f"DROP TABLE IF EXISTS {_table}_fts").execute_if(dialect="sqlite")
+    )
+
+
 def init_db():
     Base.metadata.create_all(bind=engine)
     db_type = "PostgreSQL" if "postgresql" in DATABASE_URL else "SQLite"
     logger.info("Database initialized (%s)", db_type)
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,18 +1,23 @@
 import logging
 import sys
 
-from fastapi import FastAPI, Depends
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from api import api_router
 from core.config import get_settings
-from core.errors import VosError, vos_error_handler, unhandled_error_handler
+from core.errors import VosError, unhandled_error_handler, vos_error_handler
 from core.observability import RequestLoggingMiddleware, metrics
-from core.security import RateLimitMiddleware, CSRFMiddleware
-from database import init_db, get_db
+from core.security import CSRFMiddleware, RateLimitMiddleware
+from database import get_db, init_db
+from services.db_writer import db_writer
+from services.llm_client import llm_pool
+from services.llm_scheduler import llm_scheduler
+from services.review_jobs import review_jobs
 from services.review_service import seed_default_personas
+from services.search import search_index
 
 logging.basicConfig(
     level=logging.INFO,
@@ -52,12 +57,38 @@ app.include_router(api_router, prefix="/api/v1")
 
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     init_db()
     seed_default_personas()
+    await review_jobs.recover_interrupted()
+    if settings.search_repair_on_startup:
+        await search_index.repair()
     logging.getLogger("vos").info("VOS %s started (python %s)", VOS_VERSION, sys.version.split()[0])
 
 
+@app.on_event("startup")
+async def warm_llm_clients():
+    """Open pooled LLM connections so the first review skips the TLS handshake."""
+    if settings.llm_warm_on_startup and settings.anthropic_api_key:
+        await llm_pool.warm()
+
+
+@app.on_event("shutdown")
+async def stop_review_workers():
+    await review_jobs.shutdown()
+
+
+@app.on_event("shutdown")
+async def stop_db_writer():
+    # After the review workers, whose interrupted jobs still write their status
+    await db_writer.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await llm_pool.close()
+
+
 @app.get("/")
 async def root():
     return {
@@ -75,13 +106,13 @@ async def health():
 
 
 @app.get("/ready")
-async def readiness(db: Session = Depends(get_db)):
+async def readiness(db: AsyncSession = Depends(get_db)):
     """Readiness probe for container orchestration.
 
     Returns 200 only when the DB is reachable and the app can serve traffic.
     """
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         return {"ready": True}
     except Exception as e:
         from fastapi.responses import JSONResponse
@@ -91,4 +122,12 @@ async def readiness(db: Session = Depends(get_db)):
 @app.get("/api/v1/metrics")
 async def get_metrics():
     """Return in-memory request and review metrics."""
-    return metrics.snapshot()
+    snapshot = metrics.snapshot()
+    return {
+        **snapshot,
+        "llm_pool": llm_pool.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "review_jobs": review_jobs.stats(),
+        # Transaction counts and timings from the metrics, queue state from the writer
+        "db_writer": {**snapshot["db_writer"], **db_writer.stats()},
+    }
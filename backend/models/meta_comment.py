@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import List, Literal
 from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
 
 
 class MetaCommentSource(BaseModel):
@@ -15,7 +16,7 @@ class MetaComment(BaseModel):
     content: str
     start_line: int
     end_line: int
-    sources: List[MetaCommentSource]
+    sources: list[MetaCommentSource]
     category: str  # structure, clarity, technical, security, accessibility
     priority: str  # critical, high, medium, low
     created_at: datetime
@@ -26,6 +27,7 @@ class MetaComment(BaseModel):
 
 class MetaSynthesisResult(BaseModel):
     """Full result of meta synthesis including verdict and confidence."""
-    comments: List[MetaComment]
+    comments: list[MetaComment]
     verdict: Literal['ship_it', 'fix_first', 'major_rework']
     confidence: float  # 0.0 - 1.0, based on reviewer consensus
+    fallback: bool = False  # local findings after the LLM synthesis failed (not cached)
@@ -0,0 +1,78 @@
+"""Lookup structure over the persona comments of one meta synthesis.
+
+Comments are sorted by line once. Location groups come from a single sweep
+over that order, and "comments by these personas touching these lines"
+queries bisect a per-persona array of start lines instead of scanning every
+comment for every finding.
+"""
+from bisect import bisect_right
+from collections.abc import Iterable, Sequence
+
+
+class CommentIndex:
+    """Comments indexed by persona name and line interval (0-indexed, inclusive)."""
+
+    def __init__(self, comments: Iterable[dict]):
+        self.comments: list[dict] = sorted(comments, key=lambda c: (c["start_line"], c["end_line"]))
+        self._by_persona: dict[str, list[dict]] = {}
+        for c in self.comments:
+            self._by_persona.setdefault(c["persona_name"], []).append(c)
+        self._starts = {name: [c["start_line"] for c in cs] for name, cs in self._by_persona.items()}
+        # Any comment overlapping [a, b] starts within [a - longest span, b]
+        self._longest = {
+            name: max(c["end_line"] - c["start_line"] for c in cs) for name, cs in self._by_persona.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.comments)
+
+    def groups(self, gap: int = 2) -> list[dict]:
+        """Group comments whose line ranges overlap or are within ``gap`` lines."""
+        groups: list[dict] = []
+        for c in self.comments:
+            if groups and c["start_line"] <= groups[-1]["end_line"] + gap:
+                group = groups[-1]
+                group["end_line"] = max(group["end_line"], c["end_line"])
+                group["comments"].append(c)
+            else:
+                groups.append({"start_line": c["start_line"], "end_line": c["end_line"], "comments": [c]})
+        return groups
+
+    def by_persona(self, names: Iterable[str]) -> list[dict]:
+        """All comments by ``names``, in line order."""
+        wanted = set(names)
+        return [c for c in self.comments if c["persona_name"] in wanted]
+
+    def overlapping(self, names: Iterable[str], ranges: Sequence[Sequence[int]]) -> list[dict]:
+        """Comments by ``names`` that touch any of the ``(start, end)`` line ranges, in line order."""
+        found: dict[int, dict] = {}
+        for name in set(names):
+            starts = self._starts.get(name)
+            if not starts:
+                continue
+            comments = self._by_persona[name]
+            for start, end in ranges:
+                lo = bisect_right(starts, start - self._longest[name] - 1)
+                hi = bisect_right(starts, end)
+                for c in comments[lo:hi]:
+                    if c["end_line"] >= start:
+                        found[id(c)] = c
+        return sorted(found.values(), key=lambda c: (c["start_line"], c["end_line"]))
+
+    def attribute(
+        self,
+        names: Iterable[str],
+        ranges: Sequence[Sequence[int]] | None = None,
+    ) -> list[dict]:
+        """Comments a finding should cite: by ``names`` within ``ranges``.
+
+        Falls back to everything the personas said when the ranges match none
+        of their comments (e.g. the model cited slightly wrong line numbers),
+        so a finding never loses its attribution.
+        """
+        names = list(names)
+        if ranges:
+            matched = self.overlapping(names, ranges)
+            if matched:
+                return matched
+        return self.by_persona(names)
@@ -0,0 +1,127 @@
+"""Incremental parsers for streamed LLM responses.
+
+- ``StreamingCommentParser``: ``[PARAGRAPH N] comment`` blocks (persona reviews)
+- ``StreamingJsonArrayParser``: objects of a top-level JSON array (meta synthesis)
+"""
+import json
+import re
+
+_MARKER = re.compile(r'\[PARAGRAPH\s*(\d+)\]')
+_TERMINATOR = "[PARAGRAPH"
+
+
+class StreamingCommentParser:
+    """Split a response into comment blocks while tokens are still arriving.
+
+    A block is finished as soon as the next ``[PARAGRAPH`` marker starts, so
+    every comment except the last can be emitted before the stream ends.
+    Produces the same blocks as the one-shot regex
+    ``\\[PARAGRAPH\\s*(\\d+)\\]\\s*(.+?)(?=\\[PARAGRAPH|\\Z)``, minus empty ones.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._scan_from = 0  # where to resume searching for the terminator
+
+    def feed(self, text: str) -> list[tuple[int, str]]:
+        """Add streamed text and return any blocks that are now complete."""
+        self._buffer += text
+        blocks = []
+        while True:
+            marker = _MARKER.search(self._buffer)
+            if not marker:
+                # Keep a tail that might be the start of a split marker
+                keep = self._buffer.rfind("[")
+                self._buffer = self._buffer[keep:] if keep != -1 else ""
+                self._scan_from = 0
+                break
+            start = max(marker.end(), self._scan_from)
+            end = self._buffer.find(_TERMINATOR, start)
+            if end == -1:
+                # Drop the text before the marker, and rescan only the tail next
+                # time in case the terminator straddles the chunk boundary.
+                self._buffer = self._buffer[marker.start():]
+                marker_end = marker.end() - marker.start()
+                self._scan_from = max(marker_end, len(self._buffer) - len(_TERMINATOR) + 1)
+                break
+            body = self._buffer[marker.end():end].strip()
+            if body:
+                blocks.append((int(marker.group(1)), body))
+            self._buffer = self._buffer[end:]
+            self._scan_from = 0
+        return blocks
+
+    def close(self) -> list[tuple[int, str]]:
+        """Flush the final block once the stream has ended."""
+        blocks = []
+        marker = _MARKER.search(self._buffer)
+        if marker:
+            body = self._buffer[marker.end():].strip()
+            if body:
+                blocks.append((int(marker.group(1)), body))
+        self._buffer = ""
+        self._scan_from = 0
+        return blocks
+
+
+class StreamingJsonArrayParser:
+    """Yield the objects of a streamed JSON array as soon as each one closes.
+
+    Text before the opening ``[`` (a code fence or a sentence of preamble) is
+    ignored, as is anything after the closing ``]``. Objects that fail to
+    parse are skipped rather than aborting the rest of the array.
+    """
+
+    def __init__(self):
+        self._in_array = False
+        self._done = False
+        self._depth = 0  # nesting depth inside the array; 1 = element level
+        self._in_string = False
+        self._escaped = False
+        self._current: list[str] = []  # characters of the element object being read
+
+    def feed(self, text: str) -> list[dict]:
+        """Add streamed text and return any array elements that are now complete."""
+        items = []
+        for ch in text:
+            if self._done:
+                break
+            if not self._in_array:
+                if ch == "[":
+                    self._in_array = True
+                    self._depth = 1
+                continue
+            if self._depth > 1:
+                self._current.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 1 and ch == "{":
+                    self._current = [ch]
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._done = True
+                elif self._depth == 1 and self._current:
+                    item = self._decode("".join(self._current))
+                    if item is not None:
+                        items.append(item)
+                    self._current = []
+        return items
+
+    @staticmethod
+    def _decode(raw: str):
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            return None
+        return item if isinstance(item, dict) else None
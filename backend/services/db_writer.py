@@ -0,0 +1,133 @@
+"""Single writer for the application database.
+
+SQLite allows one writing connection at a time. Independent sessions that
+write concurrently queue on the file lock (up to ``busy_timeout``) and can
+still fail with "database is locked" when a reading transaction tries to
+upgrade to a write. So every application write goes through ``db_writer``.
+One task runs the writes in arrival order, and whatever queued up while the
+previous commit was in progress is committed together in one transaction
+(group commit). Reads keep their own sessions and, with WAL, never wait on
+the writer.
+
+A write is an ``async fn(session)``. Its return value comes back to the
+caller once the transaction has committed. If a batch fails, each write in
+it is retried on its own, so one bad write fails only its own caller.
+
+On databases with real concurrent writers (PostgreSQL), writes are not
+serialized: each runs in its own session right away.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from core.observability import metrics
+from database import DATABASE_URL, AsyncSessionLocal
+
+logger = logging.getLogger("vos.db.writer")
+
+T = TypeVar("T")
+Write = Callable[[AsyncSession], Awaitable[T]]
+
+
+class DbWriter:
+    def __init__(self, session_factory=AsyncSessionLocal, serialize: bool | None = None):
+        self.settings = get_settings()
+        self.session_factory = session_factory
+        if serialize is None:
+            serialize = self.settings.db_single_writer
+        self.serialize = DATABASE_URL.startswith("sqlite") if serialize is None else serialize
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._loop = None
+
+    async def write(self, fn: Write[T]) -> T:
+        """Run ``fn(session)`` in a write transaction and return its result once committed."""
+        if not self.serialize:
+            return (await self._commit([fn]))[0]
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((fn, future))
+        return await future
+
+    async def add(self, *objects):
+        """Insert ORM objects (they stay usable afterwards: sessions don't expire on commit)."""
+        async def add_all(db: AsyncSession):
+            db.add_all(objects)
+
+        await self.write(add_all)
+
+    def stats(self) -> dict:
+        return {"serialized": self.serialize, "queued": self._queue.qsize() if self._queue else 0}
+
+    async def shutdown(self):
+        """Finish the queued writes, then stop the writer task."""
+        if self._task is not None:
+            if self._loop is asyncio.get_running_loop() and not self._task.done():
+                await self._queue.join()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _ensure_worker(self):
+        # asyncio primitives are bound to one event loop; restart the writer if it changed
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._worker())
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.settings.db_writer_max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                live = [(fn, future) for fn, future in batch if not future.cancelled()]
+                if live:
+                    await self._run(live)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _run(self, batch: list[tuple[Write, asyncio.Future]]):
+        started = time.perf_counter()
+        try:
+            results = await self._commit([fn for fn, _ in batch])
+        except Exception as e:  # noqa: BLE001 - handed to the callers' futures
+            if len(batch) == 1:
+                _settle(batch[0][1], error=e)
+            else:
+                logger.warning("Write batch of %d failed; retrying the writes one by one", len(batch))
+                for fn, future in batch:
+                    try:
+                        _settle(future, result=(await self._commit([fn]))[0])
+                    except Exception as single_error:  # noqa: BLE001 - handed to the caller's future
+                        _settle(future, error=single_error)
+        else:
+            for (_, future), result in zip(batch, results):
+                _settle(future, result=result)
+        metrics.record_db_write_batch(len(batch), time.perf_counter() - started)
+
+    async def _commit(self, fns: list[Write]) -> list:
+        async with self.session_factory() as db:
+            results = [await fn(db) for fn in fns]
+            await db.commit()
+        return results
+
+
+def _settle(future: asyncio.Future, result=None, error: BaseException | None = None):
+    if future.done():  # the caller went away
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+db_writer = DbWriter()
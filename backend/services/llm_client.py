@@ -0,0 +1,128 @@
+"""Process-wide LLM client layer.
+
+Every LLM call shares one pooled client per provider, so HTTP connections and
+TLS sessions are reused across persona calls. Admission, per-model
+concurrency and retries live in ``services.llm_scheduler``.
+
+The default provider comes from ``llm_provider``; ``mock`` swaps in the
+offline ``services.mock_llm.MockAnthropicClient``.
+"""
+import asyncio
+import logging
+from threading import Lock
+
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+from core.config import get_settings
+from services.mock_llm import MockAnthropicClient
+
+logger = logging.getLogger("vos.llm")
+
+
+class LLMClientPool:
+    """One pooled, pre-warmed client per provider."""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._clients: dict[str, AsyncAnthropic] = {}
+        self._http_clients: dict[str, httpx.AsyncClient] = {}
+        self._lock = Lock()
+        self._warmed: dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    # Clients
+    # ------------------------------------------------------------------
+    def get_client(self, provider: str | None = None) -> AsyncAnthropic:
+        """Return the shared client for ``provider`` (default ``llm_provider``), creating it on first use."""
+        provider = provider or self.settings.llm_provider
+        client = self._clients.get(provider)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(provider)
+                if client is None:
+                    client = self._build_client(provider)
+                    self._clients[provider] = client
+        return client
+
+    def _build_client(self, provider: str) -> AsyncAnthropic:
+        if provider == "mock":
+            logger.info("Using the mock LLM provider")
+            return MockAnthropicClient(self.settings)
+        if provider != "anthropic":
+            raise ValueError(f"Unknown LLM provider '{provider}'")
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=self.settings.llm_max_connections,
+                max_keepalive_connections=self.settings.llm_max_keepalive_connections,
+                keepalive_expiry=self.settings.llm_keepalive_seconds,
+            ),
+            timeout=httpx.Timeout(self.settings.llm_timeout_seconds, connect=10.0),
+        )
+        self._http_clients[provider] = http_client
+        logger.info(
+            "Created pooled %s client (max_connections=%d)",
+            provider, self.settings.llm_max_connections,
+        )
+        # Retries are owned by the scheduler so 429s feed its global backoff
+        return AsyncAnthropic(
+            api_key=self.settings.anthropic_api_key,
+            http_client=http_client,
+            max_retries=0,
+        )
+
+    async def warm(self, provider: str | None = None):
+        """Open keep-alive connections ahead of the first review.
+
+        Any HTTP response (even 404) means the TCP+TLS handshake is done and the
+        connection is back in the pool; failures are logged and ignored.
+        """
+        provider = provider or self.settings.llm_provider
+        client = self.get_client(provider)
+        http_client = self._http_clients.get(provider)
+        if http_client is None:
+            return
+        count = self.settings.llm_warm_connections
+
+        async def touch():
+            try:
+                await http_client.head(str(client.base_url))
+                return True
+            except Exception as e:  # noqa: BLE001 - warm-up is best effort
+                logger.warning("LLM connection warm-up failed (%s): %s", provider, e)
+                return False
+
+        results = await asyncio.gather(*(touch() for _ in range(count)))
+        self._warmed[provider] = sum(results)
+        logger.info("Warmed %d/%d %s connections", sum(results), count, provider)
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+        self._http_clients.clear()
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+    def _open_connections(self, provider: str) -> int | None:
+        """Best-effort count of pooled connections (httpx does not expose this publicly)."""
+        http_client = self._http_clients.get(provider)
+        pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        return len(connections) if connections is not None else None
+
+    def stats(self) -> dict:
+        return {
+            "providers": {
+                provider: {
+                    "open_connections": self._open_connections(provider),
+                    "max_connections": self.settings.llm_max_connections,
+                    "warmed_connections": self._warmed.get(provider, 0),
+                }
+                for provider in self._clients
+            },
+        }
+
+
+llm_pool = LLMClientPool()
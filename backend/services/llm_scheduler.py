@@ -0,0 +1,294 @@
+"""Global LLM request scheduler.
+
+Every LLM call in the review and meta services is admitted here. Admission
+enforces three limits:
+
+- requests-per-minute and tokens-per-minute token buckets shared by all calls
+- a max in-flight count per model
+- priority order: interactive reviews are admitted ahead of CI/webhook ones
+
+Rate-limit (429) responses pause admission for everyone and are retried with
+exponential backoff plus jitter.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+from core.config import get_settings
+from core.errors import LLMRateLimitError, classify_anthropic_error
+
+logger = logging.getLogger("vos.llm.scheduler")
+
+T = TypeVar("T")
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+_TRIGGER_PRIORITIES = {
+    "manual": PRIORITY_INTERACTIVE,
+    "ci": PRIORITY_BATCH,
+    "webhook": PRIORITY_BATCH,
+}
+
+
+def priority_for_trigger(trigger: str | None) -> int:
+    return _TRIGGER_PRIORITIES.get(trigger or "manual", PRIORITY_INTERACTIVE)
+
+
+def estimate_tokens(*texts: str, max_tokens: int = 0) -> int:
+    """Rough token estimate (4 chars/token) for budget accounting."""
+    return sum(len(t) for t in texts) // 4 + max_tokens
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    A non-positive ``per_minute`` disables the limit.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        if not self.unlimited:
+            self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class _Ticket:
+    __slots__ = ("model", "priority", "seq", "tokens")
+
+    def __init__(self, priority: int, seq: int, model: str, tokens: int):
+        self.priority = priority
+        self.seq = seq
+        self.model = model
+        self.tokens = tokens
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMScheduler:
+    """Priority admission queue with RPM/TPM budgets, per-model limits and 429 backoff."""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._requests = TokenBucket(self.settings.llm_requests_per_minute)
+        self._tokens = TokenBucket(self.settings.llm_tokens_per_minute)
+        self._queue: list[_Ticket] = []
+        self._seq = itertools.count()
+        self._in_flight: dict[str, int] = defaultdict(int)
+        self._paused_until = 0.0
+        self._cond: asyncio.Condition | None = None
+        self._loop = None
+        # Stats
+        self._admitted: dict[str, int] = defaultdict(int)
+        self._max_queue_depth = 0
+        self._wait_times: list[float] = []
+        self.rate_limited = 0
+        self.retries = 0
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives are bound to one event loop; rebuild if it changed
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._cond = asyncio.Condition()
+            self._loop = loop
+        return self._cond
+
+    def limit_for(self, model: str) -> int:
+        return self.settings.llm_model_max_in_flight.get(model, self.settings.llm_max_in_flight_per_model)
+
+    def _next_eligible(self) -> _Ticket | None:
+        """Highest-priority queued ticket whose model has a free slot."""
+        for ticket in sorted(self._queue):
+            if self._in_flight[ticket.model] < self.limit_for(ticket.model):
+                return ticket
+        return None
+
+    def _reserve(self, tokens: int) -> float:
+        """Take budget for one request, or return how long to wait for it."""
+        wait = max(
+            self._paused_until - time.monotonic(),
+            self._requests.wait_time(1),
+            self._tokens.wait_time(tokens),
+        )
+        if wait > 0:
+            return wait
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        return 0.0
+
+    def _dequeue(self, ticket: _Ticket):
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        model: str,
+        est_tokens: int,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> AsyncIterator[float]:
+        """Wait for admission, then hold an in-flight slot. Yields the queue wait in seconds."""
+        cond = self._condition()
+        ticket = _Ticket(priority, next(self._seq), model, est_tokens)
+        enqueued = time.monotonic()
+        async with cond:
+            heapq.heappush(self._queue, ticket)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            try:
+                while True:
+                    timeout = None
+                    if self._next_eligible() is ticket:
+                        timeout = self._reserve(est_tokens)
+                        if timeout == 0:
+                            break
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout)
+                    except TimeoutError:
+                        pass
+            except BaseException:
+                self._dequeue(ticket)
+                cond.notify_all()
+                raise
+            self._dequeue(ticket)
+            self._in_flight[model] += 1
+            self._admitted[model] += 1
+            cond.notify_all()
+
+        waited = time.monotonic() - enqueued
+        self._wait_times.append(waited)
+        if len(self._wait_times) > 1000:
+            self._wait_times = self._wait_times[-1000:]
+        try:
+            yield waited
+        finally:
+            async with cond:
+                self._in_flight[model] -= 1
+                cond.notify_all()
+
+    def settle(self, est_tokens: int, actual_tokens: int):
+        """Correct the token bucket once the real usage of a call is known."""
+        if actual_tokens < est_tokens:
+            self._tokens.give_back(est_tokens - actual_tokens)
+        elif actual_tokens > est_tokens:
+            self._tokens.take(actual_tokens - est_tokens)
+
+    def retry_delay(self, exc: Exception, attempt: int) -> float | None:
+        """Backoff before retry ``attempt`` (1-based), or None if ``exc`` is not retryable.
+
+        A rate-limit error also pauses admission for every queued call.
+        """
+        if not isinstance(classify_anthropic_error(exc), LLMRateLimitError):
+            return None
+        self.rate_limited += 1
+        if attempt > self.settings.llm_max_retries:
+            return None
+        backoff = min(
+            self.settings.llm_backoff_max_seconds,
+            self.settings.llm_backoff_base_seconds * (2 ** (attempt - 1)),
+        )
+        delay = backoff * random.uniform(0.5, 1.5)
+        retry_after = _retry_after_seconds(exc)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self.retries += 1
+        logger.warning("LLM rate limited; retry %d in %.1fs", attempt, delay)
+        return delay
+
+    async def run(
+        self,
+        model: str,
+        est_tokens: int,
+        call: Callable[[], Awaitable[T]],
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> T:
+        """Run a non-streaming LLM call under admission control, retrying on 429."""
+        attempt = 0
+        while True:
+            try:
+                async with self.admit(model, est_tokens, priority):
+                    return await call()
+            except Exception as e:
+                attempt += 1
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        waits = sorted(self._wait_times) if self._wait_times else [0]
+        models = sorted(set(self._in_flight) | set(self._admitted) | {t.model for t in self._queue})
+        return {
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self._max_queue_depth,
+            "queue_wait_ms": {
+                "p50": round(waits[len(waits) // 2] * 1000, 1),
+                "p95": round(waits[int(len(waits) * 0.95)] * 1000, 1),
+            },
+            "budgets": {
+                "requests_per_minute": self.settings.llm_requests_per_minute,
+                "requests_available": None if self._requests.unlimited else int(self._requests.level),
+                "tokens_per_minute": self.settings.llm_tokens_per_minute,
+                "tokens_available": None if self._tokens.unlimited else int(self._tokens.level),
+            },
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "models": {
+                model: {
+                    "limit": self.limit_for(model),
+                    "in_flight": self._in_flight[model],
+                    "queued": sum(1 for t in self._queue if t.model == model),
+                    "admitted": self._admitted[model],
+                }
+                for model in models
+            },
+        }
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+llm_scheduler = LLMScheduler()
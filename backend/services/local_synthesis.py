@@ -0,0 +1,190 @@
+"""Deterministic meta synthesis without an LLM.
+
+Used for small reviews (where a model call costs seconds for little gain) and
+as the degraded mode when LLM synthesis fails:
+
+- comments are vectorized with TF-IDF (NumPy) and clustered: near-duplicates
+  anywhere in the document merge, and looser matches merge within one
+  location group
+- each cluster becomes one finding, worded after its most central comment
+- category comes from keywords plus the contributing personas' focus areas,
+  priority from severity keywords plus reviewer consensus
+"""
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+# Cosine similarity needed to merge two comments anywhere in the document,
+# and (lower) within the same location group
+DUPLICATE_SIMILARITY = 0.5
+GROUP_SIMILARITY = 0.2
+MAX_FEATURES = 2000  # vocabulary cap, bounds memory for very large inputs
+_BLOCK = 512  # rows of the similarity matrix computed at a time
+
+_STOPWORDS = frozenset(["a", "about", "above", "after", "again", "all", "also", "an", "and", "any", "are", "as", "at", "be", "because", "been", "before", "being", "below", "between", "both", "but", "by", "can", "could", "did", "do", "does", "doing", "down", "during", "each", "few", "for", "from", "further", "had", "has", "have", "having", "here", "how", "i", "if", "in", "into", "is", "it", "its", "itself", "just", "more", "most", "no", "nor", "not", "now", "of", "off", "on", "once", "only", "or", "other", "our", "out", "over", "own", "same", "should", "so", "some", "such", "than", "that", "the", "their", "them", "then", "there", "these", "they", "this", "those", "through", "to", "too", "under", "until", "up", "very", "was", "we", "were", "what", "when", "where", "which", "while", "who", "why", "will", "with", "would", "you", "your"])
+
+CATEGORY_KEYWORDS: dict[str, Sequence[str]] = {
+    "security": ("secur", "vulnerab", "inject", "credential", "password", "secret", "auth", "encrypt",
+                 "privacy", "xss", "csrf", "leak", "exploit", "permission", "api key", "private key", "hardcoded"),
+    "technical": ("perform", "scal", "latenc", "architect", "algorithm", "complexit", "bug", "race",
+                  "cache", "memory", "database", "api", "error handling", "evidence", "data", "assum", "logic"),
+    "clarity": ("unclear", "confus", "ambig", "jargon", "defin", "explain", "vague", "clarif",
+                "hard to follow", "understand", "acronym", "example"),
+    "structure": ("structur", "section", "order", "organiz", "flow", "heading", "intro", "conclusion",
+                  "transition", "move", "split", "merge", "duplicat", "repeat"),
+    "accessibility": ("accessib", "alt text", "contrast", "screen reader", "wcag", "inclusiv", "usabil"),
+    "style": ("tone", "wording", "phrase", "concise", "verbose", "typo", "grammar", "style", "passive"),
+}
+
+# Persona focus areas (lower-cased) that hint at a category
+FOCUS_CATEGORIES: dict[str, str] = {
+    "security": "security", "privacy": "security", "authentication": "security",
+    "vulnerabilities": "security", "compliance": "security",
+    "architecture": "technical", "scalability": "technical", "performance": "technical",
+    "design patterns": "technical", "logic": "technical", "evidence": "technical", "assumptions": "technical",
+    "confusion": "clarity", "jargon": "clarity", "engagement": "clarity",
+    "accessibility": "accessibility", "inclusivity": "accessibility", "wcag": "accessibility",
+    "usability": "accessibility",
+    "craft": "style",
+}
+
+PRIORITY_KEYWORDS: dict[str, Sequence[str]] = {
+    "critical": ("vulnerab", "inject", "credential", "secret", "password", "data loss", "crash",
+                 "exploit", "breach", "leak", "api key", "private key", "hardcoded"),
+    "high": ("incorrect", "wrong", "missing", "bug", "broken", "fail", "must", "contradict",
+             "misleading", "inaccurate", "error"),
+    "low": ("typo", "minor", "nit", "consider", "might", "perhaps", "optional", "wording", "style"),
+}
+PRIORITIES = ["low", "medium", "high", "critical"]
+
+
+def stem(word: str) -> str:
+    """Crude suffix folding: enough to match "define"/"defined" or "retry"/"retried"."""
+    if len(word) > 4 and word.endswith(("ies", "ied")):
+        return word[:-3] + "y"
+    if len(word) > 5 and word.endswith("ing"):
+        word = word[:-3]
+    elif len(word) > 4 and word.endswith("ed"):
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    if len(word) > 4 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        stem(word) for word in re.findall(r"[a-z0-9]+", text.lower())
+        if len(word) >= 3 and word not in _STOPWORDS
+    ]
+
+
+def tfidf_matrix(texts: Sequence[str]) -> np.ndarray:
+    """L2-normalized TF-IDF rows (sublinear tf, smoothed idf), one per text."""
+    docs = [Counter(tokenize(t)) for t in texts]
+    df = Counter(term for doc in docs for term in doc)
+    vocab = {term: i for i, (term, _) in enumerate(df.most_common(MAX_FEATURES))}
+    matrix = np.zeros((len(texts), len(vocab)), dtype=np.float32)
+    for row, doc in enumerate(docs):
+        for term, count in doc.items():
+            col = vocab.get(term)
+            if col is not None:
+                matrix[row, col] = 1.0 + math.log(count)
+    n = len(texts)
+    idf = np.array(
+        [math.log((1 + n) / (1 + df[term])) + 1.0 for term in vocab], dtype=np.float32
+    ) if vocab else np.zeros(0, dtype=np.float32)
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cluster(matrix: np.ndarray, group_ids: Sequence[int]) -> list[list[int]]:
+    """Connected components over "similar enough" pairs; clusters ordered by first member."""
+    n = matrix.shape[0]
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    groups = np.asarray(group_ids)
+    for lo in range(0, n, _BLOCK):
+        sims = matrix[lo:lo + _BLOCK] @ matrix.T
+        same_group = groups[lo:lo + _BLOCK, None] == groups[None, :]
+        linked = (sims >= DUPLICATE_SIMILARITY) | (same_group & (sims >= GROUP_SIMILARITY))
+        for i, j in zip(*np.nonzero(linked)):
+            a, b = find(lo + int(i)), find(int(j))
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+
+    members: dict[int, list[int]] = {}
+    for i in range(n):
+        members.setdefault(find(i), []).append(i)
+    return sorted(members.values(), key=lambda m: m[0])
+
+
+def representative(matrix: np.ndarray, members: Sequence[int], weights: Sequence[float]) -> int:
+    """Member most similar to the rest of its cluster, weighted by reviewer weight."""
+    if len(members) == 1:
+        return members[0]
+    sub = matrix[list(members)]
+    centrality = (sub @ sub.T).sum(axis=1) * np.asarray([weights[m] for m in members])
+    return members[int(np.argmax(centrality))]
+
+
+def _hits(text: str, keywords: Iterable[str]) -> int:
+    return sum(1 for k in keywords if k in text)
+
+
+def infer_category(texts: Sequence[str], focus_areas: Sequence[Sequence[str]]) -> str:
+    """Best-scoring category: keyword hits, plus half a vote per matching persona focus area."""
+    scores = Counter()
+    for text, focus in zip(texts, focus_areas):
+        lowered = text.lower()
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            scores[category] += _hits(lowered, keywords)
+        for area in focus:
+            category = FOCUS_CATEGORIES.get(area.lower())
+            if category:
+                scores[category] += 0.5
+    if not scores or max(scores.values()) == 0:
+        return "clarity"
+    # Ties resolve in CATEGORY_KEYWORDS order
+    return max(CATEGORY_KEYWORDS, key=lambda c: scores[c])
+
+
+def infer_priority(texts: Sequence[str], consensus: float) -> str:
+    """Severity from keywords; agreement between several reviewers raises it one level (not to critical)."""
+    lowered = [t.lower() for t in texts]
+    if any(_hits(t, PRIORITY_KEYWORDS["critical"]) for t in lowered):
+        return "critical"
+    if any(_hits(t, PRIORITY_KEYWORDS["high"]) for t in lowered):
+        priority = "high"
+    elif all(_hits(t, PRIORITY_KEYWORDS["low"]) for t in lowered):
+        priority = "low"
+    else:
+        priority = "medium"
+    if consensus >= 3 and priority in ("low", "medium"):
+        priority = PRIORITIES[PRIORITIES.index(priority) + 1]
+    return priority
+
+
+def summarize(text: str, limit: int = 200) -> str:
+    """First sentence of ``text``, cut at ``limit`` characters."""
+    text = " ".join(text.split())
+    sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(sentence) > limit:
+        sentence = sentence[:limit - 1].rsplit(" ", 1)[0] + "…"
+    return sentence
+
+
+def priority_rank(priority: str | None) -> int:
+    return PRIORITIES.index(priority) if priority in PRIORITIES else 1
@@ -0,0 +1,113 @@
+"""Persistent, content-addressed cache of meta-review syntheses.
+
+A synthesis is fully determined by the persona comments that feed it, the
+persona weights and the synthesizer (model, or the local one). Keying on
+those instead of the review id lets re-runs of an unchanged document reuse
+an earlier review's meta review.
+
+``load`` reads through the caller's session and records the hit through the
+single writer. ``store`` runs inside the caller's write transaction, so a
+synthesis is cached atomically with the review it was saved on.
+"""
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from core.observability import metrics
+from database import DbMetaCacheEntry
+from models.meta_comment import MetaComment, MetaSynthesisResult
+from services.db_writer import db_writer
+
+logger = logging.getLogger("vos.meta.cache")
+
+
+def meta_cache_key(comments: list[dict], persona_weights: dict[str, float] | None, model: str) -> str:
+    """Stable key for the synthesis of ``comments``: order and comment ids do not matter."""
+    payload = {
+        "comments": sorted(
+            (c["persona_id"], c["content"], c["start_line"], c["end_line"]) for c in comments
+        ),
+        "weights": sorted((persona_weights or {}).items()),
+        "model": model,
+    }
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _is_expired(entry: DbMetaCacheEntry, now: datetime) -> bool:
+    ttl = get_settings().meta_cache_ttl_seconds
+    return ttl > 0 and entry.created_at < now - timedelta(seconds=ttl)
+
+
+async def load(db: AsyncSession, key: str) -> MetaSynthesisResult | None:
+    """The cached synthesis for ``key`` with fresh finding ids, or None on a miss."""
+    if not get_settings().meta_cache_enabled:
+        return None
+    entry = await db.get(DbMetaCacheEntry, key)
+    now = datetime.utcnow()
+    if entry and _is_expired(entry, now):
+        await db_writer.write(lambda w: w.execute(delete(DbMetaCacheEntry).where(DbMetaCacheEntry.key == key)))
+        entry = None
+    if not entry:
+        metrics.record_meta_cache_lookup(hit=False)
+        return None
+
+    await db_writer.write(lambda w: w.execute(
+        update(DbMetaCacheEntry)
+        .where(DbMetaCacheEntry.key == key)
+        .values(hit_count=DbMetaCacheEntry.hit_count + 1, last_used_at=now)
+    ))
+    metrics.record_meta_cache_lookup(hit=True)
+    # Findings are stored per review, so each copy needs its own ids
+    comments = [
+        MetaComment.model_validate({**data, "id": str(uuid.uuid4())[:8], "created_at": now})
+        for data in entry.comments
+    ]
+    return MetaSynthesisResult(comments=comments, verdict=entry.verdict, confidence=entry.confidence)
+
+
+async def store(db: AsyncSession, key: str, model: str, result: MetaSynthesisResult):
+    """Add (or replace) the synthesis for ``key``; committed with the caller's (writer) transaction."""
+    settings = get_settings()
+    if not settings.meta_cache_enabled:
+        return
+    now = datetime.utcnow()
+    comments = [mc.model_dump(mode="json") for mc in result.comments]
+    entry = await db.get(DbMetaCacheEntry, key)
+    if entry:
+        entry.comments = comments
+        entry.verdict = result.verdict
+        entry.confidence = result.confidence
+        entry.created_at = now
+        entry.last_used_at = now
+    else:
+        db.add(DbMetaCacheEntry(
+            key=key,
+            model=model,
+            comments=comments,
+            verdict=result.verdict,
+            confidence=result.confidence,
+            hit_count=0,
+            created_at=now,
+            last_used_at=now,
+        ))
+    await db.flush()
+
+    max_entries = settings.meta_cache_max_entries
+    if max_entries > 0:
+        overflow = await db.scalar(select(func.count()).select_from(DbMetaCacheEntry)) - max_entries
+        if overflow > 0:
+            stale_keys = list(await db.scalars(
+                select(DbMetaCacheEntry.key).order_by(DbMetaCacheEntry.last_used_at.asc()).limit(overflow)
+            ))
+            await db.execute(
+                delete(DbMetaCacheEntry).where(DbMetaCacheEntry.key.in_(stale_keys)).execution_options(
+                    synchronize_session=False
+                )
+            )
+            logger.info("Meta cache evicted %d entries", len(stale_keys))
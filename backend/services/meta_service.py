@@ -1,16 +1,28 @@
+import asyncio
+import json
 import logging
 import uuid
-import json
+from collections.abc import AsyncIterator, Callable
 from datetime import datetime
-from typing import List
-from anthropic import AsyncAnthropic
 
 from core.config import get_settings
 from core.errors import classify_anthropic_error
 from models.meta_comment import MetaComment, MetaCommentSource, MetaSynthesisResult
+from services import local_synthesis, meta_cache
+from services.comment_index import CommentIndex
+from services.comment_parser import StreamingJsonArrayParser
+from services.db_writer import db_writer
+from services.llm_client import llm_pool
+from services.llm_scheduler import estimate_tokens, llm_scheduler
+from services.review_service import PERSONAS, REVIEW_ERROR_PREFIX
 
 logger = logging.getLogger("vos.meta")
 
+META_MODEL = "claude-sonnet-4-5-20250929"
+
+# Focus areas of the built-in personas, a category hint for the local synthesizer
+_PERSONA_FOCUS = {p.id: p.focus_areas for p in PERSONAS}
+
 
 class MetaService:
     """Synthesizes individual persona comments into unified meta-review feedback."""
@@ -19,35 +31,10 @@ class MetaService:
         self.settings = get_settings()
 
     def _group_comments_by_location(self, comments: list[dict]) -> list[dict]:
-        """Group comments that target overlapping or adjacent line ranges."""
-        if not comments:
-            return []
-
-        sorted_comments = sorted(comments, key=lambda c: (c["start_line"], c["end_line"]))
-        groups = []
-        current_group = {
-            "start_line": sorted_comments[0]["start_line"],
-            "end_line": sorted_comments[0]["end_line"],
-            "comments": [sorted_comments[0]],
-        }
-
-        for comment in sorted_comments[1:]:
-            # Merge if overlapping or adjacent (within 2 lines)
-            if comment["start_line"] <= current_group["end_line"] + 2:
-                current_group["end_line"] = max(current_group["end_line"], comment["end_line"])
-                current_group["comments"].append(comment)
-            else:
-                groups.append(current_group)
-                current_group = {
-                    "start_line": comment["start_line"],
-                    "end_line": comment["end_line"],
-                    "comments": [comment],
-                }
-
-        groups.append(current_group)
-        return groups
+        """Group comments that target overlapping or adjacent (within 2 lines) line ranges."""
+        return CommentIndex(comments).groups()
 
-    def _compute_verdict(self, meta_comments: List[MetaComment]) -> str:
+    def _compute_verdict(self, meta_comments: list[MetaComment]) -> str:
         """Determine verdict based on highest priority issue found."""
         priorities = {mc.priority for mc in meta_comments}
         if "critical" in priorities:
@@ -56,7 +43,7 @@ class MetaService:
             return "fix_first"
         return "ship_it"
 
-    def _compute_confidence(self, meta_comments: List[MetaComment], total_personas: int) -> float:
+    def _compute_confidence(self, meta_comments: list[MetaComment], total_personas: int) -> float:
         """Compute confidence score based on reviewer consensus.
 
         Higher confidence when more reviewers agree on findings.
@@ -74,23 +61,10 @@ class MetaService:
         # Average consensus across all findings
         return round(sum(consensus_scores) / len(consensus_scores), 2)
 
-    async def synthesize(self, comments: list[dict], persona_weights: dict[str, float] | None = None) -> MetaSynthesisResult:
-        """Take all persona comments and synthesize into meta-review with verdict.
-
-        Args:
-            comments: List of comment dicts with persona_id, persona_name, etc.
-            persona_weights: Optional mapping of persona_id -> weight (float).
-        """
-        if not comments:
-            return MetaSynthesisResult(comments=[], verdict="ship_it", confidence=0.0)
-
-        groups = self._group_comments_by_location(comments)
-
-        # Count unique personas
-        total_personas = len({c["persona_id"] for c in comments})
-
+    def _build_prompt(self, groups: list[dict], persona_weights: dict[str, float] | None) -> str:
+        """Synthesis prompt for comment groups (all of them, or one map batch)."""
         # Build persona_id -> name mapping for weight display
-        id_to_name = {c["persona_id"]: c["persona_name"] for c in comments}
+        id_to_name = {c["persona_id"]: c["persona_name"] for group in groups for c in group["comments"]}
 
         # Build the prompt for Claude
         groups_text = ""
@@ -145,115 +119,549 @@ JSON array. Each element:
 Return ONLY the JSON array.
 {weight_guidance}
 {groups_text}"""
+        return prompt
 
-        client = AsyncAnthropic(api_key=self.settings.anthropic_api_key)
+    def _batches(self, groups: list[dict]) -> list[list[dict]]:
+        """Split location groups into map batches of at most ``meta_batch_comments`` comments.
 
-        try:
-            message = await client.messages.create(
-                model="claude-sonnet-4-5-20250929",
+        Groups are never split, so a single oversized group forms its own batch.
+        """
+        limit = max(1, self.settings.meta_batch_comments)
+        batches: list[list[dict]] = []
+        current: list[dict] = []
+        size = 0
+        for group in groups:
+            n = len(group["comments"])
+            if current and size + n > limit:
+                batches.append(current)
+                current, size = [], 0
+            current.append(group)
+            size += n
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _complete_json(self, prompt: str) -> list:
+        """One non-streaming synthesis call, parsed as a JSON array."""
+        client = llm_pool.get_client()
+        model = META_MODEL
+        message = await llm_scheduler.run(
+            model,
+            estimate_tokens(prompt, max_tokens=2048),
+            lambda: client.messages.create(
+                model=model,
                 max_tokens=2048,
                 messages=[{"role": "user", "content": prompt}],
+            ),
+        )
+
+        response_text = message.content[0].text.strip()
+        # Strip markdown code fences if present (```json ... ``` or ``` ... ```)
+        if response_text.startswith("```"):
+            # Remove opening fence line
+            response_text = response_text.split("\n", 1)[1] if "\n" in response_text else response_text[3:]
+            # Remove closing fence
+            response_text = response_text.rsplit("```", 1)[0].strip()
+
+        return json.loads(response_text)
+
+    async def _map(self, batches: list[list[dict]], persona_weights: dict[str, float] | None) -> list[MetaComment]:
+        """Synthesize each batch on its own; returns the partial findings in batch order."""
+        semaphore = asyncio.Semaphore(max(1, self.settings.meta_batch_parallelism))
+
+        async def run(batch: list[dict]) -> list[MetaComment]:
+            async with semaphore:
+                try:
+                    items = await self._complete_json(self._build_prompt(batch, persona_weights))
+                except Exception as e:
+                    vos_err = classify_anthropic_error(e)
+                    logger.exception("Meta synthesis batch failed [%s]: %s", vos_err.code, vos_err.message)
+                    return self._fallback_synthesis(batch, persona_weights)
+                index = CommentIndex(c for group in batch for c in group["comments"])
+                return [self._to_meta_comment(item, batch, index) for item in items]
+
+        partials = await asyncio.gather(*(run(batch) for batch in batches))
+        return [mc for batch_findings in partials for mc in batch_findings]
+
+    def _build_reduce_prompt(self, partials: list[MetaComment]) -> str:
+        """Prompt that merges the partial findings of all map batches."""
+        findings_text = ""
+        for i, mc in enumerate(partials):
+            names = ", ".join(sorted({s.persona_name for s in mc.sources}))
+            findings_text += f"\n--- FINDING {i} (lines {mc.start_line+1}-{mc.end_line+1}) ---\n"
+            findings_text += f"[{mc.category}/{mc.priority}] {mc.content} (from: {names})\n"
+
+        return f"""You are a meta-reviewer merging partial checklists into one. Each partial checklist was synthesized from reviewer feedback on a different part of the same document.
+
+Rules:
+- MERGE findings that ask for the same action, even across distant parts of the document.
+- Each finding MUST be an imperative action item starting with a verb. ONE sentence, two max if critical.
+- Total output: aim for 3-7 findings for the entire document. Fewer is better.
+- Keep the highest priority among the findings you merge.
+- Drop findings that are just style preference or nitpicking.
+
+Categories: security, technical, clarity, structure, accessibility, style
+Priorities: critical, high, medium, low
+
+JSON array. Each element:
+- "content": the action item (imperative sentence starting with a verb)
+- "category": category
+- "priority": priority
+- "merged_from": indices of the FINDINGs merged into this one
+- "line_ranges": array of [start, end] pairs this finding covers (for highlighting)
+
+Return ONLY the JSON array.
+{findings_text}"""
+
+    def _from_reduced(self, item: dict, partials: list[MetaComment]) -> MetaComment:
+        """MetaComment for a reduce-pass item, attributed to the original comments of the partials it merges."""
+        merged = [partials[i] for i in item.get("merged_from", []) if isinstance(i, int) and 0 <= i < len(partials)]
+        sources = []
+        seen = set()
+        for mc in merged:
+            for source in mc.sources:
+                key = (source.persona_id, source.original_content)
+                if key not in seen:
+                    seen.add(key)
+                    sources.append(source)
+
+        ranges = [
+            (r[0] - 1, r[1] - 1)  # Convert to 0-indexed
+            for r in item.get("line_ranges", [])
+            if isinstance(r, (list, tuple)) and len(r) == 2
+        ]
+        if ranges:
+            start_line = min(r[0] for r in ranges)
+            end_line = max(r[1] for r in ranges)
+        elif merged:
+            start_line = min(mc.start_line for mc in merged)
+            end_line = max(mc.end_line for mc in merged)
+        else:
+            start_line = end_line = 0
+
+        return MetaComment(
+            id=str(uuid.uuid4())[:8],
+            content=item.get("content", ""),
+            start_line=start_line,
+            end_line=end_line,
+            sources=sources,
+            category=item.get("category", "clarity"),
+            priority=item.get("priority", "medium"),
+            created_at=datetime.utcnow(),
+        )
+
+    async def _plan(
+        self, comments: list[dict], persona_weights: dict[str, float] | None
+    ) -> tuple[str, Callable[[dict], MetaComment], Callable[[], list[MetaComment]]]:
+        """Prompt for the final synthesis call, how to convert its items, and the fallback findings.
+
+        Up to ``meta_batch_comments`` comments go to the model in one prompt.
+        Beyond that the location groups are synthesized in parallel batches
+        (map) and the final call merges their partial findings (reduce).
+        """
+        index = CommentIndex(comments)
+        groups = index.groups()
+        batches = self._batches(groups)
+        if len(batches) == 1:
+            return (
+                self._build_prompt(groups, persona_weights),
+                lambda item: self._to_meta_comment(item, groups, index),
+                lambda: self._fallback_synthesis(groups, persona_weights),
             )
 
-            response_text = message.content[0].text.strip()
-            # Strip markdown code fences if present (```json ... ``` or ``` ... ```)
-            if response_text.startswith("```"):
-                # Remove opening fence line
-                response_text = response_text.split("\n", 1)[1] if "\n" in response_text else response_text[3:]
-                # Remove closing fence
-                response_text = response_text.rsplit("```", 1)[0].strip()
+        logger.info("Hierarchical meta synthesis: %d comments in %d batches", len(comments), len(batches))
+        partials = await self._map(batches, persona_weights)
+        return (
+            self._build_reduce_prompt(partials),
+            lambda item: self._from_reduced(item, partials),
+            lambda: partials,
+        )
+
+    def _to_meta_comment(self, item: dict, groups: list[dict], index: CommentIndex) -> MetaComment:
+        """Turn one element of the model's JSON array into a MetaComment with its sources."""
+        # Determine line range from line_ranges field or fall back to group
+        ranges = [
+            (r[0] - 1, r[1] - 1)  # Convert to 0-indexed
+            for r in item.get("line_ranges", [])
+            if isinstance(r, (list, tuple)) and len(r) == 2
+        ]
+        if ranges:
+            start_line = min(r[0] for r in ranges)
+            end_line = max(r[1] for r in ranges)
+        else:
+            group_idx = item.get("group_index", 0)
+            if 0 <= group_idx < len(groups):
+                start_line = groups[group_idx]["start_line"]
+                end_line = groups[group_idx]["end_line"]
+                ranges = [(start_line, end_line)]
+            else:
+                start_line = 0
+                end_line = 0
+
+        # Cite the contributing personas' comments on those lines
+        sources = [
+            MetaCommentSource(
+                persona_id=c["persona_id"],
+                persona_name=c["persona_name"],
+                persona_color=c["persona_color"],
+                original_content=c["content"],
+            )
+            for c in index.attribute(item.get("contributing_personas", []), ranges)
+        ]
+
+        return MetaComment(
+            id=str(uuid.uuid4())[:8],
+            content=item.get("content", ""),
+            start_line=start_line,
+            end_line=end_line,
+            sources=sources,
+            category=item.get("category", "clarity"),
+            priority=item.get("priority", "medium"),
+            created_at=datetime.utcnow(),
+        )
+
+    def _result(self, meta_comments: list[MetaComment], total_personas: int) -> MetaSynthesisResult:
+        return MetaSynthesisResult(
+            comments=meta_comments,
+            verdict=self._compute_verdict(meta_comments),
+            confidence=self._compute_confidence(meta_comments, total_personas),
+        )
+
+    async def synthesize(
+        self,
+        comments: list[dict],
+        persona_weights: dict[str, float] | None = None,
+        local: bool | None = None,
+    ) -> MetaSynthesisResult:
+        """Take all persona comments and synthesize into meta-review with verdict.
 
-            synthesis = json.loads(response_text)
+        Args:
+            comments: List of comment dicts with persona_id, persona_name, etc.
+            persona_weights: Optional mapping of persona_id -> weight (float).
+            local: Force (True) or skip (False) the local synthesizer; by default
+                reviews with up to ``meta_local_max_comments`` comments use it.
+        """
+        if not comments:
+            return MetaSynthesisResult(comments=[], verdict="ship_it", confidence=0.0)
+        if self._use_local(comments, local):
+            return self.synthesize_local(comments, persona_weights)
+
+        prompt, convert, fallback = await self._plan(comments, persona_weights)
+        total_personas = len({c["persona_id"] for c in comments})
+
+        try:
+            synthesis = await self._complete_json(prompt)
+            meta_comments = [convert(item) for item in synthesis]
         except Exception as e:
             vos_err = classify_anthropic_error(e)
-            logger.error("Meta synthesis failed [%s]: %s", vos_err.code, vos_err.message, exc_info=True)
-            # Fallback: create simple meta-comments per group without synthesis
-            fallback_comments = self._fallback_synthesis(groups)
-            return MetaSynthesisResult(
-                comments=fallback_comments,
-                verdict=self._compute_verdict(fallback_comments),
-                confidence=self._compute_confidence(fallback_comments, total_personas),
+            logger.exception("Meta synthesis failed [%s]: %s", vos_err.code, vos_err.message)
+            # Fallback: per-group comments, or the unmerged partial findings
+            result = self._result(fallback(), total_personas)
+            result.fallback = True
+            return result
+
+        return self._result(meta_comments, total_personas)
+
+    async def synthesize_stream(
+        self,
+        comments: list[dict],
+        persona_weights: dict[str, float] | None = None,
+        local: bool | None = None,
+    ) -> AsyncIterator[dict]:
+        """Streaming variant of ``synthesize``.
+
+        Yields ``{"type": "meta_comment", "comment": MetaComment}`` as soon as
+        each finding's JSON object closes in the model output, then one
+        ``{"type": "meta_verdict", "result": MetaSynthesisResult}``. If the
+        call fails before any finding streamed, the local synthesizer's
+        findings are emitted instead (with ``fallback: True`` on the verdict
+        event); a failure mid-stream keeps the findings already sent. A local
+        synthesis (see ``synthesize``) is marked ``local: True``.
+        """
+        if not comments:
+            yield {"type": "meta_verdict", "result": MetaSynthesisResult(comments=[], verdict="ship_it", confidence=0.0)}
+            return
+        if self._use_local(comments, local):
+            result = self.synthesize_local(comments, persona_weights)
+            for mc in result.comments:
+                yield {"type": "meta_comment", "comment": mc}
+            yield {"type": "meta_verdict", "result": result, "local": True}
+            return
+
+        prompt, convert, fallback_findings = await self._plan(comments, persona_weights)
+        total_personas = len({c["persona_id"] for c in comments})
+
+        client = llm_pool.get_client()
+        model = META_MODEL
+        est_tokens = estimate_tokens(prompt, max_tokens=2048)
+        meta_comments: list[MetaComment] = []
+        fallback = False
+
+        try:
+            attempt = 0
+            while True:
+                parser = StreamingJsonArrayParser()
+                try:
+                    async with (
+                        llm_scheduler.admit(model, est_tokens),
+                        client.messages.stream(
+                            model=model,
+                            max_tokens=2048,
+                            messages=[{"role": "user", "content": prompt}],
+                        ) as stream,
+                    ):
+                        async for text in stream.text_stream:
+                            for item in parser.feed(text):
+                                mc = convert(item)
+                                meta_comments.append(mc)
+                                yield {"type": "meta_comment", "comment": mc}
+                        final_message = await stream.get_final_message()
+                    break
+                except Exception as e:
+                    # Only retry before any finding was sent, so findings are never duplicated
+                    attempt += 1
+                    delay = None if meta_comments else llm_scheduler.retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+
+            usage = getattr(final_message, "usage", None)
+            llm_scheduler.settle(
+                est_tokens,
+                (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0),
             )
+        except Exception as e:
+            vos_err = classify_anthropic_error(e)
+            logger.exception("Streaming meta synthesis failed [%s]: %s", vos_err.code, vos_err.message)
+            if not meta_comments:
+                fallback = True
+                for mc in fallback_findings():
+                    meta_comments.append(mc)
+                    yield {"type": "meta_comment", "comment": mc}
+
+        if not meta_comments and not fallback:
+            # The model returned no parseable findings; same outcome as a failed json.loads
+            logger.warning("Streaming meta synthesis produced no findings; using fallback")
+            fallback = True
+            for mc in fallback_findings():
+                meta_comments.append(mc)
+                yield {"type": "meta_comment", "comment": mc}
+
+        event = {"type": "meta_verdict", "result": self._result(meta_comments, total_personas)}
+        if fallback:
+            event["result"].fallback = True
+            event["fallback"] = True
+        yield event
+
+    async def follow_review(
+        self,
+        events: AsyncIterator[dict],
+        persona_weights: dict[str, float] | None = None,
+        speculative_share: float | None = None,
+    ) -> AsyncIterator[dict]:
+        """Pass a review's event stream through and append its meta review.
+
+        After the review's ``done`` event (marked ``auto_meta: True``) the
+        synthesis streams as ``meta_comment`` events and ends with a
+        ``meta_verdict`` event, all JSON-ready.
+
+        Once personas holding ``speculative_share`` of the total weight have
+        completed, a synthesis of their comments starts in the background and
+        is announced as ``meta_preview`` if it finishes while the review is
+        still running. If the remaining personas add no comments, that result
+        is final; otherwise the full comment set is synthesized again.
+
+        The final synthesis goes through the meta cache like the meta
+        endpoints: a cached one is replayed (``cached: True`` on the verdict)
+        and a fresh one is stored.
+        """
+        if speculative_share is None:
+            speculative_share = self.settings.meta_speculative_share
+        weights = persona_weights or {}
 
-        # Build a flat list of all comments for source matching
-        all_comments = []
-        for group in groups:
-            all_comments.extend(group["comments"])
+        comments: list[dict] = []
+        persona_ids: list[str] = []
+        completed: set[str] = set()
+        speculation: asyncio.Task | None = None
+        speculated_ids: set[str] = set()
+        previewed = False
+
+        def weight(pid: str) -> float:
+            return weights.get(pid, 1.0)
+
+        try:
+            async for event in events:
+                kind = event.get("type")
+                if kind == "persona_status":
+                    pid = event["persona_id"]
+                    if event["status"] == "queued" and pid not in persona_ids:
+                        persona_ids.append(pid)
+                    elif event["status"] == "completed":
+                        completed.add(pid)
+                elif kind == "comment" and not event["comment"]["content"].startswith(REVIEW_ERROR_PREFIX):
+                    c = event["comment"]
+                    comments.append({
+                        "id": c["id"],
+                        "persona_id": c["persona_id"],
+                        "persona_name": c["persona_name"],
+                        "persona_color": c["persona_color"],
+                        "content": c["content"],
+                        "start_line": c["anchor"]["start_line"],
+                        "end_line": c["anchor"]["end_line"],
+                    })
+                elif kind == "done":
+                    event["auto_meta"] = True
+                    yield event
+                    break
+
+                if (
+                    speculation is None
+                    and speculative_share < 1.0
+                    and len(completed) < len(persona_ids)
+                ):
+                    total = sum(weight(pid) for pid in persona_ids)
+                    share = sum(weight(pid) for pid in completed) / total if total > 0 else 0.0
+                    if completed and share >= speculative_share:
+                        snapshot = [c for c in comments if c["persona_id"] in completed]
+                        speculated_ids = {c["id"] for c in snapshot}
+                        logger.info(
+                            "Speculative meta synthesis started at %.0f%% of persona weight (%d comments)",
+                            share * 100, len(snapshot),
+                        )
+                        speculation = asyncio.create_task(self.synthesize(snapshot, persona_weights))
+
+                yield event
+
+                if speculation is not None and speculation.done() and not previewed:
+                    previewed = True
+                    # A failed speculation only loses the preview; the final synthesis runs as usual
+                    if speculation.exception() is None:
+                        preview = speculation.result()
+                        yield {
+                            "type": "meta_preview",
+                            "comments": [mc.model_dump(mode="json") for mc in preview.comments],
+                            "verdict": preview.verdict,
+                            "confidence": preview.confidence,
+                        }
+            else:
+                return  # the review ended without done; nothing to synthesize
 
+            model = self.synthesizer(comments)
+            cache_key = meta_cache.meta_cache_key(comments, persona_weights, model)
+
+            if speculation is not None and speculated_ids == {c["id"] for c in comments}:
+                # The personas that finished after the snapshot added nothing
+                try:
+                    result = await speculation
+                except Exception:
+                    logger.warning("Speculative meta synthesis failed; synthesizing again", exc_info=True)
+                else:
+                    logger.info("Speculative meta synthesis reused")
+                    for mc in result.comments:
+                        yield {"type": "meta_comment", "comment": mc.model_dump(mode="json")}
+                    await self._cache_result(cache_key, model, result)
+                    verdict = {"type": "meta_verdict", "verdict": result.verdict,
+                               "confidence": result.confidence, "speculative": True}
+                    if result.fallback:
+                        verdict["fallback"] = True
+                    if model == "local":
+                        verdict["local"] = True
+                    yield verdict
+                    return
+
+            if speculation is not None:
+                speculation.cancel()
+
+            async with db_writer.session_factory() as db:
+                cached = await meta_cache.load(db, cache_key)
+            if cached is not None:
+                for mc in cached.comments:
+                    yield {"type": "meta_comment", "comment": mc.model_dump(mode="json")}
+                yield {"type": "meta_verdict", "verdict": cached.verdict,
+                       "confidence": cached.confidence, "cached": True}
+                return
+
+            async for meta_event in self.synthesize_stream(comments, persona_weights):
+                if meta_event["type"] == "meta_comment":
+                    yield {"type": "meta_comment", "comment": meta_event["comment"].model_dump(mode="json")}
+                else:
+                    result = meta_event["result"]
+                    await self._cache_result(cache_key, model, result)
+                    verdict = {"type": "meta_verdict", "verdict": result.verdict, "confidence": result.confidence}
+                    for flag in ("fallback", "local"):
+                        if meta_event.get(flag):
+                            verdict[flag] = True
+                    yield verdict
+        finally:
+            if speculation is not None and not speculation.done():
+                speculation.cancel()
+
+    async def _cache_result(self, key: str, model: str, result: MetaSynthesisResult):
+        """Store a synthesis in the meta cache; fallback findings are never cached."""
+        if result.fallback:
+            return
+        try:
+            await db_writer.write(lambda db: meta_cache.store(db, key, model, result))
+        except Exception:
+            # A missed cache entry only costs a later synthesis
+            logger.exception("Failed to cache meta synthesis %s", key[:12])
+
+    def _fallback_synthesis(
+        self, groups: list[dict], persona_weights: dict[str, float] | None = None
+    ) -> list[MetaComment]:
+        """Findings without an LLM: the local synthesizer over the comments of ``groups``."""
+        comments = [c for group in groups for c in group["comments"]]
+        weights = persona_weights or {}
+        weight_of = [weights.get(c["persona_id"], 1.0) for c in comments]
+        group_ids = [i for i, group in enumerate(groups) for _ in group["comments"]]
+
+        matrix = local_synthesis.tfidf_matrix([c["content"] for c in comments])
         meta_comments = []
-        for item in synthesis:
-            contributing_names = set(item.get("contributing_personas", []))
-
-            # Collect sources from all comments matching contributing personas
-            sources = []
-            seen_ids = set()
-            for c in all_comments:
-                if c["persona_name"] in contributing_names and c.get("id") not in seen_ids:
-                    sources.append(MetaCommentSource(
+        for members in local_synthesis.cluster(matrix, group_ids):
+            cited = [comments[m] for m in members]
+            texts = [c["content"] for c in cited]
+            lead = comments[local_synthesis.representative(matrix, members, weight_of)]
+            consensus = sum(weights.get(pid, 1.0) for pid in {c["persona_id"] for c in cited})
+            meta_comments.append(MetaComment(
+                id=str(uuid.uuid4())[:8],
+                content=local_synthesis.summarize(lead["content"]),
+                start_line=min(c["start_line"] for c in cited),
+                end_line=max(c["end_line"] for c in cited),
+                sources=[
+                    MetaCommentSource(
                         persona_id=c["persona_id"],
                         persona_name=c["persona_name"],
                         persona_color=c["persona_color"],
                         original_content=c["content"],
-                    ))
-                    seen_ids.add(c.get("id"))
-
-            # Determine line range from line_ranges field or fall back to group
-            line_ranges = item.get("line_ranges", [])
-            if line_ranges:
-                start_line = min(r[0] for r in line_ranges) - 1  # Convert to 0-indexed
-                end_line = max(r[1] for r in line_ranges) - 1
-            else:
-                group_idx = item.get("group_index", 0)
-                if 0 <= group_idx < len(groups):
-                    start_line = groups[group_idx]["start_line"]
-                    end_line = groups[group_idx]["end_line"]
-                else:
-                    start_line = 0
-                    end_line = 0
-
-            meta_comments.append(MetaComment(
-                id=str(uuid.uuid4())[:8],
-                content=item.get("content", ""),
-                start_line=start_line,
-                end_line=end_line,
-                sources=sources,
-                category=item.get("category", "clarity"),
-                priority=item.get("priority", "medium"),
+                    )
+                    for c in cited
+                ],
+                category=local_synthesis.infer_category(
+                    texts, [_PERSONA_FOCUS.get(c["persona_id"], []) for c in cited]
+                ),
+                priority=local_synthesis.infer_priority(texts, consensus),
                 created_at=datetime.utcnow(),
             ))
+        # Most severe and most agreed-on first, like the LLM checklist
+        meta_comments.sort(key=lambda mc: (-local_synthesis.priority_rank(mc.priority), -len(mc.sources), mc.start_line))
+        return meta_comments
 
-        verdict = self._compute_verdict(meta_comments)
-        confidence = self._compute_confidence(meta_comments, total_personas)
+    def synthesize_local(
+        self, comments: list[dict], persona_weights: dict[str, float] | None = None
+    ) -> MetaSynthesisResult:
+        """Deterministic synthesis in milliseconds, without calling the LLM."""
+        if not comments:
+            return MetaSynthesisResult(comments=[], verdict="ship_it", confidence=0.0)
+        groups = self._group_comments_by_location(comments)
+        total_personas = len({c["persona_id"] for c in comments})
+        return self._result(self._fallback_synthesis(groups, persona_weights), total_personas)
 
-        return MetaSynthesisResult(
-            comments=meta_comments,
-            verdict=verdict,
-            confidence=confidence,
-        )
+    def synthesizer(self, comments: list[dict], local: bool | None = None) -> str:
+        """What would synthesize ``comments``: the meta model, or ``"local"``."""
+        return "local" if self._use_local(comments, local) else META_MODEL
 
-    def _fallback_synthesis(self, groups: list[dict]) -> List[MetaComment]:
-        """Simple fallback when Claude synthesis fails."""
-        meta_comments = []
-        for group in groups:
-            contents = [c["content"] for c in group["comments"]]
-            merged = " | ".join(contents)
-            sources = [
-                MetaCommentSource(
-                    persona_id=c["persona_id"],
-                    persona_name=c["persona_name"],
-                    persona_color=c["persona_color"],
-                    original_content=c["content"],
-                )
-                for c in group["comments"]
-            ]
-            meta_comments.append(MetaComment(
-                id=str(uuid.uuid4())[:8],
-                content=merged,
-                start_line=group["start_line"],
-                end_line=group["end_line"],
-                sources=sources,
-                category="clarity",
-                priority="medium",
-                created_at=datetime.utcnow(),
-            ))
-        return meta_comments
+    def _use_local(self, comments: list[dict], local: bool | None) -> bool:
+        """``local`` forces the choice; otherwise small reviews skip the LLM."""
+        if local is not None:
+            return local
+        return len(comments) <= self.settings.meta_local_max_comments
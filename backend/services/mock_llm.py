@@ -0,0 +1,234 @@
+"""Deterministic offline LLM provider for load tests and CI (``llm_provider=mock``).
+
+``MockAnthropicClient`` implements the parts of ``AsyncAnthropic`` that VOS
+uses: ``messages.stream(...)`` (``text_stream``, ``get_final_message``) and
+``messages.create(...)``. Output depends only on the prompt:
+
+- review prompts get ``[PARAGRAPH N]`` comments on paragraphs the prompt
+  actually offers (full document, focus paragraphs or a chunk window)
+- meta-review prompts get a JSON array of findings, one per comment group;
+  reduce prompts of a hierarchical synthesis get the partials merged into seven
+
+Latency is shaped by ``mock_llm_ttft_ms`` and ``mock_llm_tokens_per_second``.
+``mock_llm_rate_limit_rate`` and ``mock_llm_server_error_rate`` inject 429 and
+5xx failures from a seeded RNG, so a run with the same seed fails the same way.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+
+from core.config import Settings
+
+_CATEGORIES = ["security", "technical", "clarity", "structure", "accessibility", "style"]
+_PRIORITIES = ["critical", "high", "medium", "low"]
+_REMARKS = [
+    "The claim here needs supporting evidence.",
+    "This sentence is hard to follow; split it in two.",
+    "Consider what happens when this assumption fails.",
+    "Define this term before relying on it.",
+    "An example would make this much clearer.",
+    "This could be stated more concisely.",
+]
+
+
+class MockRateLimitError(Exception):
+    """Stands in for ``anthropic.RateLimitError`` (classified by type name)."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float | None = None):
+        super().__init__("429 rate_limit_error: mock provider rate limit")
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=429, headers=headers)
+
+
+class MockServerError(Exception):
+    """Stands in for ``anthropic.InternalServerError``."""
+
+    status_code = 500
+
+    def __init__(self):
+        super().__init__("500 api_error: mock provider internal server error")
+
+
+def _prompt_text(system, messages) -> str:
+    parts = []
+    if isinstance(system, str):
+        parts.append(system)
+    elif system:
+        parts.extend(block.get("text", "") for block in system)
+    for message in messages or []:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content or [])
+    return "\n".join(parts)
+
+
+def _offered_paragraphs(prompt: str) -> list[int]:
+    """Paragraph numbers a review prompt asks about."""
+    changed = [int(n) for n in re.findall(r"\(paragraph (\d+), changed\)", prompt)]
+    if changed:
+        return changed
+    excerpt = [int(n) for n in re.findall(r"\(paragraph (\d+)\)", prompt)]
+    if excerpt:
+        return excerpt
+    match = re.search(r"has (\d+) paragraphs", prompt)
+    return list(range(int(match.group(1)))) if match else []
+
+
+def review_response(prompt: str, rng: random.Random) -> str:
+    paragraphs = _offered_paragraphs(prompt)
+    if not paragraphs:
+        return "I have no specific comments on this document."
+    picked = sorted(rng.sample(paragraphs, min(3, len(paragraphs))))
+    return "\n\n".join(f"[PARAGRAPH {i}] {rng.choice(_REMARKS)}" for i in picked)
+
+
+def meta_response(prompt: str, rng: random.Random) -> str:
+    findings = []
+    groups = re.split(r"\n--- GROUP \d+ \(lines (\d+)-(\d+)\) ---\n", prompt)
+    # re.split yields [preamble, start, end, body, start, end, body, ...]
+    for k in range(1, len(groups) - 2, 3):
+        start, end, body = int(groups[k]), int(groups[k + 1]), groups[k + 2]
+        names = sorted(set(re.findall(r"^\[([^\]]+?)(?: \(weight: [\d.]+x\))?\]:", body, re.MULTILINE)))
+        findings.append({
+            "group_index": -1,
+            "content": f"Address the feedback on lines {start}-{end}.",
+            "category": rng.choice(_CATEGORIES),
+            "priority": rng.choice(_PRIORITIES),
+            "contributing_personas": names,
+            "line_ranges": [[start, end]],
+        })
+    return json.dumps(findings[:7])
+
+
+def reduce_response(prompt: str, rng: random.Random) -> str:
+    """Merge the partial findings of a hierarchical meta synthesis into at most 7."""
+    partials = [(int(i), int(a), int(b)) for i, a, b in re.findall(r"--- FINDING (\d+) \(lines (\d+)-(\d+)\) ---", prompt)]
+    size = max(1, -(-len(partials) // 7))
+    findings = []
+    for k in range(0, len(partials), size):
+        merged = partials[k:k + size]
+        findings.append({
+            "content": f"Address the feedback on lines {merged[0][1]}-{merged[-1][2]}.",
+            "category": rng.choice(_CATEGORIES),
+            "priority": rng.choice(_PRIORITIES),
+            "merged_from": [i for i, _, _ in merged],
+            "line_ranges": [[a, b] for _, a, b in merged],
+        })
+    return json.dumps(findings)
+
+
+def respond(prompt: str) -> str:
+    """Deterministic response text for ``prompt``."""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+    if "Return ONLY the JSON array" in prompt:
+        if "--- FINDING " in prompt:
+            return reduce_response(prompt, rng)
+        return meta_response(prompt, rng)
+    return review_response(prompt, rng)
+
+
+class _MockStream:
+    def __init__(self, client: "MockAnthropicClient", kwargs: dict):
+        self._client = client
+        self._kwargs = kwargs
+        self._text = ""
+        self._usage = None
+
+    async def __aenter__(self):
+        self._client._maybe_fail()
+        self._text, self._usage = self._client._complete(self._kwargs)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self) -> AsyncIterator[str]:
+        return self._client._emit(self._text)
+
+    async def get_final_message(self):
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=self._text)], usage=self._usage)
+
+
+class _MockMessages:
+    def __init__(self, client: "MockAnthropicClient"):
+        self._client = client
+
+    def stream(self, **kwargs) -> _MockStream:
+        return _MockStream(self._client, kwargs)
+
+    async def create(self, **kwargs):
+        self._client._maybe_fail()
+        text, usage = self._client._complete(kwargs)
+        await self._client._delay(text)
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)], usage=usage)
+
+
+class MockAnthropicClient:
+    """Offline stand-in for ``AsyncAnthropic``."""
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.messages = _MockMessages(self)
+        self._errors = random.Random(settings.mock_llm_seed)
+        self._cached_prefixes: set[str] = set()
+        self.calls = 0
+
+    def _maybe_fail(self):
+        self.calls += 1
+        roll = self._errors.random()
+        if roll < self.settings.mock_llm_rate_limit_rate:
+            raise MockRateLimitError(self.settings.mock_llm_retry_after_seconds)
+        if roll < self.settings.mock_llm_rate_limit_rate + self.settings.mock_llm_server_error_rate:
+            raise MockServerError()
+
+    def _complete(self, kwargs: dict) -> tuple[str, SimpleNamespace]:
+        system = kwargs.get("system")
+        prompt = _prompt_text(system, kwargs.get("messages"))
+        text = respond(prompt)
+
+        # Emulate prompt caching: the first call with a cache_control prefix writes it
+        cache_read = cache_write = 0
+        for block in system if isinstance(system, list) else []:
+            if block.get("cache_control"):
+                tokens = len(block["text"]) // 4
+                key = hashlib.sha256(block["text"].encode("utf-8")).hexdigest()
+                if key in self._cached_prefixes:
+                    cache_read += tokens
+                else:
+                    self._cached_prefixes.add(key)
+                    cache_write += tokens
+        usage = SimpleNamespace(
+            input_tokens=max(0, len(prompt) // 4 - cache_read - cache_write),
+            output_tokens=len(text) // 4,
+            cache_read_input_tokens=cache_read,
+            cache_creation_input_tokens=cache_write,
+        )
+        return text, usage
+
+    def _token_delay(self) -> float:
+        rate = self.settings.mock_llm_tokens_per_second
+        return 1.0 / rate if rate > 0 else 0.0
+
+    async def _delay(self, text: str):
+        await asyncio.sleep(self.settings.mock_llm_ttft_ms / 1000 + self._token_delay() * (len(text) // 4))
+
+    async def _emit(self, text: str) -> AsyncIterator[str]:
+        await asyncio.sleep(self.settings.mock_llm_ttft_ms / 1000)
+        per_token = self._token_delay()
+        # ~4 characters per token, streamed a word at a time
+        for word in re.findall(r"\S+\s*", text):
+            if per_token:
+                await asyncio.sleep(per_token * max(1, len(word) // 4))
+            yield word
+
+    async def close(self):
+        pass
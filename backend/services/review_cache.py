@@ -0,0 +1,129 @@
+"""Persistent, content-addressed cache of persona review results.
+
+A persona's comments are fully determined by the document content, the
+persona's system prompt, the model and the review prompt template.  When none
+of those change we can replay the stored comments instead of calling the LLM.
+"""
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from core.config import get_settings
+from core.observability import metrics
+from database import DbReviewCacheEntry, SessionLocal
+
+logger = logging.getLogger("vos.review.cache")
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def review_cache_key(content: str, system_prompt: str, model: str, template_version: str) -> str:
+    """Build a stable cache key for one persona's review of one document."""
+    parts = [_sha256(content), _sha256(system_prompt), model, template_version]
+    return _sha256("\x1f".join(parts))
+
+
+class ReviewCache:
+    """DB-backed review cache with TTL expiry and LRU size eviction."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.settings = get_settings()
+        self._session_factory = session_factory
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.review_cache_enabled
+
+    def _is_expired(self, entry: DbReviewCacheEntry, now: datetime) -> bool:
+        ttl = self.settings.review_cache_ttl_seconds
+        return ttl > 0 and entry.created_at < now - timedelta(seconds=ttl)
+
+    def get(self, key: str) -> list[dict] | None:
+        """Return the cached comment payloads for ``key``, or None on a miss."""
+        db = self._session_factory()
+        try:
+            entry = db.query(DbReviewCacheEntry).filter(DbReviewCacheEntry.key == key).first()
+            now = datetime.utcnow()
+            if entry and self._is_expired(entry, now):
+                db.delete(entry)
+                db.commit()
+                metrics.record_review_cache_eviction(1)
+                entry = None
+            if not entry:
+                metrics.record_review_cache_lookup(hit=False)
+                return None
+
+            entry.hit_count = (entry.hit_count or 0) + 1
+            entry.last_used_at = now
+            comments = list(entry.comments or [])
+            db.commit()
+            metrics.record_review_cache_lookup(hit=True)
+            return comments
+        finally:
+            db.close()
+
+    def put(self, key: str, persona_id: str, model: str, comments: list[dict]):
+        """Store (or replace) a persona's comment payloads and enforce size limits."""
+        db = self._session_factory()
+        try:
+            now = datetime.utcnow()
+            entry = db.query(DbReviewCacheEntry).filter(DbReviewCacheEntry.key == key).first()
+            if entry:
+                entry.comments = comments
+                entry.created_at = now
+                entry.last_used_at = now
+            else:
+                db.add(DbReviewCacheEntry(
+                    key=key,
+                    persona_id=persona_id,
+                    model=model,
+                    comments=comments,
+                    hit_count=0,
+                    created_at=now,
+                    last_used_at=now,
+                ))
+            db.flush()
+            evicted = self._evict(db, now)
+            db.commit()
+            if evicted:
+                metrics.record_review_cache_eviction(evicted)
+                logger.info("Review cache evicted %d entries", evicted)
+        finally:
+            db.close()
+
+    def _evict(self, db, now: datetime) -> int:
+        """Drop expired entries, then least-recently-used ones above the size cap."""
+        evicted = 0
+        ttl = self.settings.review_cache_ttl_seconds
+        if ttl > 0:
+            cutoff = now - timedelta(seconds=ttl)
+            evicted += db.query(DbReviewCacheEntry).filter(
+                DbReviewCacheEntry.created_at < cutoff
+            ).delete(synchronize_session=False)
+
+        max_entries = self.settings.review_cache_max_entries
+        if max_entries > 0:
+            overflow = db.query(DbReviewCacheEntry).count() - max_entries
+            if overflow > 0:
+                stale_keys = [
+                    k for (k,) in db.query(DbReviewCacheEntry.key)
+                    .order_by(DbReviewCacheEntry.last_used_at.asc())
+                    .limit(overflow)
+                ]
+                evicted += db.query(DbReviewCacheEntry).filter(
+                    DbReviewCacheEntry.key.in_(stale_keys)
+                ).delete(synchronize_session=False)
+        return evicted
+
+    def clear(self):
+        db = self._session_factory()
+        try:
+            db.query(DbReviewCacheEntry).delete()
+            db.commit()
+        finally:
+            db.close()
+
+
+review_cache = ReviewCache()
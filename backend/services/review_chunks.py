@@ -0,0 +1,85 @@
+"""Windowing and merging for chunked (map-reduce) reviews of long documents.
+
+Paragraph dicts are the ones produced by ``ReviewService._parse_document_structure``
+(``text``, ``start_line``, ``end_line``, ``index``). Windows are lists of
+global paragraph indices, so comments parsed from a window keep the
+paragraph numbers of the full document.
+"""
+import re
+
+from services.llm_scheduler import estimate_tokens
+
+_HEADING = re.compile(r"^#{1,6}\s")
+
+
+def is_heading(paragraph: dict) -> bool:
+    return bool(_HEADING.match(paragraph["text"]))
+
+
+def _sections(paragraphs: list[dict]) -> list[list[int]]:
+    """Group paragraph indices into sections that each start at a markdown heading."""
+    sections: list[list[int]] = []
+    for p in paragraphs:
+        if not sections or is_heading(p):
+            sections.append([])
+        sections[-1].append(p["index"])
+    return sections
+
+
+def chunk_paragraphs(paragraphs: list[dict], max_tokens: int) -> list[list[int]]:
+    """Split paragraphs into windows of at most ``max_tokens`` estimated tokens.
+
+    Whole sections are packed together while they fit; a section that is
+    larger than the budget on its own is split at paragraph boundaries. A
+    single paragraph over the budget becomes its own window.
+    """
+    cost = {p["index"]: estimate_tokens(p["text"]) for p in paragraphs}
+    windows: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            windows.append(current)
+        current, current_tokens = [], 0
+
+    for section in _sections(paragraphs):
+        section_tokens = sum(cost[i] for i in section)
+        if current_tokens + section_tokens <= max_tokens:
+            current.extend(section)
+            current_tokens += section_tokens
+            continue
+        flush()
+        if section_tokens <= max_tokens:
+            current, current_tokens = list(section), section_tokens
+            continue
+        for i in section:
+            if current and current_tokens + cost[i] > max_tokens:
+                flush()
+            current.append(i)
+            current_tokens += cost[i]
+    flush()
+    return windows
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+class CommentDeduper:
+    """Drops comments whose normalized text was already emitted for the same persona.
+
+    Windows are reviewed independently, so personas tend to repeat
+    document-wide remarks ("add a summary", "define acronyms") in every window.
+    """
+
+    def __init__(self):
+        self._seen: set[str] = set()
+
+    def is_new(self, text: str) -> bool:
+        key = _normalize(text)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
@@ -0,0 +1,71 @@
+"""Paragraph-level diffing used by incremental re-reviews.
+
+Paragraph dicts are the ones produced by ``ReviewService._parse_document_structure``
+(``text``, ``start_line``, ``end_line``, ``index``).
+"""
+from bisect import bisect_right
+from difflib import SequenceMatcher
+
+
+def diff_paragraphs(old_paragraphs: list[dict], new_paragraphs: list[dict]) -> dict:
+    """Match unchanged paragraphs between two versions of a document.
+
+    Returns a dict with:
+        unchanged: {old_index: new_index} for paragraphs whose text is identical
+        changed: sorted new indices that were edited or inserted
+    """
+    old_texts = [p["text"] for p in old_paragraphs]
+    new_texts = [p["text"] for p in new_paragraphs]
+    matcher = SequenceMatcher(None, old_texts, new_texts, autojunk=False)
+
+    unchanged = {}
+    for tag, i1, i2, j1, _j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for offset in range(i2 - i1):
+                unchanged[i1 + offset] = j1 + offset
+
+    matched_new = set(unchanged.values())
+    changed = [p["index"] for p in new_paragraphs if p["index"] not in matched_new]
+    return {"unchanged": unchanged, "changed": changed}
+
+
+def with_context(indices: list[int], total: int, context: int) -> list[int]:
+    """Expand paragraph indices by ``context`` neighbours on each side."""
+    expanded = set()
+    for idx in indices:
+        for i in range(max(0, idx - context), min(total, idx + context + 1)):
+            expanded.add(i)
+    return sorted(expanded)
+
+
+def carry_forward_comments(
+    previous_comments: list[dict],
+    old_paragraphs: list[dict],
+    new_paragraphs: list[dict],
+    unchanged: dict,
+) -> list[dict]:
+    """Remap comments anchored on unchanged paragraphs to their new line positions.
+
+    Comments whose paragraph was edited or removed are dropped; the persona is
+    asked about those paragraphs again.
+    """
+    if not old_paragraphs:
+        return []
+    starts = [p["start_line"] for p in old_paragraphs]
+
+    carried = []
+    for c in previous_comments:
+        pos = bisect_right(starts, c["start_line"]) - 1
+        if pos < 0:
+            continue
+        old_para = old_paragraphs[pos]
+        if c["start_line"] > old_para["end_line"] or pos not in unchanged:
+            continue
+        new_para = new_paragraphs[unchanged[pos]]
+        shift = new_para["start_line"] - old_para["start_line"]
+        carried.append({
+            **c,
+            "start_line": c["start_line"] + shift,
+            "end_line": min(c["end_line"], old_para["end_line"]) + shift,
+        })
+    return carried
@@ -0,0 +1,455 @@
+"""In-process worker pool for review jobs.
+
+A review runs as a background job that owns its ``DbReviewJob`` lifecycle
+(queued -> running -> completed/failed) and persists its own results. SSE
+endpoints only subscribe to the job's event log. A client that disconnects
+does not stop the review, and a client that reconnects resumes from its
+``Last-Event-ID`` without re-running any LLM calls.
+
+Identical requests (same content, persona set and model) that arrive while a
+job is still queued or running attach to that job instead of starting a
+second fan-out.
+
+Comments are saved while the review streams, in batched inserts (see
+``CommentWriter``), so a crash mid-review keeps what was already delivered.
+The last batch goes into the transaction that marks the review completed.
+
+A review with automatic meta synthesis marks its ``done`` event
+``auto_meta``; its log then stays open until the ``meta_verdict`` event, and
+the meta comments are cached in ``DbMetaComment`` like the meta endpoints do.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from core.config import get_settings
+from core.errors import classify_anthropic_error
+from core.observability import metrics
+from database import DbComment, DbMetaComment, DbReview, DbReviewJob
+from models.meta_comment import MetaComment
+from services.db_writer import DbWriter, db_writer
+
+logger = logging.getLogger("vos.jobs")
+
+TERMINAL_EVENTS = ("done", "error", "meta_verdict")
+
+
+def review_request_key(
+    content: str,
+    persona_ids: list[str],
+    model: str,
+    auto_meta: bool = False,
+    incremental: bool = False,
+    bypass_cache: bool = False,
+    priority: int = 0,
+) -> str:
+    """Single-flight key for a review request.
+
+    Every option that changes what the job produces or how it is scheduled is
+    part of it: an auto-meta request waits for events a plain review never
+    streams, a ``bypass_cache`` one must not get cached comments, and a batch
+    request must not hold an interactive one behind its lower priority.
+    """
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    options = f"meta={int(auto_meta)},incremental={int(incremental)},bypass={int(bypass_cache)},priority={priority}"
+    return f"{content_hash}:{','.join(sorted(persona_ids))}:{model}:{options}"
+
+
+class JobLog:
+    """Append-only event log of one job. Event ids start at 1 and are used as SSE ``id:``."""
+
+    def __init__(self, job_id: str, review_id: str, key: str | None = None):
+        self.job_id = job_id
+        self.review_id = review_id
+        self.key = key
+        self.coalesced = 0  # identical requests attached to this job
+        self.events: list[dict] = []
+        self.finished_at: float | None = None
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def append(self, event: dict):
+        self.events.append(event)
+        # A done event followed by an automatic meta review is not the end yet
+        if event.get("type") in TERMINAL_EVENTS and not event.get("auto_meta"):
+            self.finished_at = time.monotonic()
+        # Wake current subscribers and start a fresh event for the next wait
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self, after: int = 0) -> AsyncIterator[tuple[int, dict]]:
+        """Yield ``(event_id, event)`` after ``after`` until the job finishes."""
+        pos = max(0, after)
+        while True:
+            while pos < len(self.events):
+                pos += 1
+                yield pos, self.events[pos - 1]
+            if self.finished:
+                return
+            await self._changed.wait()
+
+
+def _comment_row(review_id: str, c: dict) -> dict:
+    return {
+        "id": c["id"],
+        "review_id": review_id,
+        "document_id": c["document_id"],
+        "persona_id": c["persona_id"],
+        "persona_name": c["persona_name"],
+        "persona_color": c["persona_color"],
+        "content": c["content"],
+        "start_line": c["anchor"]["start_line"],
+        "end_line": c["anchor"]["end_line"],
+        "created_at": datetime.utcnow(),
+    }
+
+
+class CommentWriter:
+    """Saves a review's comments as they stream, in batched executemany inserts.
+
+    ``add`` only buffers, so event delivery never waits on the database. A
+    batch is written in the background once ``batch_size`` comments are
+    buffered or ``flush_seconds`` after the first one, one batch at a time.
+    ``drain`` hands back whatever is still unwritten (including a batch that
+    failed) for the caller's final transaction.
+    """
+
+    def __init__(self, writer: DbWriter, review_id: str, batch_size: int, flush_seconds: float):
+        self.writer = writer
+        self.review_id = review_id
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self._pending: list[dict] = []
+        self._writing: asyncio.Task | None = None
+        self._timer: asyncio.TimerHandle | None = None
+
+    def add(self, comment: dict):
+        self._pending.append(_comment_row(self.review_id, comment))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_seconds, self.flush)
+
+    def flush(self):
+        """Start writing the buffered comments in the background."""
+        self._cancel_timer()
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        self._writing = asyncio.create_task(self._write(rows, self._writing))
+
+    async def _write(self, rows: list[dict], previous: asyncio.Task | None):
+        if previous is not None:
+            await previous  # batches land in stream order
+        started = time.perf_counter()
+        try:
+            await self.writer.write(lambda db: db.execute(insert(DbComment), rows))
+        except Exception:
+            logger.warning("Comment batch for review %s failed; retrying at the end", self.review_id, exc_info=True)
+            self.requeue(rows)
+            return
+        metrics.record_comment_batch(len(rows), time.perf_counter() - started)
+
+    async def drain(self) -> list[dict]:
+        """Wait for background batches and return the rows not yet written."""
+        self._cancel_timer()
+        if self._writing is not None:
+            await asyncio.shield(self._writing)
+        rows, self._pending = self._pending, []
+        return rows
+
+    def requeue(self, rows: list[dict]):
+        """Put rows that failed to save back ahead of the buffered ones."""
+        self._pending[:0] = rows
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+class ReviewJobManager:
+    """Bounded pool of review workers plus the event logs their subscribers read."""
+
+    def __init__(self, writer: DbWriter = db_writer):
+        self.settings = get_settings()
+        self.writer = writer
+        self._logs: OrderedDict[str, JobLog] = OrderedDict()
+        self._runs: dict[str, Callable[[], AsyncIterator[dict]]] = {}
+        self._inflight: dict[str, JobLog] = {}
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._loop = None
+        self._running = 0
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def _ensure_workers(self):
+        # asyncio primitives are bound to one event loop; restart the pool if it changed
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(max(1, self.settings.review_workers))
+        ]
+        for job_id, log in self._logs.items():
+            if not log.finished and job_id in self._runs:
+                self._queue.put_nowait(job_id)
+
+    async def _worker(self, n: int):
+        while True:
+            job_id = await self._queue.get()
+            run = self._runs.pop(job_id, None)
+            log = self._logs.get(job_id)
+            if run is None or log is None:
+                continue
+            self._running += 1
+            try:
+                await self._run(log, run)
+            except Exception:
+                logger.exception("Review worker %d crashed on job %s", n, job_id)
+            finally:
+                self._running -= 1
+
+    async def shutdown(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(
+        self,
+        job_id: str,
+        review_id: str,
+        document_id: str,
+        run: Callable[[], AsyncIterator[dict]],
+        key: str | None = None,
+    ) -> JobLog:
+        """Queue a review. ``run()`` must return the review's event stream.
+
+        With a ``key`` (see ``review_request_key``), identical requests can
+        ``attach`` to this job until it finishes.
+        """
+        self._ensure_workers()
+        self._prune()
+        log = JobLog(job_id, review_id, key)
+        log.append({"type": "job", "job_id": job_id, "review_id": review_id, "document_id": document_id})
+        self._logs[job_id] = log
+        if key:
+            self._inflight[key] = log
+        self._runs[job_id] = run
+        self._queue.put_nowait(job_id)
+        logger.info("Review job %s queued (queue depth %d)", job_id, self._queue.qsize())
+        return log
+
+    def _prune(self):
+        """Drop event logs of jobs that finished more than the retention period ago."""
+        cutoff = time.monotonic() - self.settings.review_job_retention_seconds
+        for job_id in [j for j, log in self._logs.items() if log.finished and log.finished_at < cutoff]:
+            del self._logs[job_id]
+
+    def get(self, job_id: str) -> JobLog | None:
+        return self._logs.get(job_id)
+
+    def attach(self, key: str, persona_calls: int) -> JobLog | None:
+        """Return the unfinished job for ``key``, counting the request as coalesced."""
+        log = self._inflight.get(key)
+        if log is None or log.finished:
+            return None
+        log.coalesced += 1
+        metrics.record_review_coalesced(persona_calls)
+        logger.info("Review request coalesced into job %s (%d attached)", log.job_id, log.coalesced)
+        return log
+
+    # ------------------------------------------------------------------
+    # Job lifecycle
+    # ------------------------------------------------------------------
+    async def _run(self, log: JobLog, run: Callable[[], AsyncIterator[dict]]):
+        await self._mark_running(log.job_id)
+        comments = CommentWriter(
+            self.writer,
+            log.review_id,
+            self.settings.review_comment_batch_size,
+            self.settings.review_comment_flush_seconds,
+        )
+        meta_comments = []
+        completed = False
+        try:
+            async for event in run():
+                if event.get("type") == "comment":
+                    comments.add(event["comment"])
+                if event.get("type") == "meta_comment":
+                    meta_comments.append(event["comment"])
+                if event.get("type") == "meta_verdict":
+                    try:
+                        await self._persist_meta(log, meta_comments, event)
+                    except Exception:
+                        # The review itself is saved; the meta panel can synthesize again
+                        logger.exception("Failed to save meta review of job %s", log.job_id)
+                if event.get("type") == "done":
+                    event["review_id"] = log.review_id
+                    event["job_id"] = log.job_id
+                    usage = event.get("usage", {})
+                    await self._persist_completion(log, comments, usage)
+                    # Only now: if saving the completion failed, the job is marked failed below
+                    completed = True
+                    if log.coalesced:
+                        metrics.record_coalesced_tokens_saved(
+                            log.coalesced * (usage.get("input_tokens", 0) + usage.get("output_tokens", 0))
+                        )
+                log.append(event)
+        except asyncio.CancelledError:
+            if not completed:
+                await self._persist_failure(log, "Review interrupted by server shutdown", comments)
+            log.append({"type": "error", "error": "interrupted", "detail": "Review interrupted by server shutdown"})
+            raise
+        except Exception as e:
+            vos_err = classify_anthropic_error(e)
+            logger.exception("Review job %s failed [%s]: %s", log.job_id, vos_err.code, vos_err.message)
+            if not completed:
+                await self._persist_failure(log, vos_err.message, comments)
+            log.append({"type": "error", "error": vos_err.code, "detail": vos_err.message})
+        else:
+            if not log.finished:
+                # The review ended without a done event; never leave subscribers hanging
+                if not completed:
+                    await self._persist_failure(log, "Review ended unexpectedly", comments)
+                log.append({"type": "error", "error": "incomplete", "detail": "Review ended unexpectedly"})
+        finally:
+            if log.key and self._inflight.get(log.key) is log:
+                del self._inflight[log.key]
+
+    async def _mark_running(self, job_id: str):
+        async def mark(db):
+            job = await db.get(DbReviewJob, job_id)
+            if job:
+                job.status = "running"
+
+        await self.writer.write(mark)
+
+    async def _persist_completion(self, log: JobLog, comments: CommentWriter, usage: dict):
+        started = time.perf_counter()
+        rows = await comments.drain()
+
+        async def complete(db):
+            if rows:
+                await db.execute(insert(DbComment), rows)
+
+            review = await db.get(DbReview, log.review_id)
+            if review:
+                review.status = "completed"
+                review.completed_at = datetime.utcnow()
+
+            job = await db.get(DbReviewJob, log.job_id)
+            if job:
+                job.status = "completed"
+                job.completed_at = datetime.utcnow()
+                job.input_tokens = usage.get("input_tokens", 0)
+                job.output_tokens = usage.get("output_tokens", 0)
+                job.cache_read_tokens = usage.get("cache_read_tokens", 0)
+                job.cache_write_tokens = usage.get("cache_write_tokens", 0)
+
+        try:
+            await self.writer.write(complete)
+        except BaseException:
+            # Keep the drained comments for the failure transaction
+            comments.requeue(rows)
+            raise
+        metrics.record_review_persist(time.perf_counter() - started)
+
+    async def _persist_meta(self, log: JobLog, meta_comments: list[dict], verdict: dict):
+        async def save(db):
+            review = await db.get(DbReview, log.review_id)
+            if review is None:
+                return
+            review.meta_verdict = verdict["verdict"]
+            review.meta_confidence = verdict["confidence"]
+            for data in meta_comments:
+                mc = MetaComment.model_validate(data)
+                db.add(DbMetaComment(
+                    id=mc.id,
+                    review_id=log.review_id,
+                    content=mc.content,
+                    start_line=mc.start_line,
+                    end_line=mc.end_line,
+                    sources=[s.model_dump() for s in mc.sources],
+                    category=mc.category,
+                    priority=mc.priority,
+                    created_at=mc.created_at,
+                ))
+
+        await self.writer.write(save)
+
+    async def _persist_failure(self, log: JobLog, message: str, comments: CommentWriter | None = None):
+        # Comments delivered before the failure are kept with the failed review
+        rows = await comments.drain() if comments else []
+
+        async def fail(db):
+            if rows:
+                await db.execute(insert(DbComment), rows)
+            job = await db.get(DbReviewJob, log.job_id)
+            if job:
+                job.status = "failed"
+                job.error_message = message
+                job.completed_at = datetime.utcnow()
+            review = await db.get(DbReview, log.review_id)
+            if review:
+                review.status = "failed"
+                review.completed_at = datetime.utcnow()
+
+        await self.writer.write(fail)
+
+    async def recover_interrupted(self) -> int:
+        """Fail jobs left queued/running by a previous process. Returns how many were fixed."""
+        async def recover(db):
+            stale = list(await db.scalars(select(DbReviewJob).where(DbReviewJob.status.in_(["queued", "running"]))))
+            now = datetime.utcnow()
+            for job in stale:
+                job.status = "failed"
+                job.error_message = "Interrupted by server restart"
+                job.completed_at = now
+                for review in await db.scalars(
+                    select(DbReview).where(DbReview.job_id == job.id, DbReview.status == "running")
+                ):
+                    review.status = "failed"
+                    review.completed_at = now
+            return len(stale)
+
+        count = await self.writer.write(recover)
+        if count:
+            logger.warning("Marked %d interrupted review jobs as failed", count)
+        return count
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+    async def stream(self, job_id: str, after: int = 0) -> AsyncIterator[str]:
+        """SSE frames for a job's events after event id ``after``."""
+        log = self._logs[job_id]
+        async for event_id, event in log.follow(after):
+            yield f"id: {event_id}\ndata: {json.dumps(event, default=str)}\n\n"
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "running": self._running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "retained_logs": len(self._logs),
+            "inflight_keys": len(self._inflight),
+        }
+
+
+review_jobs = ReviewJobManager()
@@ -2,20 +2,32 @@ import asyncio
 import logging
 import time
 import uuid
-import re
+from collections.abc import AsyncGenerator, Awaitable, Callable
 from datetime import datetime
-from typing import AsyncGenerator, List, Optional
-from anthropic import AsyncAnthropic
+from typing import Optional
 
-from models.persona import Persona, PersonaTone
-from models.comment import Comment, CommentAnchor
 from core.config import get_settings
 from core.errors import classify_anthropic_error
 from core.observability import metrics
-from database import SessionLocal, DbPersona
+from database import DbPersona, SessionLocal
+from models.comment import Comment, CommentAnchor
+from models.persona import Persona, PersonaTone
+from services.comment_parser import StreamingCommentParser
+from services.llm_client import llm_pool
+from services.llm_scheduler import PRIORITY_INTERACTIVE, estimate_tokens, llm_scheduler
+from services.review_cache import ReviewCache, review_cache, review_cache_key
+from services.review_chunks import CommentDeduper, chunk_paragraphs
+from services.review_diff import carry_forward_comments, diff_paragraphs, with_context
 
 logger = logging.getLogger("vos.review")
 
+# Bump whenever the review prompt or comment parsing changes so cached
+# results produced by the old template are no longer replayed.
+PROMPT_TEMPLATE_VERSION = "2"
+
+# Content prefix of the comment emitted when a persona's review fails
+REVIEW_ERROR_PREFIX = "⚠ Review error"
+
 PERSONAS = [
     Persona(
         id="devils-advocate",
@@ -223,20 +235,64 @@ def _load_personas_from_db() -> dict[str, Persona]:
     return {p.id: p for p in PERSONAS}
 
 
+USAGE_FIELDS = {
+    "input_tokens": "input_tokens",
+    "output_tokens": "output_tokens",
+    "cache_read_input_tokens": "cache_read_tokens",
+    "cache_creation_input_tokens": "cache_write_tokens",
+}
+
+
+def _add_usage(totals: dict | None, usage) -> None:
+    """Accumulate provider usage counters (missing/None fields count as 0)."""
+    if totals is None or usage is None:
+        return
+    for attr, key in USAGE_FIELDS.items():
+        totals[key] = totals.get(key, 0) + (getattr(usage, attr, None) or 0)
+
+
+class _PrefixCacheGate:
+    """Lets the first persona call write the shared prompt-cache entry before the rest start.
+
+    Cache entries only become readable once the first response begins, so
+    launching every persona at once would make each of them pay a cache write.
+    """
+
+    def __init__(self, timeout: float):
+        self._event = asyncio.Event()
+        self._claimed = False
+        self._timeout = timeout
+
+    async def enter(self) -> bool:
+        """Return True for the leader; everyone else waits for the leader's first tokens."""
+        if not self._claimed:
+            self._claimed = True
+            return True
+        try:
+            await asyncio.wait_for(self._event.wait(), self._timeout)
+        except TimeoutError:
+            pass
+        return False
+
+    def release(self):
+        self._event.set()
+
+
 class ReviewService:
     """AI-powered document review with concurrent streaming"""
 
-    def __init__(self):
+    def __init__(self, cache: ReviewCache | None = None):
         self.settings = get_settings()
         self._personas = _load_personas_from_db()
+        self.cache = cache or review_cache
 
-    def get_persona(self, persona_id: str) -> Optional[Persona]:
+    def get_persona(self, persona_id: str) -> Persona | None:
         return self._personas.get(persona_id)
 
-    def list_personas(self) -> List[Persona]:
+    def list_personas(self) -> list[Persona]:
         return list(self._personas.values())
 
-    def _parse_document_structure(self, content: str) -> List[dict]:
+    def _parse_document_structure(self, content: str) -> list[dict]:
         """Parse markdown into paragraphs with positions"""
         paragraphs = []
         lines = content.split('\n')
@@ -268,26 +324,89 @@ class ReviewService:
 
         return paragraphs
 
-    async def _review_with_persona(
+    def _make_comment(
         self,
         persona: Persona,
-        content: str,
+        text: str,
+        start_line: int,
+        end_line: int,
         document_id: str,
         version_hash: str,
-        paragraphs: List[dict],
-        model: str,
-    ) -> List[Comment]:
-        """Run a single persona's review and return all comments"""
-        t0 = time.time()
-        logger.info("Persona '%s' starting review of doc %s (%d paragraphs)", persona.name, document_id, len(paragraphs))
-        client = AsyncAnthropic(api_key=self.settings.anthropic_api_key)
+    ) -> Comment:
+        return Comment(
+            id=str(uuid.uuid4())[:8],
+            content=text,
+            anchor=CommentAnchor(
+                file_path="document.md",
+                start_line=start_line,
+                end_line=end_line
+            ),
+            persona_id=persona.id,
+            persona_name=persona.name,
+            persona_color=persona.color,
+            document_id=document_id,
+            version_hash=version_hash,
+            created_at=datetime.utcnow()
+        )
+
+    async def _load_cached(self, cache_key: str) -> list[dict] | None:
+        try:
+            return await asyncio.to_thread(self.cache.get, cache_key)
+        except Exception as e:
+            logger.warning("Review cache lookup failed: %s", e, exc_info=True)
+            return None
+
+    async def _store_cached(self, cache_key: str, persona: Persona, model: str, comments: list[Comment]):
+        """Write a persona's result to the review cache; cache failures never fail the review."""
+        payload = [
+            {"content": c.content, "start_line": c.anchor.start_line, "end_line": c.anchor.end_line}
+            for c in comments
+        ]
+        try:
+            await asyncio.to_thread(self.cache.put, cache_key, persona.id, model, payload)
+        except Exception as e:
+            logger.warning("Failed to cache review for persona '%s': %s", persona.name, e, exc_info=True)
 
-        prompt = f"""Review this document and provide specific, actionable comments.
+    def _build_prompt(
+        self,
+        content: str,
+        paragraphs: list[dict],
+        focus: list[int] | None = None,
+        window: list[int] | None = None,
+    ) -> tuple[str, str]:
+        """Build the prompt for a full review, for the ``focus`` paragraphs only,
+        or for one ``window`` of a chunked review.
+
+        Returns ``(document_block, instructions)``. The document block is
+        identical for every persona so it can be sent as a cached system
+        prefix; the instructions go in the user turn.
+        """
+        if window is not None:
+            excerpt = "\n\n".join(f"(paragraph {i})\n{paragraphs[i]['text']}" for i in window)
+            document_block = f"""You are one of several expert reviewers examining a long document one section at a time.
+
+Section (paragraph numbers refer to the full document):
+---
+{excerpt}
+---"""
+            instructions = f"""Review this section of a longer document and provide specific, actionable comments.
+
+The full document has {len(paragraphs)} paragraphs; this section covers paragraphs {window[0]} to {window[-1]}. Only comment on paragraphs in this section.
+Format each comment as:
+[PARAGRAPH X] Your comment here
+
+Be specific and concise. Provide 2-4 comments on this section, focusing on different paragraphs.
+Your comments should reflect your unique perspective and expertise."""
+            return document_block, instructions
+
+        if focus is None:
+            document_block = f"""You are one of several expert reviewers examining the document below.
 
 Document:
 ---
 {content}
----
+---"""
+            instructions = f"""Review this document and provide specific, actionable comments.
 
 The document has {len(paragraphs)} paragraphs. For each comment, specify which paragraph (by number, 0-indexed) you're commenting on.
 Format each comment as:
@@ -295,81 +414,306 @@ Format each comment as:
 
 Be specific and concise. Provide 3-5 comments total, focusing on different parts of the document.
 Your comments should reflect your unique perspective and expertise."""
+            return document_block, instructions
+
+        changed = set(focus)
+        shown = with_context(focus, len(paragraphs), self.settings.incremental_context_paragraphs)
+        excerpt = "\n\n".join(
+            f"(paragraph {i}{', changed' if i in changed else ''})\n{paragraphs[i]['text']}"
+            for i in shown
+        )
+        changed_list = ", ".join(str(i) for i in sorted(changed))
+        document_block = f"""You are one of several expert reviewers examining an edited document.
+
+Excerpt (paragraph numbers refer to the full document):
+---
+{excerpt}
+---"""
+        instructions = f"""This document was edited since your last review. Review only the changed paragraphs and provide specific, actionable comments.
 
-        comments = []
-        try:
-            async with client.messages.stream(
-                model=model,
-                max_tokens=1024,
-                system=persona.system_prompt,
-                messages=[{"role": "user", "content": prompt}]
-            ) as stream:
-                full_response = ""
-                async for text in stream.text_stream:
-                    full_response += text
-
-            comment_pattern = r'\[PARAGRAPH\s*(\d+)\]\s*(.+?)(?=\[PARAGRAPH|\Z)'
-            matches = re.findall(comment_pattern, full_response, re.DOTALL)
-
-            for para_num, comment_text in matches:
-                para_idx = int(para_num)
+The full document has {len(paragraphs)} paragraphs. The changed paragraphs are: {changed_list}. Unchanged paragraphs are shown only for context; do not comment on them.
+Format each comment as:
+[PARAGRAPH X] Your comment here
+
+Be specific and concise. Provide 1-3 comments total, only on changed paragraphs.
+Your comments should reflect your unique perspective and expertise."""
+        return document_block, instructions
+
+    def _build_system(self, document_block: str, persona: Persona) -> list[dict]:
+        """System blocks: the shared document first (cacheable), then the persona prompt."""
+        block = {"type": "text", "text": document_block}
+        if self._is_cacheable(document_block):
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block, {"type": "text", "text": persona.system_prompt}]
+
+    def _is_cacheable(self, document_block: str) -> bool:
+        # Rough estimate of 4 chars/token; providers ignore cache_control below their minimum anyway
+        return (
+            self.settings.prompt_cache_enabled
+            and len(document_block) // 4 >= self.settings.prompt_cache_min_tokens
+        )
+
+    async def _review_with_persona(
+        self,
+        persona: Persona,
+        content: str,
+        document_id: str,
+        version_hash: str,
+        paragraphs: list[dict],
+        model: str,
+        cache_key: str | None = None,
+        focus: list[int] | None = None,
+        usage: dict | None = None,
+        prefix_gate: Optional["_PrefixCacheGate"] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        on_status: Callable[..., Awaitable[None]] | None = None,
+        window: list[int] | None = None,
+    ) -> AsyncGenerator[Comment, None]:
+        """Run a single persona's review, yielding each comment as soon as it is parsed.
+
+        When ``cache_key`` is given, a successful result is stored in the
+        review cache under that key. When ``focus`` is given, only those
+        paragraph indices are sent for review (plus surrounding context).
+        When ``window`` is given, only that slice of a chunked review is sent.
+        Token usage, including prompt-cache reads/writes, is added to
+        ``usage``. ``prefix_gate`` holds back all but the first persona until
+        the shared document prefix has been written to the provider cache.
+
+        The call is admitted by the global LLM scheduler at ``priority``;
+        ``on_status(status, **extra)`` is awaited when it starts running and
+        when it goes back to the queue after a rate-limit.
+        """
+        t0 = time.time()
+        scope = focus if focus is not None else window
+        logger.info(
+            "Persona '%s' starting review of doc %s (%d paragraphs)",
+            persona.name, document_id, len(scope) if scope is not None else len(paragraphs),
+        )
+        client = llm_pool.get_client()
+
+        document_block, instructions = self._build_prompt(content, paragraphs, focus, window)
+        scope_set = set(scope) if scope is not None else None
+
+        def to_comments(blocks) -> list[Comment]:
+            parsed = []
+            for para_idx, comment_text in blocks:
+                if scope_set is not None and para_idx not in scope_set:
+                    continue
                 if para_idx < len(paragraphs):
                     para = paragraphs[para_idx]
-                    comment = Comment(
-                        id=str(uuid.uuid4())[:8],
-                        content=comment_text.strip(),
-                        anchor=CommentAnchor(
-                            file_path="document.md",
-                            start_line=para["start_line"],
-                            end_line=para["end_line"]
-                        ),
-                        persona_id=persona.id,
-                        persona_name=persona.name,
-                        persona_color=persona.color,
-                        document_id=document_id,
-                        version_hash=version_hash,
-                        created_at=datetime.utcnow()
-                    )
-                    comments.append(comment)
+                    parsed.append(self._make_comment(
+                        persona, comment_text, para["start_line"], para["end_line"],
+                        document_id, version_hash,
+                    ))
+            return parsed
+
+        comments = []
+        parser = StreamingCommentParser()
+        system = self._build_system(document_block, persona)
+        est_tokens = estimate_tokens(document_block, persona.system_prompt, instructions, max_tokens=1024)
+        is_leader = False
+        try:
+            if prefix_gate is not None:
+                is_leader = await prefix_gate.enter()
+            attempt = 0
+            while True:
+                started = False
+                try:
+                    async with llm_scheduler.admit(model, est_tokens, priority) as waited:
+                        if on_status:
+                            await on_status("running", queue_wait_ms=round(waited * 1000))
+                        async with client.messages.stream(
+                            model=model,
+                            max_tokens=1024,
+                            system=system,
+                            messages=[{"role": "user", "content": instructions}]
+                        ) as stream:
+                            async for text in stream.text_stream:
+                                started = True
+                                if is_leader:
+                                    # First tokens mean the prefix is cached; let the other personas go
+                                    prefix_gate.release()
+                                    is_leader = False
+                                for comment in to_comments(parser.feed(text)):
+                                    comments.append(comment)
+                                    yield comment
+                            final_message = await stream.get_final_message()
+                    break
+                except Exception as e:
+                    # Only retry before any output was streamed, so comments are never duplicated
+                    attempt += 1
+                    delay = None if started else llm_scheduler.retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    if on_status:
+                        await on_status("queued", reason="rate_limited", retry_in_s=round(delay, 1), attempt=attempt)
+                    await asyncio.sleep(delay)
+
+            call_usage: dict[str, int] = {}
+            _add_usage(call_usage, getattr(final_message, "usage", None))
+            llm_scheduler.settle(
+                est_tokens,
+                call_usage.get("input_tokens", 0) + call_usage.get("output_tokens", 0)
+                + call_usage.get("cache_write_tokens", 0),
+            )
+            if usage is not None:
+                for key, value in call_usage.items():
+                    usage[key] = usage.get(key, 0) + value
+
+            for comment in to_comments(parser.close()):
+                comments.append(comment)
+                yield comment
+
+            if cache_key:
+                await self._store_cached(cache_key, persona, model, comments)
             elapsed = time.time() - t0
             logger.info("Persona '%s' completed doc %s: %d comments in %.1fs", persona.name, document_id, len(comments), elapsed)
-            metrics.record_persona_completion()
+            if window is None:
+                metrics.record_persona_completion()
         except Exception as e:
             vos_err = classify_anthropic_error(e)
             logger.error(
                 "Persona '%s' review failed [%s]: %s",
                 persona.name, vos_err.code, vos_err.message,
             )
-            comments.append(Comment(
-                id=str(uuid.uuid4())[:8],
-                content=f"⚠ Review error: {vos_err.message}",
-                anchor=CommentAnchor(file_path="document.md", start_line=0, end_line=0),
-                persona_id=persona.id,
-                persona_name=persona.name,
-                persona_color=persona.color,
-                document_id=document_id,
-                version_hash=version_hash,
-                created_at=datetime.utcnow()
-            ))
-
-        return comments
+            yield self._make_comment(
+                persona, f"{REVIEW_ERROR_PREFIX}: {vos_err.message}", 0, 0, document_id, version_hash,
+            )
+        finally:
+            if is_leader:
+                prefix_gate.release()
+
+    async def _review_chunked(
+        self,
+        persona: Persona,
+        content: str,
+        document_id: str,
+        version_hash: str,
+        paragraphs: list[dict],
+        model: str,
+        windows: list[list[int]],
+        cache_key: str | None = None,
+        usage: dict | None = None,
+        prefix_gates: list[Optional["_PrefixCacheGate"]] | None = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        on_status: Callable[..., Awaitable[None]] | None = None,
+    ) -> AsyncGenerator[Comment, None]:
+        """Map-reduce review of a long document: one call per window, merged and deduped.
+
+        Up to ``review_chunk_parallelism`` windows run at once for this
+        persona. Comments keep full-document paragraph numbers and are yielded
+        as soon as any window produces them; repeats of a comment already
+        emitted by another window are dropped. The merged result is only
+        cached if every window succeeded.
+        """
+        t0 = time.time()
+        logger.info(
+            "Persona '%s' starting chunked review of doc %s (%d paragraphs, %d windows)",
+            persona.name, document_id, len(paragraphs), len(windows),
+        )
+        semaphore = asyncio.Semaphore(max(1, self.settings.review_chunk_parallelism))
+        results: asyncio.Queue = asyncio.Queue()
+        running = False
+
+        async def window_status(status: str, **extra):
+            # Report the persona as running once its first window is admitted;
+            # a later window going back to the queue does not undo that.
+            nonlocal running
+            if running:
+                return
+            running = status == "running"
+            await on_status(status, **extra)
+
+        async def run_window(i: int, window: list[int]):
+            try:
+                async with semaphore:
+                    async for comment in self._review_with_persona(
+                        persona, content, document_id, version_hash, paragraphs, model,
+                        usage=usage, prefix_gate=prefix_gates[i] if prefix_gates else None,
+                        priority=priority, on_status=window_status if on_status else None,
+                        window=window,
+                    ):
+                        await results.put(comment)
+            finally:
+                await results.put(None)
+
+        tasks = [asyncio.create_task(run_window(i, w)) for i, w in enumerate(windows)]
+        deduper = CommentDeduper()
+        comments = []
+        failed = False
+        remaining = len(tasks)
+        try:
+            while remaining:
+                comment = await results.get()
+                if comment is None:
+                    remaining -= 1
+                    continue
+                if comment.content.startswith(REVIEW_ERROR_PREFIX):
+                    failed = True
+                if deduper.is_new(comment.content):
+                    comments.append(comment)
+                    yield comment
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        if failed:
+            return
+        if cache_key:
+            await self._store_cached(cache_key, persona, model, comments)
+        logger.info(
+            "Persona '%s' completed chunked review of doc %s: %d comments in %.1fs",
+            persona.name, document_id, len(comments), time.time() - t0,
+        )
+        metrics.record_persona_completion()
+
+    def _chunk_windows(self, content: str, paragraphs: list[dict]) -> list[list[int]] | None:
+        """Review windows for a document above the chunking threshold, else None."""
+        if estimate_tokens(content) < self.settings.review_chunk_threshold_tokens:
+            return None
+        windows = chunk_paragraphs(paragraphs, self.settings.review_chunk_tokens)
+        return windows if len(windows) > 1 else None
 
     async def review_document(
         self,
         document_id: str,
         content: str,
         version_hash: str,
-        persona_ids: Optional[List[str]] = None,
-        model: str = "claude-sonnet-4-5-20250929"
+        persona_ids: list[str] | None = None,
+        model: str = "claude-sonnet-4-5-20250929",
+        use_cache: bool = True,
+        previous_review: dict | None = None,
+        priority: int = PRIORITY_INTERACTIVE,
     ) -> AsyncGenerator[dict, None]:
-        """Stream review events: persona status updates + comments as they arrive"""
+        """Stream review events: persona status updates + comments as they arrive.
+
+        With ``use_cache`` (and the cache enabled in settings) personas whose
+        result is already cached are replayed without calling the LLM.
+
+        ``previous_review`` enables incremental mode. It is a dict with the
+        ``content``, ``persona_ids`` and ``comments`` (persona_id, content,
+        start_line, end_line) of the last completed review. Comments on
+        unchanged paragraphs are carried forward and personas are only asked
+        about changed paragraphs.
+
+        Personas stay ``queued`` until the LLM scheduler admits them at
+        ``priority``; only then is their ``running`` status emitted.
+
+        Documents above ``review_chunk_threshold_tokens`` get a chunked
+        (map-reduce) full review; see ``_review_chunked``.
+        """
 
         personas = [self._personas[pid] for pid in (persona_ids or self._personas.keys())
                     if pid in self._personas]
 
         paragraphs = self._parse_document_structure(content)
+        windows = self._chunk_windows(content, paragraphs)
         review_start = time.time()
-        logger.info("Review started: doc=%s, personas=%d, paragraphs=%d, model=%s", document_id, len(personas), len(paragraphs), model)
+        logger.info(
+            "Review started: doc=%s, personas=%d, paragraphs=%d, windows=%d, model=%s",
+            document_id, len(personas), len(paragraphs), len(windows) if windows else 1, model,
+        )
         metrics.record_review_start()
 
         # Emit initial status
@@ -382,47 +726,155 @@ Your comments should reflect your unique perspective and expertise."""
                 "status": "queued"
             }
 
-        # Run all personas concurrently
-        async def run_persona(persona: Persona):
-            return persona, await self._review_with_persona(
-                persona, content, document_id, version_hash, paragraphs, model
+        use_cache = use_cache and self.cache.enabled
+
+        changed = None
+        carried_by_persona: dict[str, list[dict]] = {}
+        if previous_review is not None:
+            old_paragraphs = self._parse_document_structure(previous_review["content"])
+            diff = diff_paragraphs(old_paragraphs, paragraphs)
+            changed = diff["changed"]
+            for c in carry_forward_comments(
+                previous_review["comments"], old_paragraphs, paragraphs, diff["unchanged"]
+            ):
+                carried_by_persona.setdefault(c["persona_id"], []).append(c)
+            logger.info(
+                "Incremental review: doc=%s, changed paragraphs=%d/%d, carried comments=%d",
+                document_id, len(changed), len(paragraphs),
+                sum(len(v) for v in carried_by_persona.values()),
             )
 
-        tasks = [asyncio.create_task(run_persona(p)) for p in personas]
-
-        # Mark all as running
-        for persona in personas:
-            yield {
-                "type": "persona_status",
-                "persona_id": persona.id,
-                "persona_name": persona.name,
-                "persona_color": persona.color,
-                "status": "running"
-            }
+        # Run all personas concurrently; each pushes its events onto a shared
+        # queue so comments reach the client while other personas still stream.
+        events: asyncio.Queue = asyncio.Queue()
+
+        # Personas sharing the same document block share one prompt-cache prefix
+        def make_gate(
+            focus: list[int] | None = None, window: list[int] | None = None
+        ) -> _PrefixCacheGate | None:
+            if not self.settings.prompt_cache_warmup:
+                return None
+            document_block, _ = self._build_prompt(content, paragraphs, focus, window)
+            if not self._is_cacheable(document_block):
+                return None
+            return _PrefixCacheGate(self.settings.prompt_cache_warmup_timeout_seconds)
+
+        full_gate = make_gate() if not windows else None
+        window_gates = [make_gate(window=w) for w in windows] if windows else None
+        focus_gate = make_gate(changed) if changed else None
+        # Chunked results depend on the window size, so they get their own cache entries
+        template_version = (
+            f"{PROMPT_TEMPLATE_VERSION}:chunks={self.settings.review_chunk_tokens}"
+            if windows else PROMPT_TEMPLATE_VERSION
+        )
+        total_usage: dict[str, int] = {}
 
-        all_comments = []
+        async def run_persona(persona: Persona):
+            def comment_event(comment: Comment) -> dict:
+                return {"type": "comment", "comment": comment.model_dump(mode="json")}
+
+            async def put_status(status: str, **extra):
+                await events.put({
+                    "type": "persona_status",
+                    "persona_id": persona.id,
+                    "persona_name": persona.name,
+                    "persona_color": persona.color,
+                    "status": status,
+                    **extra,
+                })
 
-        for coro in asyncio.as_completed(tasks):
-            persona, comments = await coro
-            all_comments.extend(comments)
+            info = {"cached": False}
+            usage: dict[str, int] = {}
+            cache_key = None
+            try:
+                if use_cache:
+                    cache_key = review_cache_key(content, persona.system_prompt, model, template_version)
+                    cached = await self._load_cached(cache_key)
+                    if cached is not None:
+                        logger.info("Persona '%s' replayed from cache for doc %s", persona.name, document_id)
+                        info["cached"] = True
+                        await put_status("running")
+                        for c in cached:
+                            await events.put(comment_event(self._make_comment(
+                                persona, c["content"], c["start_line"], c["end_line"], document_id, version_hash,
+                            )))
+                        return
+
+                if changed is not None and persona.id in previous_review["persona_ids"]:
+                    carried = carried_by_persona.get(persona.id, [])
+                    info["carried_forward"] = len(carried)
+                    if not changed:
+                        await put_status("running")
+                    for c in carried:
+                        await events.put(comment_event(self._make_comment(
+                            persona, c["content"], c["start_line"], c["end_line"], document_id, version_hash,
+                        )))
+                    if changed:
+                        async for comment in self._review_with_persona(
+                            persona, content, document_id, version_hash, paragraphs, model,
+                            focus=changed, usage=usage, prefix_gate=focus_gate,
+                            priority=priority, on_status=put_status,
+                        ):
+                            await events.put(comment_event(comment))
+                    return
+
+                if windows:
+                    info["chunks"] = len(windows)
+                    review = self._review_chunked(
+                        persona, content, document_id, version_hash, paragraphs, model, windows,
+                        cache_key=cache_key, usage=usage, prefix_gates=window_gates,
+                        priority=priority, on_status=put_status,
+                    )
+                else:
+                    review = self._review_with_persona(
+                        persona, content, document_id, version_hash, paragraphs, model,
+                        cache_key=cache_key, usage=usage, prefix_gate=full_gate,
+                        priority=priority, on_status=put_status,
+                    )
+                async for comment in review:
+                    await events.put(comment_event(comment))
+            finally:
+                if usage:
+                    info["usage"] = usage
+                    for key, value in usage.items():
+                        total_usage[key] = total_usage.get(key, 0) + value
+                await put_status("completed", **info)
 
-            # Emit completed status
-            yield {
-                "type": "persona_status",
-                "persona_id": persona.id,
-                "persona_name": persona.name,
-                "persona_color": persona.color,
-                "status": "completed"
-            }
+        tasks = [asyncio.create_task(run_persona(p)) for p in personas]
 
-            # Emit each comment
-            for comment in comments:
-                yield {
-                    "type": "comment",
-                    "comment": comment.model_dump(mode="json")
-                }
+        total_comments = 0
+        remaining = len(tasks)
+        try:
+            while remaining:
+                event = await events.get()
+                if event["type"] == "comment":
+                    latency = time.time() - review_start
+                    if total_comments == 0:
+                        metrics.record_time_to_first_comment(latency)
+                    metrics.record_comment_latency(latency)
+                    total_comments += 1
+                elif event["type"] == "persona_status" and event["status"] == "completed":
+                    remaining -= 1
+                yield event
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        # Surface unexpected failures (persona errors are already comments)
+        for task in tasks:
+            if not task.cancelled() and task.exception():
+                raise task.exception()
 
         elapsed = time.time() - review_start
-        logger.info("Review completed: doc=%s, comments=%d, duration=%.1fs", document_id, len(all_comments), elapsed)
+        logger.info("Review completed: doc=%s, comments=%d, duration=%.1fs", document_id, total_comments, elapsed)
         metrics.record_review_complete(elapsed)
-        yield {"type": "done", "total_comments": len(all_comments)}
+        done = {"type": "done", "total_comments": total_comments}
+        if changed is not None:
+            done["changed_paragraphs"] = len(changed)
+        if windows:
+            done["chunks"] = len(windows)
+        if total_usage:
+            done["usage"] = total_usage
+            metrics.record_llm_usage(total_usage)
+        yield done
@@ -0,0 +1,338 @@
+"""Full-text search over documents, review comments and meta-review comments.
+
+One interface, two backends, chosen by the session's dialect:
+
+- SQLite: the FTS5 indexes created next to each table (``database.fts5_ddl``)
+  and kept in sync by triggers, so every write path (uploads, deletes,
+  streamed comment batches, meta-review persistence) updates them in the same
+  transaction. Ranked by bm25, snippets from ``snippet()``. The indexes
+  address rows by rowid, which a VACUUM may renumber, so startup checks them
+  against their tables and rebuilds any that drifted (``SearchIndex.repair``).
+- PostgreSQL: GIN indexes over ``to_tsvector()`` of the same columns; nothing
+  to keep in sync. Ranked by ``ts_rank_cd``, snippets from ``ts_headline``.
+
+Both take the same query language: words are ANDed, ``"quoted words"`` form
+a phrase and a trailing ``*`` matches a prefix. Anything else is ignored, so
+user input never reaches the engine's own query syntax.
+
+A common word can match most of 100k comments, and ranking every match costs
+far more than the rest of the query. So each kind ranks only its newest
+``search_candidate_limit`` matches that pass the filters. Narrower queries,
+which are most of them, are ranked exactly. Scores are comparable within a
+backend but not between the two.
+"""
+import html
+import logging
+import re
+import time
+from collections.abc import Iterable
+from functools import cache
+from typing import ClassVar
+
+from sqlalchemy import TextClause, cast, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from core.observability import metrics
+from database import (
+    FTS_COLUMNS,
+    SEARCH_LANGUAGE,
+    DbComment,
+    DbDocument,
+    DbMetaComment,
+    DbReview,
+)
+from services.db_writer import db_writer
+
+logger = logging.getLogger("vos.search")
+
+KINDS = ("document", "comment", "meta_comment")
+# Filters each kind can satisfy; a kind is skipped when asked for one it can't
+KIND_FILTERS = {
+    "document": {"document_id"},
+    "comment": {"document_id", "persona"},
+    "meta_comment": {"document_id", "persona", "category", "priority"},
+}
+HIGHLIGHT = ("<mark>", "</mark>")
+# What the engines wrap matches in: private-use characters, which survive
+# html.escape, so the text can be escaped before they become HIGHLIGHT tags
+MARKERS = ("\ue000", "\ue001")
+SNIPPET_TOKENS = 16
+
+_TERM = re.compile(r'"([^"]*)"|(\w+)(\*?)')
+
+
+class SearchQueryError(ValueError):
+    pass
+
+
+def parse_query(query: str) -> list[tuple[tuple[str, ...], bool]]:
+    """``[(words, prefix)]``: one entry per word or quoted phrase, all of which must match."""
+    terms = []
+    for match in _TERM.finditer(query):
+        phrase, word, star = match.groups()
+        words = tuple(re.findall(r"\w+", phrase)) if phrase is not None else (word,)
+        if words:
+            terms.append((words, bool(star)))
+    if not terms:
+        raise SearchQueryError("Search query needs at least one word")
+    return terms
+
+
+def _hit(kind: str, columns: dict) -> dict:
+    hit = {
+        "review_id": None, "persona_id": None, "persona_name": None, "category": None, "priority": None,
+        "start_line": None, "end_line": None, **columns, "kind": kind,
+    }
+    hit.pop("rank", None)
+    hit["score"] = round(float(hit["score"]), 4)
+    hit["snippet"] = _highlight(hit["snippet"] or "")
+    return hit
+
+
+def _highlight(snippet: str) -> str:
+    """The engine's snippet as HTML: text escaped, matches wrapped in HIGHLIGHT."""
+    return html.escape(snippet).replace(MARKERS[0], HIGHLIGHT[0]).replace(MARKERS[1], HIGHLIGHT[1])
+
+
+class Fts5Backend:
+    # Per kind: searched table, hit columns (t is the table) and extra joins
+    KINDS: ClassVar[dict[str, tuple[str, str, str]]] = {
+        "document": (
+            "documents",
+            (
+                "t.id AS id, t.id AS document_id, t.title AS document_title, NULL AS review_id, "
+                "NULL AS persona_id, NULL AS persona_name, NULL AS category, NULL AS priority, "
+                "NULL AS start_line, NULL AS end_line"
+            ),
+            "",
+        ),
+        "comment": (
+            "comments",
+            (
+                "t.id AS id, t.document_id AS document_id, d.title AS document_title, t.review_id AS review_id, "
+                "t.persona_id AS persona_id, t.persona_name AS persona_name, NULL AS category, NULL AS priority, "
+                "t.start_line AS start_line, t.end_line AS end_line"
+            ),
+            "LEFT JOIN documents d ON d.id = t.document_id",
+        ),
+        "meta_comment": (
+            "meta_comments",
+            (
+                "t.id AS id, r.document_id AS document_id, d.title AS document_title, t.review_id AS review_id, "
+                "NULL AS persona_id, NULL AS persona_name, t.category AS category, t.priority AS priority, "
+                "t.start_line AS start_line, t.end_line AS end_line"
+            ),
+            "JOIN reviews r ON r.id = t.review_id LEFT JOIN documents d ON d.id = r.document_id",
+        ),
+    }
+    FILTERS: ClassVar[dict[str, dict[str, str]]] = {
+        "document": {"document_id": "t.id = :document_id"},
+        "comment": {"document_id": "t.document_id = :document_id", "persona": "t.persona_id = :persona"},
+        "meta_comment": {
+            "document_id": "t.review_id IN (SELECT id FROM reviews WHERE document_id = :document_id)",
+            "persona": (
+                "EXISTS (SELECT 1 FROM json_each(t.sources) s "
+                "WHERE json_extract(s.value, '$.persona_id') = :persona)"
+            ),
+            "category": "t.category = :category",
+            "priority": "t.priority = :priority",
+        },
+    }
+
+    @staticmethod
+    def match_expression(terms: list[tuple[tuple[str, ...], bool]]) -> str:
+        return " ".join('"' + " ".join(words) + '"' + ("*" if prefix else "") for words, prefix in terms)
+
+    @staticmethod
+    @cache
+    def statement(kind: str, filters: tuple[str, ...]) -> TextClause:
+        table, columns, joins = Fts5Backend.KINDS[kind]
+        fts = f"{table}_fts"
+        where = f"{fts} MATCH :match" + "".join(f" AND {Fts5Backend.FILTERS[kind][name]}" for name in filters)
+        # The floor is where the newest candidates start; FTS5 walks its doclists
+        # backwards, so finding it reads no more rows than that. bm25 then runs over
+        # those alone, with snippets in the same pass: joining back to the index per
+        # hit would re-run the match (prefix expansion and all) for every row.
+        # Sorting on the selected rank computes it once per row.
+        return text(f"""
+            SELECT {columns}, snippet({fts}, -1, :open, :close, '…', :tokens) AS snippet, {fts}.rank AS rank
+            FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid {joins}
+            WHERE {where} AND {fts}.rowid >= (
+                SELECT min(rid) FROM (
+                    SELECT {fts}.rowid AS rid FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid
+                    WHERE {where} ORDER BY {fts}.rowid DESC LIMIT :candidates
+                )
+            )
+            ORDER BY rank LIMIT :limit
+        """)
+
+    async def search(self, db: AsyncSession, kind: str, terms, filters: dict, limit: int, candidates: int) -> list[dict]:
+        params = {
+            "match": self.match_expression(terms), "candidates": candidates, "limit": limit,
+            "open": MARKERS[0], "close": MARKERS[1], "tokens": SNIPPET_TOKENS, **filters,
+        }
+        rows = await db.execute(self.statement(kind, tuple(sorted(filters))), params)
+        # bm25 is lower-is-better
+        return [_hit(kind, {**row._mapping, "score": -row.rank}) for row in rows]
+
+    async def rebuild(self, db: AsyncSession):
+        for table in FTS_COLUMNS:
+            await self._rebuild_table(db, table)
+
+    async def repair(self, db: AsyncSession) -> list[str]:
+        """Rebuild the indexes that no longer match their table; returns those tables.
+
+        The index finds text by rowid, and rowids of these tables (String
+        primary keys) are not guaranteed to survive a VACUUM. The integrity
+        check compares every indexed row with the table's current content.
+        """
+        stale = []
+        for table in FTS_COLUMNS:
+            try:
+                await db.execute(text(f"INSERT INTO {table}_fts({table}_fts, rank) VALUES ('integrity-check', 1)"))
+            except DatabaseError:
+                stale.append(table)
+                await self._rebuild_table(db, table)
+        return stale
+
+    @staticmethod
+    async def _rebuild_table(db: AsyncSession, table: str):
+        await db.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+
+
+class TsvectorBackend:
+    LANGUAGE = literal_column(f"'{SEARCH_LANGUAGE}'")
+    HEADLINE_OPTIONS = f"StartSel={MARKERS[0]}, StopSel={MARKERS[1]}, MaxWords={SNIPPET_TOKENS}, MinWords=8"
+
+    @staticmethod
+    def tsquery_expression(terms: list[tuple[tuple[str, ...], bool]]) -> str:
+        # Words are \w+ only, so quoting them is enough to keep to_tsquery operators out
+        def term(words, prefix):
+            lexemes = [f"'{w}'" for w in words]
+            if prefix:
+                lexemes[-1] += ":*"
+            return " <-> ".join(lexemes)
+        return " & ".join(term(words, prefix) for words, prefix in terms)
+
+    def _kind(self, kind: str):
+        """``(model, indexed text, hit columns, joins, {filter: clause builder})`` of one kind."""
+        if kind == "document":
+            body = DbDocument.title.op("||")(literal_column("' '")).op("||")(DbDocument.content)
+            columns = [
+                DbDocument.id.label("id"), DbDocument.id.label("document_id"), DbDocument.title.label("document_title"),
+            ]
+            filters = {"document_id": lambda v: DbDocument.id == v}
+            return DbDocument, body, columns, [], filters
+        if kind == "comment":
+            columns = [
+                DbComment.id.label("id"), DbComment.document_id.label("document_id"),
+                DbDocument.title.label("document_title"), DbComment.review_id.label("review_id"),
+                DbComment.persona_id.label("persona_id"), DbComment.persona_name.label("persona_name"),
+                DbComment.start_line.label("start_line"), DbComment.end_line.label("end_line"),
+            ]
+            filters = {
+                "document_id": lambda v: DbComment.document_id == v,
+                "persona": lambda v: DbComment.persona_id == v,
+            }
+            return DbComment, DbComment.content, columns, [(DbDocument, DbDocument.id == DbComment.document_id)], filters
+        columns = [
+            DbMetaComment.id.label("id"), DbReview.document_id.label("document_id"),
+            DbDocument.title.label("document_title"), DbMetaComment.review_id.label("review_id"),
+            DbMetaComment.category.label("category"), DbMetaComment.priority.label("priority"),
+            DbMetaComment.start_line.label("start_line"), DbMetaComment.end_line.label("end_line"),
+        ]
+        filters = {
+            "document_id": lambda v: DbMetaComment.review_id.in_(select(DbReview.id).where(DbReview.document_id == v)),
+            "persona": lambda v: cast(DbMetaComment.sources, JSONB).contains([{"persona_id": v}]),
+            "category": lambda v: DbMetaComment.category == v,
+            "priority": lambda v: DbMetaComment.priority == v,
+        }
+        joins = [(DbReview, DbReview.id == DbMetaComment.review_id), (DbDocument, DbDocument.id == DbReview.document_id)]
+        return DbMetaComment, DbMetaComment.content, columns, joins, filters
+
+    def statement(self, kind: str, terms, filters: dict, limit: int, candidates: int):
+        model, body, columns, joins, clauses = self._kind(kind)
+        query = func.to_tsquery(self.LANGUAGE, self.tsquery_expression(terms))
+        vector = func.to_tsvector(self.LANGUAGE, body)
+        newest = (
+            select(model.id.label("rid"), func.ts_rank_cd(vector, query).label("score"))
+            .where(vector.op("@@")(query), *(clauses[name](value) for name, value in filters.items()))
+            .order_by(model.created_at.desc(), model.id.desc())
+            .limit(candidates)
+            .subquery()
+        )
+        top = select(newest).order_by(newest.c.score.desc()).limit(limit).subquery()
+        snippet_source = DbDocument.content if model is DbDocument else body
+        stmt = select(
+            *columns,
+            func.ts_headline(self.LANGUAGE, snippet_source, query, self.HEADLINE_OPTIONS).label("snippet"),
+            top.c.score.label("score"),
+        ).join_from(top, model, model.id == top.c.rid)
+        for target, on in joins:
+            stmt = stmt.outerjoin(target, on)
+        return stmt.order_by(top.c.score.desc())
+
+    async def search(self, db: AsyncSession, kind: str, terms, filters: dict, limit: int, candidates: int) -> list[dict]:
+        rows = await db.execute(self.statement(kind, terms, filters, limit, candidates))
+        return [_hit(kind, dict(row._mapping)) for row in rows]
+
+    async def rebuild(self, db: AsyncSession):
+        pass  # expression indexes follow their tables
+
+    async def repair(self, db: AsyncSession) -> list[str]:
+        return []
+
+
+class SearchIndex:
+    def __init__(self):
+        self.settings = get_settings()
+        self.backends = {"sqlite": Fts5Backend(), "postgresql": TsvectorBackend()}
+
+    def backend(self, db: AsyncSession):
+        dialect = db.get_bind().dialect.name
+        if dialect not in self.backends:
+            raise NotImplementedError(f"Full-text search is not available on {dialect}")
+        return self.backends[dialect]
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        kinds: Iterable[str] | None = None,
+        limit: int = 20,
+        **filters: str | None,
+    ) -> list[dict]:
+        """The best ``limit`` hits for ``query`` across ``kinds`` (all by default), best first.
+
+        Filters (``document_id``, ``persona``, ``category``, ``priority``) that
+        are None are ignored; kinds that can't satisfy the rest are skipped.
+        """
+        terms = parse_query(query)
+        filters = {name: value for name, value in filters.items() if value is not None}
+        backend = self.backend(db)
+        started = time.perf_counter()
+        hits = []
+        for kind in kinds or KINDS:
+            if set(filters) <= KIND_FILTERS[kind]:
+                hits += await backend.search(db, kind, terms, filters, limit, self.settings.search_candidate_limit)
+        hits.sort(key=lambda h: h["score"], reverse=True)
+        metrics.record_search(time.perf_counter() - started)
+        return hits[:limit]
+
+    async def rebuild(self):
+        """Re-index every searchable row."""
+        await db_writer.write(lambda db: self.backend(db).rebuild(db))
+        logger.info("Search index rebuilt")
+
+    async def repair(self) -> list[str]:
+        """Re-index the tables whose index drifted from them (run at startup); returns those tables."""
+        stale = await db_writer.write(lambda db: self.backend(db).repair(db))
+        if stale:
+            logger.warning("Search index out of sync with %s; rebuilt", ", ".join(stale))
+        return stale
+
+
+search_index = SearchIndex()
@@ -1,29 +1,36 @@
 import pytest
-from sqlalchemy import create_engine
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from httpx import AsyncClient, ASGITransport
+from sqlalchemy.pool import NullPool
 
-from database import Base, get_db
+from core.config import get_settings
+from database import Base, apply_sqlite_profile, async_url, get_db
 from main import app
+from services.db_writer import db_writer
 
 # Use in-memory SQLite for tests
 TEST_DATABASE_URL = "sqlite:///./test_vos.db"
 
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = apply_sqlite_profile(create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False}))
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The app's async sessions on the same file; no pool, since every test runs its own event loop
+async_engine = apply_sqlite_profile(create_async_engine(async_url(TEST_DATABASE_URL), poolclass=NullPool))
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @pytest.fixture(autouse=True)
-def setup_db():
+def setup_db(monkeypatch):
     """Create all tables before each test, drop after."""
+    # The whole suite shares one client IP; keep the per-minute limiter out of the way
+    monkeypatch.setattr(get_settings(), "rate_limit_enabled", False)
+    monkeypatch.setattr(db_writer, "session_factory", TestingAsyncSessionLocal)
     Base.metadata.create_all(bind=engine)
     app.dependency_overrides[get_db] = override_get_db
     yield
@@ -41,6 +48,20 @@ def db():
         session.close()
 
 
+@pytest.fixture
+def statements():
+    """Every query the app sends through its async engine, as ``(sql, parameters)``."""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and not statement.lstrip().upper().startswith(("INSERT", "PRAGMA", "BEGIN", "COMMIT")):
+            recorded.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
 @pytest.fixture
 async def client():
     """Async HTTP test client for FastAPI."""
@@ -52,8 +73,8 @@ async def client():
 @pytest.fixture
 def seed_personas(db):
     """Seed default personas into the test database."""
-    from services.review_service import PERSONAS
     from database import DbPersona
+    from services.review_service import PERSONAS
 
     for p in PERSONAS:
         existing = db.query(DbPersona).filter(DbPersona.id == p.id).first()
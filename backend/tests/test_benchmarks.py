@@ -0,0 +1,81 @@
+"""Smoke tests for the benchmark suite (tiny configurations only)."""
+import pytest
+
+from benchmarks import (
+    event_loop_lag,
+    meta_attribution,
+    search_latency,
+    sqlite_concurrency,
+)
+from benchmarks.review_throughput import compare, make_document, run_benchmark
+
+
+@pytest.mark.asyncio
+async def test_review_throughput_smoke():
+    report = await run_benchmark(sizes=[5], persona_counts=[2], clients=2, ttft_ms=0, tokens_per_second=0)
+    [scenario] = report["scenarios"]
+    assert scenario["completed"] == 2
+    assert scenario["errors"] == 0
+    assert scenario["events"] > 0
+    for metric in ("time_to_first_event_ms", "time_to_first_comment_ms", "total_ms", "db_persist_ms"):
+        assert scenario[metric]["p50"] is not None
+    assert scenario["time_to_first_event_ms"]["p50"] <= scenario["total_ms"]["p50"]
+
+
+def test_compare_flags_p95_regressions():
+    def report(total_p95):
+        return {"scenarios": [{
+            "paragraphs": 10, "personas": 3, "clients": 8,
+            "total_ms": {"p95": total_p95}, "time_to_first_comment_ms": {"p95": 100.0},
+        }]}
+
+    assert compare(report(1000.0), report(1100.0), threshold=0.2) == []
+    assert len(compare(report(1000.0), report(1300.0), threshold=0.2)) == 1
+
+
+def test_documents_differ_per_client():
+    assert make_document(20, 0) != make_document(20, 1)
+    assert make_document(20, 0).count("\n\n") >= 20
+
+
+def test_meta_attribution_smoke():
+    report = meta_attribution.run_benchmark([300], findings=10, repeat=1)
+    [scenario] = report["scenarios"]
+    assert scenario["matches_reference"]
+    assert scenario["avg_sources_index"] <= scenario["avg_sources_linear"]
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_smoke():
+    report = await event_loop_lag.run_benchmark(
+        readers=2, reviews=1, personas=1, duration=0.3, documents=3, reviews_per_doc=1,
+        comments_per_review=3, ttft_ms=0, tokens_per_second=0, modes=("async",),
+    )
+    [scenario] = report["scenarios"]
+    assert scenario["reads"] > 0
+    assert scenario["probes"] > 0
+    assert scenario["reviews_completed"] == 1
+    assert scenario["lag_ms"]["p50"] is not None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_concurrency_smoke():
+    report = await sqlite_concurrency.run_benchmark(
+        readers=2, writers=2, duration=0.3, documents=3, reviews_per_doc=1, comments_per_review=3,
+    )
+    baseline, tuned = report["scenarios"]
+    assert baseline["journal_mode"] == "delete"
+    assert tuned["journal_mode"] == "wal"
+    assert tuned["writes_per_sec"] > 0 and tuned["reads_per_sec"] > 0
+    assert tuned["read_lock_errors"] == tuned["write_lock_errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_search_latency_smoke():
+    report = await search_latency.run_benchmark(comments=300, documents=5, reviews_per_doc=1, meta_every=5, repeat=2)
+    capped, exact = report["scenarios"]
+    for name, query in capped["queries"].items():
+        assert query["ms"]["p50"] is not None
+        # Fewer matches than candidates: capping changes nothing
+        assert query["hits"] == exact["queries"][name]["hits"]
+    assert capped["queries"]["common_word"]["comment_matches"] > capped["queries"]["rare_word"]["comment_matches"]
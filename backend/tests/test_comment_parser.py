@@ -0,0 +1,143 @@
+"""Tests for incremental comment parsing and streaming comment emission."""
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from core.observability import metrics
+from services.comment_parser import StreamingCommentParser, StreamingJsonArrayParser
+from services.llm_client import llm_pool
+from services.review_service import ReviewService
+
+RESPONSE = (
+    "Here are my thoughts.\n\n"
+    "[PARAGRAPH 0] The title is vague.\n\n"
+    "[PARAGRAPH 1] Define the acronym\nbefore using it.\n\n"
+    "[PARAGRAPH12]Out of range.\n\n"
+    "[PARAGRAPH 2] Add a conclusion."
+)
+
+
+def _one_shot(text):
+    pattern = r'\[PARAGRAPH\s*(\d+)\]\s*(.+?)(?=\[PARAGRAPH|\Z)'
+    return [(int(n), body.strip()) for n, body in re.findall(pattern, text, re.DOTALL)]
+
+
+class TestStreamingCommentParser:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+    def test_matches_one_shot_regex(self, chunk_size):
+        parser = StreamingCommentParser()
+        blocks = []
+        for i in range(0, len(RESPONSE), chunk_size):
+            blocks.extend(parser.feed(RESPONSE[i:i + chunk_size]))
+        blocks.extend(parser.close())
+        assert blocks == _one_shot(RESPONSE)
+
+    def test_block_completes_when_next_marker_arrives(self):
+        parser = StreamingCommentParser()
+        assert parser.feed("[PARAGRAPH 0] First comment. [PARA") == []
+        assert parser.feed("GRAPH 1] Second") == [(0, "First comment.")]
+        assert parser.close() == [(1, "Second")]
+
+    def test_no_markers(self):
+        parser = StreamingCommentParser()
+        assert parser.feed("nothing useful here") == []
+        assert parser.close() == []
+
+
+META_RESPONSE = (
+    'Here is the checklist:\n```json\n'
+    '[{"content": "Quote the \\"}]\\" token", "line_ranges": [[1, 2], [5, 6]]},\n'
+    ' {not json},\n'
+    ' {"content": "Add data.", "contributing_personas": ["A", "B"]}]\n```'
+)
+
+
+class TestStreamingJsonArrayParser:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+    def test_chunking_does_not_change_result(self, chunk_size):
+        parser = StreamingJsonArrayParser()
+        items = []
+        for i in range(0, len(META_RESPONSE), chunk_size):
+            items.extend(parser.feed(META_RESPONSE[i:i + chunk_size]))
+        assert items == [
+            {"content": 'Quote the "}]" token', "line_ranges": [[1, 2], [5, 6]]},
+            {"content": "Add data.", "contributing_personas": ["A", "B"]},
+        ]
+
+    def test_object_emitted_when_it_closes(self):
+        parser = StreamingJsonArrayParser()
+        assert parser.feed('[{"content": "a", "line_ranges": [[1, 2]]') == []
+        assert parser.feed('}, {"content": ') == [{"content": "a", "line_ranges": [[1, 2]]}]
+        assert parser.feed('"b"}] trailing {"content": "c"}') == [{"content": "b"}]
+
+    def test_no_array(self):
+        assert StreamingJsonArrayParser().feed("I could not produce findings.") == []
+
+
+class _FakeStream:
+    def __init__(self, chunks, release):
+        self._chunks = chunks
+        self._release = release
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get_final_message(self):
+        usage = SimpleNamespace(
+            input_tokens=10, output_tokens=5, cache_read_input_tokens=None, cache_creation_input_tokens=None,
+        )
+        return SimpleNamespace(usage=usage)
+
+    @property
+    def text_stream(self):
+        async def gen():
+            for i, chunk in enumerate(self._chunks):
+                if i == len(self._chunks) - 1:
+                    await self._release.wait()
+                yield chunk
+        return gen()
+
+
+@pytest.mark.asyncio
+async def test_comments_stream_before_persona_finishes(monkeypatch):
+    release = asyncio.Event()
+    chunks = ["[PARAGRAPH 0] First.", " [PARAGRAPH 1] Second.", " [PARAGRAPH 1] Third."]
+
+    class FakeClient:
+        def __init__(self):
+            self.messages = self
+
+        def stream(self, **kwargs):
+            return _FakeStream(chunks, release)
+
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": FakeClient())
+    service = ReviewService()
+    persona = service.list_personas()[0]
+    samples_before = len(metrics._time_to_first_comment)
+
+    gen = service.review_document(
+        document_id="d1", content="Para one.\n\nPara two.", version_hash="HEAD",
+        persona_ids=[persona.id], model="m", use_cache=False,
+    )
+    seen = []
+    async for event in gen:
+        seen.append(event)
+        if event["type"] == "comment":
+            break
+    # First comment arrived while the LLM stream was still blocked
+    assert not release.is_set()
+    assert seen[-1]["comment"]["content"] == "First."
+
+    release.set()
+    rest = [e async for e in gen]
+    contents = [e["comment"]["content"] for e in rest if e["type"] == "comment"]
+    assert contents == ["Second.", "Third."]
+    assert rest[-2]["status"] == "completed"
+    assert rest[-1]["type"] == "done"
+    assert rest[-1]["total_comments"] == 3
+    assert len(metrics._time_to_first_comment) == samples_before + 1
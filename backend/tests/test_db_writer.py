@@ -0,0 +1,94 @@
+"""Tests for the SQLite connection profile and the single database writer."""
+import asyncio
+
+from sqlalchemy import select, text
+
+from core.observability import metrics
+from database import DbDocument
+from services.db_writer import DbWriter, db_writer
+from tests.conftest import TestingAsyncSessionLocal, async_engine, engine
+
+
+def _add(doc_id: str):
+    async def write(db):
+        db.add(DbDocument(id=doc_id, title=doc_id, content="Text."))
+        return doc_id
+    return write
+
+
+def test_sqlite_profile_applied_to_sync_connections():
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+
+async def test_sqlite_profile_applied_to_async_connections():
+    async with async_engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 5000
+
+
+async def test_concurrent_writes_are_group_committed(db):
+    before = metrics.snapshot()["db_writer"]
+
+    results = await asyncio.gather(*(db_writer.write(_add(f"doc{i}")) for i in range(20)))
+
+    assert results == [f"doc{i}" for i in range(20)]
+    assert db.query(DbDocument).count() == 20
+    after = metrics.snapshot()["db_writer"]
+    assert after["writes"] - before["writes"] == 20
+    # Queued behind the first commit, the rest share a transaction or two
+    assert after["transactions"] - before["transactions"] < 20
+
+
+async def test_failing_write_only_fails_its_caller(db):
+    async def broken(session):
+        raise ValueError("bad write")
+
+    results = await asyncio.gather(
+        db_writer.write(_add("a")), db_writer.write(broken), db_writer.write(_add("b")),
+        return_exceptions=True,
+    )
+
+    assert results[0] == "a" and results[2] == "b"
+    assert isinstance(results[1], ValueError)
+    assert sorted(d.id for d in db.query(DbDocument)) == ["a", "b"]
+
+
+async def test_writes_run_in_arrival_order(db):
+    order = []
+
+    def step(n):
+        async def write(session):
+            order.append(n)
+        return write
+
+    await asyncio.gather(*(db_writer.write(step(n)) for n in range(10)))
+    assert order == list(range(10))
+
+
+async def test_unserialized_writer_commits_directly(db):
+    writer = DbWriter(TestingAsyncSessionLocal, serialize=False)
+    assert await writer.write(_add("direct")) == "direct"
+    assert writer.stats() == {"serialized": False, "queued": 0}
+    async with TestingAsyncSessionLocal() as session:
+        assert await session.scalar(select(DbDocument.id)) == "direct"
+
+
+async def test_shutdown_finishes_queued_writes(db):
+    writer = DbWriter(TestingAsyncSessionLocal, serialize=True)
+    pending = [asyncio.ensure_future(writer.write(_add(f"q{i}"))) for i in range(5)]
+    await asyncio.sleep(0)
+    await writer.shutdown()
+    assert all(p.done() for p in pending)
+    assert db.query(DbDocument).count() == 5
+
+
+async def test_api_writes_go_through_the_writer(client):
+    before = metrics.snapshot()["db_writer"]["writes"]
+    resp = await client.post("/api/v1/documents/", json={"title": "Doc", "content": "Body."})
+    doc_id = resp.json()["id"]
+    await client.post(f"/api/v1/documents/{doc_id}/archive", headers={"X-CSRF-Token": "test"})
+    await client.delete(f"/api/v1/documents/{doc_id}", headers={"X-CSRF-Token": "test"})
+    assert metrics.snapshot()["db_writer"]["writes"] - before == 3
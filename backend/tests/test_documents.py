@@ -1,3 +1,5 @@
+import hashlib
+
 import pytest
 
 
@@ -10,7 +12,10 @@ async def test_create_document(client):
     assert resp.status_code == 200
     data = resp.json()
     assert data["title"] == "Test Doc"
-    assert data["content"] == "# Hello\n\nThis is a test document."
+    assert "content" not in data
+    assert data["content_length"] == len("# Hello\n\nThis is a test document.")
+    assert data["line_count"] == 3
+    assert data["content_hash"] == hashlib.sha256(b"# Hello\n\nThis is a test document.").hexdigest()
     assert data["is_archived"] is False
     assert "id" in data
     assert "created_at" in data
@@ -20,7 +25,7 @@ async def test_create_document(client):
 async def test_list_documents_empty(client):
     resp = await client.get("/api/v1/documents/")
     assert resp.status_code == 200
-    assert resp.json() == []
+    assert resp.json() == {"items": [], "next_cursor": None}
 
 
 @pytest.mark.asyncio
@@ -33,7 +38,7 @@ async def test_list_documents(client):
     })
     resp = await client.get("/api/v1/documents/")
     assert resp.status_code == 200
-    docs = resp.json()
+    docs = resp.json()["items"]
     assert len(docs) == 2
 
 
@@ -83,11 +88,11 @@ async def test_archive_and_restore(client):
 
     # Should not appear in default list
     list_resp = await client.get("/api/v1/documents/")
-    assert all(d["id"] != doc_id for d in list_resp.json())
+    assert all(d["id"] != doc_id for d in list_resp.json()["items"])
 
     # Should appear with include_archived
     list_resp = await client.get("/api/v1/documents/?include_archived=true")
-    assert any(d["id"] == doc_id for d in list_resp.json())
+    assert any(d["id"] == doc_id for d in list_resp.json()["items"])
 
     # Restore
     resp = await client.post(f"/api/v1/documents/{doc_id}/restore", headers=csrf)
@@ -108,3 +113,42 @@ async def test_delete_document(client):
     # Verify deleted
     resp = await client.get(f"/api/v1/documents/{doc_id}")
     assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_list_documents_never_loads_content(client, statements):
+    await client.post("/api/v1/documents/", json={"title": "Doc", "content": "line 1\nline 2"})
+    statements.clear()
+
+    resp = await client.get("/api/v1/documents/")
+    assert resp.status_code == 200
+    [doc] = resp.json()["items"]
+    assert "content" not in doc
+    assert doc["line_count"] == 2
+    assert doc["content_length"] == 13
+    assert not any("documents.content," in sql or "documents.content " in sql for sql, _ in statements)
+
+
+@pytest.mark.asyncio
+async def test_list_documents_fields(client, statements):
+    await client.post("/api/v1/documents/", json={"title": "Doc", "content": "body"})
+    statements.clear()
+
+    resp = await client.get("/api/v1/documents/?fields=title,line_count")
+    assert resp.status_code == 200
+    assert list(resp.json()["items"][0]) == ["id", "title", "line_count"]
+    # Only the requested columns are selected, and no review count subquery runs
+    [(sql, _)] = statements
+    assert "documents.description" not in sql
+    assert "reviews" not in sql
+
+    resp = await client.get("/api/v1/documents/?fields=review_count,created_at")
+    assert set(resp.json()["items"][0]) == {"id", "review_count", "created_at"}
+    assert resp.json()["items"][0]["review_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_list_documents_rejects_unknown_fields(client):
+    resp = await client.get("/api/v1/documents/?fields=title,content")
+    assert resp.status_code == 400
+    assert "/content" in resp.json()["detail"]
@@ -5,4 +5,4 @@ import pytest
 async def test_list_jobs_empty(client):
     resp = await client.get("/api/v1/jobs/")
     assert resp.status_code == 200
-    assert resp.json() == []
+    assert resp.json() == {"items": [], "next_cursor": None}
@@ -0,0 +1,24 @@
+"""Tests for the shared LLM client pool."""
+import pytest
+
+from services.llm_client import LLMClientPool
+
+
+@pytest.fixture
+def pool():
+    return LLMClientPool()
+
+
+def test_client_is_shared(pool):
+    assert pool.get_client() is pool.get_client("anthropic")
+
+
+def test_unknown_provider(pool):
+    with pytest.raises(ValueError):
+        pool.get_client("nope")
+
+
+@pytest.mark.asyncio
+async def test_metrics_include_llm_pool(client):
+    resp = await client.get("/api/v1/metrics")
+    assert "providers" in resp.json()["llm_pool"]
@@ -0,0 +1,192 @@
+"""Tests for the global LLM scheduler: budgets, priorities, per-model limits and 429 backoff."""
+import asyncio
+
+import pytest
+
+from services.llm_client import llm_pool
+from services.llm_scheduler import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    LLMScheduler,
+    TokenBucket,
+    priority_for_trigger,
+)
+from services.review_service import ReviewService
+
+RateLimitError = type("RateLimitError", (Exception,), {})
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    sched = LLMScheduler()
+    monkeypatch.setattr(sched.settings, "llm_backoff_base_seconds", 0.001)
+    monkeypatch.setattr(sched.settings, "llm_backoff_max_seconds", 0.01)
+    return sched
+
+
+class TestTokenBucket:
+    def test_take_and_wait(self):
+        bucket = TokenBucket(60)  # 1 token/second
+        assert bucket.wait_time(60) == 0
+        bucket.take(60)
+        assert bucket.wait_time(1) == pytest.approx(1.0, abs=0.05)
+
+    def test_unlimited(self):
+        bucket = TokenBucket(0)
+        bucket.take(10**9)
+        assert bucket.wait_time(10**9) == 0
+
+    def test_oversized_request_waits_for_full_bucket_only(self):
+        bucket = TokenBucket(60)
+        assert bucket.wait_time(1000) == 0
+
+
+def test_priority_for_trigger():
+    assert priority_for_trigger("manual") == PRIORITY_INTERACTIVE
+    assert priority_for_trigger("ci") == PRIORITY_BATCH
+    assert priority_for_trigger("webhook") == PRIORITY_BATCH
+
+
+@pytest.mark.asyncio
+async def test_admit_caps_in_flight_per_model(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler.settings, "llm_max_in_flight_per_model", 2)
+    active = 0
+    peak = 0
+    gate = asyncio.Event()
+
+    async def call():
+        nonlocal active, peak
+        async with scheduler.admit("m", 10):
+            active += 1
+            peak = max(peak, active)
+            await gate.wait()
+            active -= 1
+
+    tasks = [asyncio.create_task(call()) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    stats = scheduler.stats()
+    assert stats["models"]["m"]["in_flight"] == 2
+    assert stats["queue_depth"] == 3
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert peak == 2
+    assert scheduler.stats()["models"]["m"]["admitted"] == 5
+
+
+@pytest.mark.asyncio
+async def test_interactive_admitted_before_batch(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler.settings, "llm_max_in_flight_per_model", 1)
+    order = []
+    hold = asyncio.Event()
+
+    async def holder():
+        async with scheduler.admit("m", 10):
+            await hold.wait()
+
+    async def call(name, priority):
+        async with scheduler.admit("m", 10, priority):
+            order.append(name)
+
+    first = asyncio.create_task(holder())
+    await asyncio.sleep(0.01)
+    batch = asyncio.create_task(call("ci", PRIORITY_BATCH))
+    await asyncio.sleep(0.01)
+    interactive = asyncio.create_task(call("manual", PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0.01)
+    hold.set()
+    await asyncio.gather(first, batch, interactive)
+    assert order == ["manual", "ci"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue(scheduler, monkeypatch):
+    monkeypatch.setattr(scheduler.settings, "llm_max_in_flight_per_model", 1)
+    hold = asyncio.Event()
+
+    async def holder():
+        async with scheduler.admit("m", 10):
+            await hold.wait()
+
+    first = asyncio.create_task(holder())
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(scheduler.admit("m", 10).__aenter__())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.stats()["queue_depth"] == 0
+    hold.set()
+    await first
+
+
+def test_retry_delay_only_for_rate_limits(scheduler):
+    assert scheduler.retry_delay(ValueError("boom"), 1) is None
+    delay = scheduler.retry_delay(RateLimitError("429"), 1)
+    assert delay is not None and delay > 0
+    assert scheduler.retry_delay(RateLimitError("429"), scheduler.settings.llm_max_retries + 1) is None
+    assert scheduler.rate_limited == 2
+
+
+@pytest.mark.asyncio
+async def test_run_retries_rate_limited_calls(scheduler):
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise RateLimitError("rate_limit exceeded")
+        return "ok"
+
+    assert await scheduler.run("m", 10, flaky) == "ok"
+    assert attempts == 3
+    assert scheduler.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_review_reports_queued_then_running(monkeypatch):
+    class _Stream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        @property
+        def text_stream(self):
+            async def gen():
+                yield "[PARAGRAPH 0] Fine."
+            return gen()
+
+        async def get_final_message(self):
+            return None
+
+    class FakeClient:
+        def __init__(self):
+            self.messages = self
+            self.calls = 0
+
+        def stream(self, **kwargs):
+            self.calls += 1
+            if self.calls == 1:
+                raise RateLimitError("429 rate_limit")
+            return _Stream()
+
+    fake = FakeClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+    from services.llm_scheduler import llm_scheduler
+    monkeypatch.setattr(llm_scheduler.settings, "llm_backoff_base_seconds", 0.001)
+    monkeypatch.setattr(llm_scheduler.settings, "llm_backoff_max_seconds", 0.01)
+
+    service = ReviewService()
+    persona = service.list_personas()[0]
+    events = [e async for e in service.review_document(
+        document_id="d1", content="Only paragraph.", version_hash="HEAD",
+        persona_ids=[persona.id], model="m", use_cache=False,
+    )]
+    statuses = [e for e in events if e["type"] == "persona_status"]
+    assert [e["status"] for e in statuses] == ["queued", "running", "queued", "running", "completed"]
+    assert statuses[1]["queue_wait_ms"] >= 0
+    assert statuses[2]["reason"] == "rate_limited"
+    comments = [e["comment"]["content"] for e in events if e["type"] == "comment"]
+    assert comments == ["Fine."]
@@ -0,0 +1,95 @@
+"""Tests for the local (non-LLM) meta synthesizer."""
+import time
+
+import pytest
+
+from services import local_synthesis
+from services.llm_client import llm_pool
+from services.meta_service import MetaService
+
+
+def _comment(i, persona, content, line, name=None):
+    return {"id": f"c{i}", "persona_id": persona, "persona_name": name or persona.title(),
+            "persona_color": "#000", "content": content, "start_line": line, "end_line": line}
+
+
+@pytest.fixture
+def no_llm(monkeypatch):
+    def fail(provider="anthropic"):
+        raise AssertionError("the local synthesizer must not call the LLM")
+
+    monkeypatch.setattr(llm_pool, "get_client", fail)
+
+
+def test_near_duplicates_merge_across_the_document():
+    comments = [
+        _comment(0, "a", "Define the acronym SLA before using it.", 2),
+        _comment(1, "b", "The acronym SLA is used before it is defined.", 80),
+        _comment(2, "c", "Add a diagram of the deployment topology.", 40),
+    ]
+    matrix = local_synthesis.tfidf_matrix([c["content"] for c in comments])
+    assert local_synthesis.cluster(matrix, [0, 1, 2]) == [[0, 1], [2]]
+
+
+def test_same_location_merges_on_looser_similarity():
+    texts = ["The retry logic ignores timeouts.", "Timeouts should be retried with backoff."]
+    matrix = local_synthesis.tfidf_matrix(texts)
+    similarity = float(matrix[0] @ matrix[1])
+    assert local_synthesis.GROUP_SIMILARITY <= similarity < local_synthesis.DUPLICATE_SIMILARITY
+    assert local_synthesis.cluster(matrix, [0, 0]) == [[0, 1]]
+    assert local_synthesis.cluster(matrix, [0, 1]) == [[0], [1]]
+
+
+def test_category_and_priority_inference():
+    assert local_synthesis.infer_category(["Passwords are logged in plain text."], [[]]) == "security"
+    # No keywords: the persona's focus areas decide
+    assert local_synthesis.infer_category(["Rethink this."], [["accessibility", "WCAG"]]) == "accessibility"
+    assert local_synthesis.infer_category(["Hmm."], [[]]) == "clarity"
+
+    assert local_synthesis.infer_priority(["This leaks the API secret."], 1) == "critical"
+    assert local_synthesis.infer_priority(["The total is wrong."], 1) == "high"
+    assert local_synthesis.infer_priority(["Typo in the heading."], 1) == "low"
+    assert local_synthesis.infer_priority(["Shorten this paragraph."], 1) == "medium"
+    # Three reviewers agreeing raise the priority one level
+    assert local_synthesis.infer_priority(["Shorten this paragraph."], 3) == "high"
+
+
+def test_summarize_keeps_first_sentence():
+    assert local_synthesis.summarize("First point.  Second point.") == "First point."
+    assert len(local_synthesis.summarize("word " * 100, limit=50)) <= 50
+
+
+@pytest.mark.asyncio
+async def test_small_review_is_synthesized_locally(no_llm):
+    comments = [
+        _comment(0, "security-reviewer", "The API key is committed in the example config.", 3),
+        _comment(1, "devils-advocate", "An API key appears in the example config; remove it.", 3),
+        _comment(2, "casual-reader", "What does SLA mean here?", 20),
+    ]
+    started = time.perf_counter()
+    result = await MetaService().synthesize(comments)
+    assert time.perf_counter() - started < 0.5
+
+    first, second = result.comments
+    assert first.priority == "critical" and first.category == "security"
+    assert {s.persona_name for s in first.sources} == {"Security-Reviewer", "Devils-Advocate"}
+    assert " | " not in first.content
+    assert (second.start_line, second.end_line) == (20, 20)
+    assert result.verdict == "major_rework"
+    assert result.confidence == round((2 / 3 + 1 / 3) / 2, 2)
+
+
+@pytest.mark.asyncio
+async def test_local_flag_overrides_threshold(no_llm):
+    comments = [_comment(i, f"p{i % 3}", f"Remark number {i} about topic {i}.", i * 10) for i in range(20)]
+    result = await MetaService().synthesize(comments, local=True)
+    assert sum(len(mc.sources) for mc in result.comments) == 20
+
+    events = [e async for e in MetaService().synthesize_stream(comments, local=True)]
+    assert events[-1]["local"] is True
+
+
+def test_large_inputs_stay_bounded():
+    comments = [_comment(i, f"p{i % 7}", f"Consider rewording sentence {i % 300} for clarity.", i) for i in range(3000)]
+    result = MetaService().synthesize_local(comments)
+    assert sum(len(mc.sources) for mc in result.comments) == 3000
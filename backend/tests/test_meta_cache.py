@@ -0,0 +1,135 @@
+"""Tests for the meta synthesis cache shared across reviews."""
+import json
+
+import pytest
+
+from api import reviews as reviews_api
+from core.observability import metrics
+from database import DbComment, DbDocument, DbMetaCacheEntry, DbMetaComment, DbReview
+from services.meta_cache import meta_cache_key
+from services.review_service import REVIEW_ERROR_PREFIX
+
+CSRF = {"X-CSRF-Token": "test"}
+
+COMMENTS = [
+    {"persona_id": "a", "persona_name": "Alpha", "persona_color": "#000",
+     "content": "The SLA acronym is never defined.", "start_line": 0, "end_line": 1},
+    {"persona_id": "b", "persona_name": "Beta", "persona_color": "#fff",
+     "content": "Add numbers to back the latency claim.", "start_line": 10, "end_line": 11},
+]
+
+
+def _seed_review(db, review_id, doc_id="doc1"):
+    if not db.query(DbDocument).filter(DbDocument.id == doc_id).first():
+        db.add(DbDocument(id=doc_id, title="Doc", content="a\nb\nc"))
+    db.add(DbReview(id=review_id, document_id=doc_id, persona_ids=["a", "b"], status="completed"))
+    for i, c in enumerate(COMMENTS):
+        db.add(DbComment(id=f"{review_id}-c{i}", review_id=review_id, document_id=doc_id, **c))
+    db.commit()
+
+
+@pytest.fixture
+def synth_calls(monkeypatch):
+    """Count real syntheses (local synthesizer, so no LLM is needed)."""
+    calls = []
+    original = reviews_api.meta_service.synthesize
+
+    async def counting(comments, persona_weights=None, local=None):
+        calls.append(len(comments))
+        return await original(comments, persona_weights=persona_weights, local=True)
+
+    monkeypatch.setattr(reviews_api.meta_service, "synthesize", counting)
+    return calls
+
+
+def _key(comments, weights=None, model="m"):
+    return meta_cache_key([{"id": str(i), **c} for i, c in enumerate(comments)], weights, model)
+
+
+def test_key_ignores_order_and_ids():
+    assert _key(COMMENTS) == _key(list(reversed(COMMENTS)))
+    base = _key(COMMENTS, {"a": 1.0})
+    assert _key(COMMENTS, {"a": 2.0}) != base
+    assert _key(COMMENTS, {"a": 1.0}, model="local") != base
+    assert _key([{**COMMENTS[0], "content": "Other."}, COMMENTS[1]], {"a": 1.0}) != base
+    assert _key([{**COMMENTS[0], "end_line": 2}, COMMENTS[1]], {"a": 1.0}) != base
+
+
+@pytest.mark.asyncio
+async def test_identical_comment_sets_share_one_synthesis(client, db, synth_calls):
+    _seed_review(db, "rev1")
+    _seed_review(db, "rev2")
+    hits = metrics.meta_cache_hits
+
+    first = (await client.post("/api/v1/reviews/doc1/reviews/rev1/meta", headers=CSRF)).json()
+    second = (await client.post("/api/v1/reviews/doc1/reviews/rev2/meta", headers=CSRF)).json()
+    assert synth_calls == [2]
+    assert metrics.meta_cache_hits == hits + 1
+    assert [c["content"] for c in second["comments"]] == [c["content"] for c in first["comments"]]
+    assert (second["verdict"], second["confidence"]) == (first["verdict"], first["confidence"])
+
+    # Each review owns its copy of the findings
+    ids = {r: {m.id for m in db.query(DbMetaComment).filter(DbMetaComment.review_id == r)} for r in ("rev1", "rev2")}
+    assert len(ids["rev2"]) == len(first["comments"])
+    assert not ids["rev1"] & ids["rev2"]
+
+
+@pytest.mark.asyncio
+async def test_failed_persona_placeholders_are_left_out(client, db, synth_calls):
+    _seed_review(db, "rev1")
+    db.add(DbComment(id="rev1-err", review_id="rev1", document_id="doc1", persona_id="c", persona_name="Gamma",
+                     persona_color="#0f0", content=f"{REVIEW_ERROR_PREFIX}overloaded", start_line=0, end_line=0))
+    db.commit()
+    _seed_review(db, "rev2")
+
+    await client.post("/api/v1/reviews/doc1/reviews/rev1/meta", headers=CSRF)
+    # Same key as the review without the failed persona (and as an auto-meta run of it)
+    await client.post("/api/v1/reviews/doc1/reviews/rev2/meta", headers=CSRF)
+    assert synth_calls == [2]
+
+
+@pytest.mark.asyncio
+async def test_force_recomputes_and_replaces(client, db, synth_calls):
+    _seed_review(db, "rev1")
+    first = (await client.post("/api/v1/reviews/doc1/reviews/rev1/meta", headers=CSRF)).json()
+    await client.post("/api/v1/reviews/doc1/reviews/rev1/meta", headers=CSRF)
+    assert synth_calls == [2]
+
+    forced = (await client.post("/api/v1/reviews/doc1/reviews/rev1/meta?force=true", headers=CSRF)).json()
+    assert synth_calls == [2, 2]
+    db.expire_all()
+    stored = {m.id for m in db.query(DbMetaComment).filter(DbMetaComment.review_id == "rev1")}
+    assert stored == {c["id"] for c in forced["comments"]}
+    assert not stored & {c["id"] for c in first["comments"]}
+    assert db.query(DbMetaCacheEntry).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_results_are_not_cached(client, db, monkeypatch):
+    _seed_review(db, "rev1")
+    original = reviews_api.meta_service.synthesize
+
+    async def failing(comments, persona_weights=None, local=None):
+        result = await original(comments, persona_weights=persona_weights, local=True)
+        result.fallback = True
+        return result
+
+    monkeypatch.setattr(reviews_api.meta_service, "synthesize", failing)
+    resp = await client.post("/api/v1/reviews/doc1/reviews/rev1/meta", headers=CSRF)
+    assert resp.status_code == 200
+    assert db.query(DbMetaCacheEntry).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_replays_shared_result(client, db, synth_calls):
+    _seed_review(db, "rev1")
+    _seed_review(db, "rev2")
+    first = (await client.post("/api/v1/reviews/doc1/reviews/rev1/meta", headers=CSRF)).json()
+
+    resp = await client.post("/api/v1/reviews/doc1/reviews/rev2/meta/stream", headers=CSRF)
+    events = [json.loads(line[len("data: "):]) for line in resp.text.splitlines() if line.startswith("data: ")]
+    assert synth_calls == [2]
+    assert events[-1]["cached"] is True
+    assert [e["comment"]["content"] for e in events[:-1]] == [c["content"] for c in first["comments"]]
+    db.expire_all()
+    assert db.query(DbReview).filter(DbReview.id == "rev2").first().meta_verdict == first["verdict"]
@@ -0,0 +1,196 @@
+"""Tests for hierarchical (map-reduce) meta synthesis."""
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from core.config import get_settings
+from services.comment_index import CommentIndex
+from services.llm_client import llm_pool
+from services.llm_scheduler import TokenBucket, llm_scheduler
+from services.meta_service import MetaService
+
+
+def _comments(n, personas=("Alpha", "Beta")):
+    """One comment per location, spaced so every comment forms its own group."""
+    return [
+        {"id": f"c{i}", "persona_id": personas[i % len(personas)].lower(),
+         "persona_name": personas[i % len(personas)], "persona_color": "#000",
+         "content": f"Remark {i}.", "start_line": i * 10, "end_line": i * 10 + 1}
+        for i in range(n)
+    ]
+
+
+class FakeClient:
+    """Map prompts get one finding per batch; the reduce prompt merges everything."""
+
+    def __init__(self, fail_reduce=False, reduce_extra=None):
+        self.messages = self
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_reduce = fail_reduce
+        self.reduce_extra = reduce_extra or {}  # merged into the reduce finding
+
+    async def create(self, **kwargs):
+        prompt = kwargs["messages"][0]["content"]
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if "--- FINDING " in prompt:
+            if self.fail_reduce:
+                raise RuntimeError("reduce failed")
+            indices = [int(i) for i in re.findall(r"--- FINDING (\d+)", prompt)]
+            text = json.dumps([{"content": "Fix everything.", "priority": "high", "merged_from": indices,
+                                **self.reduce_extra}])
+        else:
+            names = sorted(set(re.findall(r"^\[(\w+)\]:", prompt, re.MULTILINE)))
+            ranges = [[int(a), int(b)] for a, b in re.findall(r"--- GROUP \d+ \(lines (\d+)-(\d+)\)", prompt)]
+            text = json.dumps([{"content": "Fix this part.", "contributing_personas": names, "line_ranges": ranges}])
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+@pytest.fixture
+def batching(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "meta_batch_comments", 4)
+    monkeypatch.setattr(settings, "meta_batch_parallelism", 2)
+    # Map batches multiply LLM calls; keep them out of the shared scheduler's RPM budget
+    monkeypatch.setattr(llm_scheduler, "_requests", TokenBucket(0))
+    return settings
+
+
+def test_batches_respect_limit_without_splitting_groups(batching):
+    service = MetaService()
+    comments = _comments(9)
+    # Three comments on the same lines form one group
+    comments += [dict(c, id=f"d{k}", start_line=0, end_line=1) for k, c in enumerate(comments[:2])]
+    batches = service._batches(service._group_comments_by_location(comments))
+    sizes = [sum(len(g["comments"]) for g in batch) for batch in batches]
+    assert sizes == [4, 4, 3]
+
+
+@pytest.mark.asyncio
+async def test_small_reviews_use_a_single_call(batching, monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+    result = await MetaService().synthesize(_comments(3), local=False)
+    assert len(fake.prompts) == 1
+    assert len(result.comments) == 1
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_keeps_source_attribution(batching, monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+    comments = _comments(10)
+
+    result = await MetaService().synthesize(comments)
+
+    # 3 map batches (4 + 4 + 2 comments), at most 2 at a time, then one reduce
+    assert len(fake.prompts) == 4
+    assert fake.max_in_flight == 2
+    assert "--- FINDING 2 " in fake.prompts[-1]
+    assert len(result.comments) == 1
+    merged = result.comments[0]
+    assert {s.original_content for s in merged.sources} == {c["content"] for c in comments}
+    assert (merged.start_line, merged.end_line) == (0, 91)
+    assert result.verdict == "fix_first"
+
+
+@pytest.mark.asyncio
+async def test_failed_reduce_returns_partial_findings(batching, monkeypatch):
+    fake = FakeClient(fail_reduce=True)
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+    result = await MetaService().synthesize(_comments(10))
+    assert [len(mc.sources) for mc in result.comments] == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_streamed_reduce_with_mock_provider(batching, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "llm_provider", "mock")
+    monkeypatch.setattr(settings, "mock_llm_ttft_ms", 0)
+    monkeypatch.setattr(settings, "mock_llm_tokens_per_second", 0)
+    monkeypatch.setattr(llm_pool, "_clients", {})
+    comments = _comments(40, personas=("Alpha", "Beta", "Gamma"))
+
+    events = [e async for e in MetaService().synthesize_stream(comments)]
+    findings = [e["comment"] for e in events if e["type"] == "meta_comment"]
+    assert 0 < len(findings) <= 7
+    assert "fallback" not in events[-1]
+    attributed = {s.original_content for mc in findings for s in mc.sources}
+    assert attributed == {c["content"] for c in comments}
+
+
+@pytest.mark.asyncio
+async def test_reduce_ignores_malformed_line_ranges(batching, monkeypatch):
+    fake = FakeClient(reduce_extra={"line_ranges": [[3], "7-9", [21, 31]]})
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+    [merged] = (await MetaService().synthesize(_comments(10))).comments
+    assert (merged.start_line, merged.end_line) == (20, 30)
+
+
+@pytest.mark.asyncio
+async def test_unconvertible_reduce_output_returns_partial_findings(batching, monkeypatch):
+    fake = FakeClient(reduce_extra={"line_ranges": [["a", "b"]]})
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+    result = await MetaService().synthesize(_comments(10))
+    assert result.fallback
+    assert [len(mc.sources) for mc in result.comments] == [4, 4, 2]
+
+
+def test_attribution_respects_line_ranges(monkeypatch):
+    service = MetaService()
+    comments = _comments(6)
+    groups = service._group_comments_by_location(comments)
+    index = CommentIndex(comments)
+
+    # Alpha commented on lines 0, 20 and 40; only the first two are in range
+    item = {"content": "Fix.", "contributing_personas": ["Alpha"], "line_ranges": [[1, 2], [21, 22]]}
+    mc = service._to_meta_comment(item, groups, index)
+    assert [s.original_content for s in mc.sources] == ["Remark 0.", "Remark 2."]
+    assert (mc.start_line, mc.end_line) == (0, 21)
+
+    # Ranges that miss every comment fall back to all of the persona's comments
+    item["line_ranges"] = [[500, 501]]
+    assert len(service._to_meta_comment(item, groups, index).sources) == 3
+
+
+class TestCommentIndex:
+    def test_overlapping_matches_linear_scan(self):
+        import random
+
+        rng = random.Random(7)
+        comments = []
+        for i in range(500):
+            start = rng.randrange(0, 1000)
+            comments.append({"id": str(i), "persona_name": rng.choice("ABC"), "content": "",
+                             "start_line": start, "end_line": start + rng.randrange(0, 30)})
+        index = CommentIndex(comments)
+        for _ in range(50):
+            a = rng.randrange(0, 1000)
+            ranges = [(a, a + rng.randrange(0, 40))]
+            names = ["A", "C"]
+            expected = sorted(
+                (c for c in comments if c["persona_name"] in names
+                 and c["start_line"] <= ranges[0][1] and c["end_line"] >= ranges[0][0]),
+                key=lambda c: (c["start_line"], c["end_line"]),
+            )
+            assert [c["id"] for c in index.overlapping(names, ranges)] == [c["id"] for c in expected]
+
+    def test_groups_match_previous_grouping(self):
+        comments = [
+            {"persona_name": "A", "start_line": 0, "end_line": 1},
+            {"persona_name": "B", "start_line": 3, "end_line": 4},
+            {"persona_name": "A", "start_line": 10, "end_line": 10},
+        ]
+        groups = CommentIndex(comments).groups()
+        assert [(g["start_line"], g["end_line"], len(g["comments"])) for g in groups] == [(0, 4, 2), (10, 10, 1)]
+
+    def test_unknown_persona(self):
+        assert CommentIndex([]).attribute(["Nobody"], [(0, 10)]) == []
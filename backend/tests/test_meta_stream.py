@@ -0,0 +1,325 @@
+"""Tests for streaming meta-review synthesis."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from database import DbComment, DbDocument, DbMetaComment, DbReview
+from services.llm_client import llm_pool
+from services.meta_service import MetaService
+
+COMMENTS = [
+    {"id": "c1", "persona_id": "a", "persona_name": "Alpha", "persona_color": "#000",
+     "content": "Unclear.", "start_line": 0, "end_line": 1},
+    {"id": "c2", "persona_id": "b", "persona_name": "Beta", "persona_color": "#fff",
+     "content": "Needs data.", "start_line": 10, "end_line": 11},
+]
+
+CSRF = {"X-CSRF-Token": "test"}
+
+FINDINGS = [
+    '[{"content": "Clarify the intro.", "category": "clarity", "priority": "high", ',
+    '"contributing_personas": ["Alpha"], "line_ranges": [[1, 2]]},',
+    ' {"content": "Add data.", "category": "technical", "priority": "medium", ',
+    '"contributing_personas": ["Alpha", "Beta"], "line_ranges": [[11, 12]]}]',
+]
+
+
+@pytest.fixture(autouse=True)
+def llm_synthesis(monkeypatch):
+    """These reviews are small enough for the local synthesizer; exercise the LLM path."""
+    from core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "meta_local_max_comments", 0)
+
+
+class _FakeStream:
+    def __init__(self, chunks, release, fail=None):
+        self._chunks = chunks
+        self._release = release
+        self._fail = fail
+
+    async def __aenter__(self):
+        if self._fail:
+            raise self._fail
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get_final_message(self):
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=10, output_tokens=5))
+
+    @property
+    def text_stream(self):
+        async def gen():
+            for i, chunk in enumerate(self._chunks):
+                if i == len(self._chunks) - 1:
+                    await self._release.wait()
+                yield chunk
+        return gen()
+
+
+def _fake_client(chunks, release, fail=None):
+    client = SimpleNamespace(calls=0)
+
+    def stream(**kwargs):
+        client.calls += 1
+        return _FakeStream(chunks, release, fail)
+
+    client.messages = SimpleNamespace(stream=stream)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_findings_stream_before_synthesis_finishes(monkeypatch):
+    release = asyncio.Event()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": _fake_client(FINDINGS, release))
+
+    gen = MetaService().synthesize_stream(COMMENTS)
+    first = await gen.__anext__()
+    # The first finding arrived while the model was still writing the second
+    assert not release.is_set()
+    assert first["type"] == "meta_comment"
+    assert first["comment"].content == "Clarify the intro."
+    assert (first["comment"].start_line, first["comment"].end_line) == (0, 1)
+
+    release.set()
+    rest = [e async for e in gen]
+    assert [e["type"] for e in rest] == ["meta_comment", "meta_verdict"]
+    # Alpha is credited too, but only Beta commented on the cited lines
+    assert {s.persona_name for s in rest[0]["comment"].sources} == {"Beta"}
+    result = rest[-1]["result"]
+    assert result.verdict == "fix_first"
+    assert result.confidence == 0.5
+    assert "fallback" not in rest[-1]
+
+
+@pytest.mark.asyncio
+async def test_failure_before_output_falls_back(monkeypatch):
+    release = asyncio.Event()
+    release.set()
+    client = _fake_client(FINDINGS, release, fail=RuntimeError("boom"))
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": client)
+
+    events = [e async for e in MetaService().synthesize_stream(COMMENTS)]
+    assert [e["type"] for e in events] == ["meta_comment", "meta_comment", "meta_verdict"]
+    assert events[-1]["fallback"] is True
+    assert client.calls == 1
+
+
+def _seed_review(db):
+    db.add(DbDocument(id="doc1", title="Doc", content="a\nb\nc"))
+    db.add(DbReview(id="rev1", document_id="doc1", persona_ids=["a", "b"], status="completed"))
+    for c in COMMENTS:
+        db.add(DbComment(review_id="rev1", document_id="doc1", **c))
+    db.commit()
+
+
+def _events(text):
+    return [json.loads(line[len("data: "):]) for line in text.splitlines() if line.startswith("data: ")]
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_persists_and_replays(client, db, monkeypatch):
+    _seed_review(db)
+    release = asyncio.Event()
+    release.set()
+    fake = _fake_client(FINDINGS, release)
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+
+    resp = await client.post("/api/v1/reviews/doc1/reviews/rev1/meta/stream", headers=CSRF)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _events(resp.text)
+    assert [e["type"] for e in events] == ["meta_comment", "meta_comment", "meta_verdict"]
+    assert events[-1]["verdict"] == "fix_first"
+
+    db.expire_all()
+    assert db.query(DbMetaComment).filter(DbMetaComment.review_id == "rev1").count() == 2
+    assert db.query(DbReview).filter(DbReview.id == "rev1").first().meta_verdict == "fix_first"
+
+    # A second request replays the stored findings without calling the model
+    replay = _events((await client.post("/api/v1/reviews/doc1/reviews/rev1/meta/stream", headers=CSRF)).text)
+    assert fake.calls == 1
+    assert [e["comment"]["id"] for e in replay[:-1]] == [e["comment"]["id"] for e in events[:-1]]
+    assert replay[-1]["cached"] is True
+
+    blocking = (await client.get("/api/v1/reviews/doc1/reviews/rev1/meta")).json()
+    assert blocking["verdict"] == "fix_first"
+    assert len(blocking["comments"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_unknown_review(client):
+    resp = await client.post("/api/v1/reviews/doc1/reviews/missing/meta/stream", headers=CSRF)
+    assert resp.status_code == 404
+
+
+class _FakeMetaClient:
+    """Streams FINDINGS for the final synthesis and returns them from ``create`` for speculation."""
+
+    def __init__(self):
+        self.creates = 0
+        self.streams = 0
+        self.messages = self
+
+    async def create(self, **kwargs):
+        self.creates += 1
+        return SimpleNamespace(content=[SimpleNamespace(text="".join(FINDINGS))])
+
+    def stream(self, **kwargs):
+        self.streams += 1
+        release = asyncio.Event()
+        release.set()
+        return _FakeStream(FINDINGS, release)
+
+
+def _review_events(late_comment: bool):
+    def status(pid, s):
+        return {"type": "persona_status", "persona_id": pid, "persona_name": pid, "persona_color": "#000", "status": s}
+
+    def comment(c):
+        return {"type": "comment", "comment": {
+            "id": c["id"], "persona_id": c["persona_id"], "persona_name": c["persona_name"],
+            "persona_color": c["persona_color"], "content": c["content"],
+            "anchor": {"file_path": "", "start_line": c["start_line"], "end_line": c["end_line"]},
+        }}
+
+    async def gen():
+        yield status("a", "queued")
+        yield status("b", "queued")
+        yield comment(COMMENTS[0])
+        yield status("a", "completed")
+        for _ in range(5):
+            await asyncio.sleep(0)  # let the speculative synthesis finish
+        if late_comment:
+            yield comment(COMMENTS[1])
+        yield status("b", "completed")
+        yield {"type": "done", "total_comments": 2 if late_comment else 1}
+    return gen()
+
+
+@pytest.mark.asyncio
+async def test_auto_meta_after_review(monkeypatch):
+    fake = _FakeMetaClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+
+    events = [e async for e in MetaService().follow_review(_review_events(True), speculative_share=1.0)]
+    types = [e["type"] for e in events]
+    assert types[-4:] == ["done", "meta_comment", "meta_comment", "meta_verdict"]
+    assert events[-4]["auto_meta"] is True
+    assert events[-1]["verdict"] == "fix_first"
+    assert isinstance(events[-2]["comment"]["created_at"], str)
+    assert (fake.creates, fake.streams) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_auto_meta_uses_the_meta_cache(monkeypatch):
+    fake = _FakeMetaClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+
+    first = [e async for e in MetaService().follow_review(_review_events(True), speculative_share=1.0)]
+    second = [e async for e in MetaService().follow_review(_review_events(True), speculative_share=1.0)]
+    assert (fake.creates, fake.streams) == (0, 1)  # the second run never reached the model
+    assert second[-1]["cached"] is True and second[-1]["verdict"] == first[-1]["verdict"]
+    contents = [[e["comment"]["content"] for e in events if e["type"] == "meta_comment"] for events in (first, second)]
+    assert contents[0] == contents[1]
+
+
+@pytest.mark.asyncio
+async def test_speculative_meta_reused_when_nothing_changed(monkeypatch):
+    fake = _FakeMetaClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+
+    events = [e async for e in MetaService().follow_review(
+        _review_events(False), persona_weights={"a": 2.0, "b": 1.0}, speculative_share=0.6,
+    )]
+    types = [e["type"] for e in events]
+    # The preview arrives while persona b is still running
+    assert types.index("meta_preview") < types.index("done")
+    assert events[-1]["type"] == "meta_verdict" and events[-1]["speculative"] is True
+    assert (fake.creates, fake.streams) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_reused_speculative_fallback_is_flagged(monkeypatch):
+    fake = _FakeMetaClient()
+
+    async def create(**kwargs):
+        raise RuntimeError("overloaded")
+
+    fake.create = create
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+
+    events = [e async for e in MetaService().follow_review(
+        _review_events(False), persona_weights={"a": 2.0, "b": 1.0}, speculative_share=0.6,
+    )]
+    assert events[-1]["speculative"] is True and events[-1]["fallback"] is True
+
+
+@pytest.mark.asyncio
+async def test_failed_speculation_is_synthesized_again(monkeypatch):
+    fake = _FakeMetaClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+    service = MetaService()
+
+    async def synthesize(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, "synthesize", synthesize)
+    events = [e async for e in service.follow_review(
+        _review_events(False), persona_weights={"a": 2.0, "b": 1.0}, speculative_share=0.6,
+    )]
+    types = [e["type"] for e in events]
+    assert "meta_preview" not in types and "error" not in types
+    assert events[-1]["type"] == "meta_verdict" and "speculative" not in events[-1]
+    assert fake.streams == 1
+
+
+@pytest.mark.asyncio
+async def test_speculative_meta_refined_with_late_comments(monkeypatch):
+    fake = _FakeMetaClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+
+    events = [e async for e in MetaService().follow_review(
+        _review_events(True), persona_weights={"a": 1.0, "b": 1.0}, speculative_share=0.5,
+    )]
+    assert "meta_preview" in [e["type"] for e in events]
+    assert "speculative" not in events[-1]
+    assert (fake.creates, fake.streams) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_review_request_with_auto_meta(client, db, monkeypatch):
+    from core.config import get_settings
+    from services.review_jobs import review_jobs
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "llm_provider", "mock")
+    monkeypatch.setattr(settings, "mock_llm_ttft_ms", 0)
+    monkeypatch.setattr(settings, "mock_llm_tokens_per_second", 0)
+    monkeypatch.setattr(llm_pool, "_clients", {})
+    try:
+        doc = await client.post("/api/v1/documents/", json={
+            "title": "Doc", "content": "# Title\n\nFirst paragraph.\n\nSecond paragraph.",
+        })
+        doc_id = doc.json()["id"]
+        resp = await client.post(f"/api/v1/reviews/{doc_id}/review", json={
+            "persona_ids": ["devils-advocate", "casual-reader"], "bypass_cache": True, "auto_meta": True,
+        })
+        events = _events(resp.text)
+        types = [e["type"] for e in events]
+        done = events[types.index("done")]
+        assert done["auto_meta"] is True
+        assert types[-1] == "meta_verdict"
+        streamed = [e["comment"]["id"] for e in events if e["type"] == "meta_comment"]
+        assert streamed
+
+        # The meta panel reads the cached result instead of synthesizing again
+        cached = (await client.get(f"/api/v1/reviews/{doc_id}/reviews/{done['review_id']}/meta")).json()
+        assert [c["id"] for c in cached["comments"]] == streamed
+        assert cached["verdict"] == events[-1]["verdict"]
+    finally:
+        await review_jobs.shutdown()
@@ -0,0 +1,97 @@
+"""Tests for the offline mock LLM provider."""
+import re
+import time
+
+import pytest
+
+from core.config import get_settings
+from core.errors import LLMError, LLMRateLimitError, classify_anthropic_error
+from services.llm_client import LLMClientPool, llm_pool
+from services.meta_service import MetaService
+from services.mock_llm import (
+    MockAnthropicClient,
+    MockRateLimitError,
+    MockServerError,
+    respond,
+)
+from services.review_service import ReviewService
+
+
+@pytest.fixture
+def mock_settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "llm_provider", "mock")
+    monkeypatch.setattr(settings, "mock_llm_ttft_ms", 0)
+    monkeypatch.setattr(settings, "mock_llm_tokens_per_second", 0)
+    monkeypatch.setattr(llm_pool, "_clients", {})
+    return settings
+
+
+def test_pool_returns_mock_client(mock_settings):
+    pool = LLMClientPool()
+    assert isinstance(pool.get_client(), MockAnthropicClient)
+    assert pool.get_client() is pool.get_client("mock")
+
+
+def test_responses_are_deterministic_and_in_scope():
+    prompt = "Section:\n(paragraph 4)\nfoo\n\n(paragraph 5)\nbar\nThe full document has 9 paragraphs"
+    assert respond(prompt) == respond(prompt)
+    assert {int(n) for n in re.findall(r"\[PARAGRAPH (\d+)\]", respond(prompt))} <= {4, 5}
+
+
+def test_errors_classify_like_sdk_errors():
+    assert isinstance(classify_anthropic_error(MockRateLimitError()), LLMRateLimitError)
+    err = classify_anthropic_error(MockServerError())
+    assert isinstance(err, LLMError) and not isinstance(err, LLMRateLimitError)
+
+
+@pytest.mark.asyncio
+async def test_review_with_mock_provider(mock_settings):
+    service = ReviewService()
+    persona = service.list_personas()[0]
+    content = "# Title\n\nFirst paragraph.\n\nSecond paragraph.\n\nThird paragraph."
+
+    async def run():
+        return [e async for e in service.review_document(
+            document_id="d1", content=content, version_hash="HEAD",
+            persona_ids=[persona.id], model="m", use_cache=False,
+        )]
+
+    first, second = await run(), await run()
+    comments = [e["comment"]["content"] for e in first if e["type"] == "comment"]
+    assert comments
+    assert comments == [e["comment"]["content"] for e in second if e["type"] == "comment"]
+    assert first[-1]["usage"]["output_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_meta_synthesis_with_mock_provider(mock_settings):
+    comments = [
+        {"id": "c1", "persona_id": "a", "persona_name": "Alpha", "persona_color": "#000",
+         "content": "Unclear.", "start_line": 0, "end_line": 1},
+        {"id": "c2", "persona_id": "b", "persona_name": "Beta", "persona_color": "#fff",
+         "content": "Needs data.", "start_line": 1, "end_line": 2},
+        {"id": "c3", "persona_id": "b", "persona_name": "Beta", "persona_color": "#fff",
+         "content": "Far away.", "start_line": 40, "end_line": 41},
+    ]
+    result = await MetaService().synthesize(comments, local=False)
+    assert len(result.comments) == 2
+    assert {s.persona_name for s in result.comments[0].sources} == {"Alpha", "Beta"}
+    assert (result.comments[1].start_line, result.comments[1].end_line) == (40, 41)
+
+
+@pytest.mark.asyncio
+async def test_error_injection_and_latency(mock_settings, monkeypatch):
+    monkeypatch.setattr(mock_settings, "mock_llm_rate_limit_rate", 1.0)
+    client = MockAnthropicClient(mock_settings)
+    with pytest.raises(MockRateLimitError):
+        async with client.messages.stream(model="m", max_tokens=10, messages=[{"role": "user", "content": "hi"}]):
+            pass
+
+    monkeypatch.setattr(mock_settings, "mock_llm_rate_limit_rate", 0.0)
+    monkeypatch.setattr(mock_settings, "mock_llm_ttft_ms", 50)
+    start = time.monotonic()
+    async with client.messages.stream(model="m", max_tokens=10, messages=[{"role": "user", "content": "hi"}]) as s:
+        async for _ in s.text_stream:
+            break
+    assert time.monotonic() - start >= 0.05
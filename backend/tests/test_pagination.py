@@ -0,0 +1,92 @@
+"""Keyset pagination of the document, review and job listings."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.pagination import decode_cursor, encode_cursor
+from database import DbDocument, DbReview, DbReviewJob
+
+BASE = datetime(2026, 1, 1)
+
+
+def _seed(db, count: int):
+    # Every third row shares its created_at with the previous one, so ids have to break ties
+    for i in range(count):
+        created_at = BASE + timedelta(minutes=i - i % 3 // 2)
+        db.add(DbDocument(id=f"doc{i:03}", title=f"Doc {i}", content="Text.", created_at=created_at))
+        db.add(DbReview(id=f"rev{i:03}", document_id="doc000", persona_ids=[], status="completed", created_at=created_at))
+        db.add(DbReviewJob(id=f"job{i:03}", document_id="doc000", status="completed", created_at=created_at))
+    db.commit()
+
+
+async def _walk(client, path: str, limit: int) -> tuple[list[str], int]:
+    ids, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        resp = await client.get(path, params=params)
+        assert resp.status_code == 200
+        body = resp.json()
+        assert len(body["items"]) <= limit
+        ids += [item["id"] for item in body["items"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("path,prefix", [
+    ("/api/v1/documents/", "doc"),
+    ("/api/v1/reviews/doc000/reviews", "rev"),
+    ("/api/v1/jobs/", "job"),
+])
+async def test_pages_cover_everything_once_newest_first(client, db, path, prefix):
+    _seed(db, 23)
+    ids, pages = await _walk(client, path, limit=5)
+
+    assert pages == 5
+    assert len(ids) == len(set(ids)) == 23
+    rows = {r.id: r.created_at for r in db.query(DbDocument)}
+    expected = sorted(rows, key=lambda i: (rows[i], i), reverse=True)
+    assert ids == [prefix + i[3:] for i in expected]
+
+
+async def test_exact_multiple_ends_without_empty_page(client, db):
+    _seed(db, 10)
+    resp = await client.get("/api/v1/jobs/", params={"limit": 10})
+    assert len(resp.json()["items"]) == 10
+    assert resp.json()["next_cursor"] is None
+
+
+async def test_cursor_keeps_its_place_when_rows_are_added(client, db):
+    _seed(db, 6)
+    first = (await client.get("/api/v1/documents/", params={"limit": 3})).json()
+    db.add(DbDocument(id="newest", title="New", content="Text.", created_at=BASE + timedelta(days=1)))
+    db.commit()
+
+    second = (await client.get("/api/v1/documents/", params={"limit": 3, "cursor": first["next_cursor"]})).json()
+    assert [d["id"] for d in second["items"]] == ["doc002", "doc001", "doc000"]
+
+
+async def test_documents_fields_and_archive_filter_paginate(client, db):
+    _seed(db, 7)
+    db.query(DbDocument).filter(DbDocument.id.in_(["doc006", "doc003"])).update({"is_archived": True})
+    db.commit()
+
+    resp = await client.get("/api/v1/documents/", params={"limit": 3, "fields": "title"})
+    body = resp.json()
+    assert [d["id"] for d in body["items"]] == ["doc005", "doc004", "doc002"]
+    assert set(body["items"][0]) == {"id", "title"}
+    resp = await client.get("/api/v1/documents/", params={"limit": 3, "fields": "title", "cursor": body["next_cursor"]})
+    assert [d["id"] for d in resp.json()["items"]] == ["doc001", "doc000"]
+
+
+@pytest.mark.parametrize("params", [{"cursor": "not-a-cursor"}, {"limit": 0}, {"limit": 10_000}])
+async def test_bad_cursor_or_limit(client, params):
+    for path in ("/api/v1/documents/", "/api/v1/reviews/doc000/reviews", "/api/v1/jobs/"):
+        assert (await client.get(path, params=params)).status_code == 400
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(BASE, "abc")
+    assert "abc" not in cursor  # opaque to clients
+    assert decode_cursor(cursor) == (BASE, "abc")
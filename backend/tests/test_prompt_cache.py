@@ -0,0 +1,103 @@
+"""Tests for prompt-prefix caching of the shared document block."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.llm_client import llm_pool
+from services.review_service import ReviewService, _PrefixCacheGate
+
+LONG_DOC = "\n\n".join(f"Paragraph {i} " + "word " * 200 for i in range(10))
+
+
+@pytest.fixture
+def service():
+    return ReviewService()
+
+
+def test_document_block_is_shared_across_personas(service):
+    paragraphs = service._parse_document_structure(LONG_DOC)
+    document_block, instructions = service._build_prompt(LONG_DOC, paragraphs)
+    a, b = service.list_personas()[:2]
+    system_a = service._build_system(document_block, a)
+    system_b = service._build_system(document_block, b)
+    assert system_a[0] == system_b[0]
+    assert system_a[0]["cache_control"] == {"type": "ephemeral"}
+    assert system_a[1]["text"] == a.system_prompt
+    assert LONG_DOC not in instructions
+
+
+def test_small_documents_skip_cache_control(service):
+    paragraphs = service._parse_document_structure("Tiny doc.")
+    document_block, _ = service._build_prompt("Tiny doc.", paragraphs)
+    system = service._build_system(document_block, service.list_personas()[0])
+    assert "cache_control" not in system[0]
+
+
+@pytest.mark.asyncio
+async def test_prefix_gate_holds_followers_until_release():
+    gate = _PrefixCacheGate(timeout=5)
+    assert await gate.enter() is True
+    follower = asyncio.create_task(gate.enter())
+    await asyncio.sleep(0)
+    assert not follower.done()
+    gate.release()
+    assert await follower is False
+
+
+class _UsageStream:
+    def __init__(self, usage):
+        self._usage = usage
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        async def gen():
+            yield "[PARAGRAPH 0] Note."
+        return gen()
+
+    async def get_final_message(self):
+        return SimpleNamespace(usage=self._usage)
+
+
+@pytest.mark.asyncio
+async def test_usage_reported_per_persona_and_in_done(service, monkeypatch):
+    calls = []
+
+    class FakeClient:
+        messages = None
+
+        def __init__(self):
+            self.messages = self
+
+        def stream(self, **kwargs):
+            calls.append(kwargs)
+            first = len(calls) == 1
+            return _UsageStream(SimpleNamespace(
+                input_tokens=50,
+                output_tokens=20,
+                cache_creation_input_tokens=1000 if first else 0,
+                cache_read_input_tokens=0 if first else 1000,
+            ))
+
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": FakeClient())
+    persona_ids = [p.id for p in service.list_personas()[:3]]
+    events = [e async for e in service.review_document(
+        document_id="d1", content=LONG_DOC, version_hash="HEAD",
+        persona_ids=persona_ids, model="m", use_cache=False,
+    )]
+    assert len(calls) == 3
+    assert all(c["system"][0] == calls[0]["system"][0] for c in calls)
+    completed = [e for e in events if e.get("status") == "completed"]
+    assert all(e["usage"]["input_tokens"] == 50 for e in completed)
+    assert events[-1]["usage"] == {
+        "input_tokens": 150,
+        "output_tokens": 60,
+        "cache_read_tokens": 2000,
+        "cache_write_tokens": 1000,
+    }
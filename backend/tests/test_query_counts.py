@@ -0,0 +1,62 @@
+"""Listing endpoints send a fixed number of queries, however many rows they return."""
+import pytest
+
+from database import DbComment, DbDocument, DbReview
+
+
+def _comments(doc_id: str, review_id: str, count: int) -> list[DbComment]:
+    return [
+        DbComment(
+            id=f"{review_id}-c{c}", review_id=review_id, document_id=doc_id, persona_id="a",
+            persona_name="A", persona_color="#000", content="Comment.", start_line=c, end_line=c,
+        )
+        for c in range(count)
+    ]
+
+
+def _seed(db, documents: int, reviews: int, comments: int, start: int = 0):
+    for d in range(start, documents):
+        doc_id = f"doc{d}"
+        db.add(DbDocument(id=doc_id, title=f"Doc {d}", content="Text."))
+        for r in range(reviews):
+            review_id = f"{doc_id}-r{r}"
+            db.add(DbReview(id=review_id, document_id=doc_id, persona_ids=["a"], status="completed"))
+            db.add_all(_comments(doc_id, review_id, comments))
+    db.commit()
+
+
+async def _count(client, statements, path: str) -> int:
+    statements.clear()
+    resp = await client.get(path)
+    assert resp.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/documents/", "/api/v1/documents/doc0", "/api/v1/reviews/doc0/reviews"])
+async def test_listing_query_count_is_constant(client, db, statements, path):
+    _seed(db, documents=1, reviews=1, comments=1)
+    small = await _count(client, statements, path)
+
+    # Many more documents, reviews on the listed document and comments on each of them
+    _seed(db, documents=20, reviews=15, comments=10, start=1)
+    for r in range(1, 15):
+        db.add(DbReview(id=f"doc0-r{r}", document_id="doc0", persona_ids=["a"], status="completed"))
+        db.add_all(_comments("doc0", f"doc0-r{r}", 10))
+    db.commit()
+    large = await _count(client, statements, path)
+
+    assert small == large == 1
+
+
+async def test_listing_counts_come_from_sql(client, db):
+    _seed(db, documents=2, reviews=3, comments=4)
+    db.add(DbDocument(id="empty", title="Empty", content="Text."))
+    db.commit()
+
+    docs = {d["id"]: d for d in (await client.get("/api/v1/documents/")).json()["items"]}
+    assert docs["doc0"]["review_count"] == 3
+    assert docs["empty"]["review_count"] == 0
+    assert (await client.get("/api/v1/documents/doc1")).json()["review_count"] == 3
+
+    reviews = (await client.get("/api/v1/reviews/doc0/reviews")).json()["items"]
+    assert [r["comment_count"] for r in reviews] == [4, 4, 4]
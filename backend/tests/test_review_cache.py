@@ -0,0 +1,121 @@
+"""Tests for the persona review result cache."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.observability import metrics
+from database import DbReviewCacheEntry
+from services.review_cache import ReviewCache, review_cache_key
+from services.review_service import ReviewService
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def cache():
+    return ReviewCache(session_factory=TestingSessionLocal)
+
+
+# ---------- key ----------
+
+class TestReviewCacheKey:
+    def test_stable(self):
+        assert review_cache_key("doc", "prompt", "m", "1") == review_cache_key("doc", "prompt", "m", "1")
+
+    def test_changes_with_each_part(self):
+        base = review_cache_key("doc", "prompt", "m", "1")
+        assert review_cache_key("doc2", "prompt", "m", "1") != base
+        assert review_cache_key("doc", "prompt2", "m", "1") != base
+        assert review_cache_key("doc", "prompt", "m2", "1") != base
+        assert review_cache_key("doc", "prompt", "m", "2") != base
+
+
+# ---------- store ----------
+
+class TestReviewCacheStore:
+    def test_miss_then_hit(self, cache):
+        hits, misses = metrics.review_cache_hits, metrics.review_cache_misses
+        assert cache.get("k1") is None
+        cache.put("k1", "devils-advocate", "m", [{"content": "x", "start_line": 0, "end_line": 1}])
+        assert cache.get("k1") == [{"content": "x", "start_line": 0, "end_line": 1}]
+        assert metrics.review_cache_misses == misses + 1
+        assert metrics.review_cache_hits == hits + 1
+
+    def test_ttl_expiry(self, cache, db, monkeypatch):
+        monkeypatch.setattr(cache.settings, "review_cache_ttl_seconds", 60)
+        cache.put("old", "p", "m", [])
+        entry = db.query(DbReviewCacheEntry).filter(DbReviewCacheEntry.key == "old").first()
+        entry.created_at = datetime.utcnow() - timedelta(seconds=120)
+        db.commit()
+        assert cache.get("old") is None
+        assert db.query(DbReviewCacheEntry).count() == 0
+
+    def test_size_eviction_drops_least_recently_used(self, cache, db, monkeypatch):
+        monkeypatch.setattr(cache.settings, "review_cache_max_entries", 2)
+        cache.put("a", "p", "m", [])
+        cache.put("b", "p", "m", [])
+        entry = db.query(DbReviewCacheEntry).filter(DbReviewCacheEntry.key == "a").first()
+        entry.last_used_at = datetime.utcnow() + timedelta(seconds=5)
+        db.commit()
+        cache.put("c", "p", "m", [])
+        db.expire_all()
+        keys = {k for (k,) in db.query(DbReviewCacheEntry.key)}
+        assert keys == {"a", "c"}
+
+
+# ---------- replay through review_document ----------
+
+@pytest.mark.asyncio
+async def test_review_document_replays_cached_personas(cache, monkeypatch):
+    service = ReviewService(cache=cache)
+    persona = service.list_personas()[0]
+    content = "# Title\n\nFirst paragraph.\n\nSecond paragraph."
+    model = "claude-test"
+
+    from services.review_service import PROMPT_TEMPLATE_VERSION
+    key = review_cache_key(content, persona.system_prompt, model, PROMPT_TEMPLATE_VERSION)
+    cache.put(key, persona.id, model, [{"content": "Cached remark", "start_line": 2, "end_line": 2}])
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("LLM should not be called on a cache hit")
+
+    monkeypatch.setattr(service, "_review_with_persona", no_llm)
+
+    events = [e async for e in service.review_document(
+        document_id="d1", content=content, version_hash="HEAD", persona_ids=[persona.id], model=model,
+    )]
+    statuses = [e["status"] for e in events if e["type"] == "persona_status"]
+    assert statuses == ["queued", "running", "completed"]
+    completed = next(e for e in events if e.get("status") == "completed")
+    assert completed["cached"] is True
+    comments = [e["comment"] for e in events if e["type"] == "comment"]
+    assert len(comments) == 1
+    assert comments[0]["content"] == "Cached remark"
+    assert comments[0]["persona_id"] == persona.id
+    assert events[-1] == {"type": "done", "total_comments": 1}
+
+
+@pytest.mark.asyncio
+async def test_review_document_bypass_skips_cache(cache, monkeypatch):
+    service = ReviewService(cache=cache)
+    persona = service.list_personas()[0]
+    calls = []
+
+    async def fake_review(persona, content, document_id, version_hash, paragraphs, model, cache_key=None, **kwargs):
+        calls.append(cache_key)
+        return
+        yield
+
+    monkeypatch.setattr(service, "_review_with_persona", fake_review)
+    events = [e async for e in service.review_document(
+        document_id="d1", content="text", version_hash="HEAD", persona_ids=[persona.id],
+        model="m", use_cache=False,
+    )]
+    assert calls == [None]
+    assert events[-1]["type"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_metrics_include_review_cache(client):
+    resp = await client.get("/api/v1/metrics")
+    data = resp.json()
+    assert set(data["review_cache"]) >= {"hits", "misses", "evictions", "hit_rate"}
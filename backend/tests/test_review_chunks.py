@@ -0,0 +1,155 @@
+"""Tests for chunked (map-reduce) review of long documents."""
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from services.llm_client import llm_pool
+from services.review_chunks import CommentDeduper, chunk_paragraphs
+from services.review_service import ReviewService
+
+
+def _paras(texts):
+    return [{"text": t, "start_line": i * 2, "end_line": i * 2, "index": i} for i, t in enumerate(texts)]
+
+
+class TestChunkParagraphs:
+    def test_packs_whole_sections(self):
+        body = "x" * 40  # ~10 tokens
+        paras = _paras(["# A", body, body, "# B", body, body, "# C", body])
+        assert chunk_paragraphs(paras, 45) == [[0, 1, 2, 3, 4, 5], [6, 7]]
+
+    def test_breaks_on_headings(self):
+        body = "x" * 80  # ~20 tokens
+        paras = _paras(["# A", body, body, "# B", body, body])
+        assert chunk_paragraphs(paras, 50) == [[0, 1, 2], [3, 4, 5]]
+
+    def test_oversized_section_split_at_paragraphs(self):
+        body = "x" * 80
+        paras = _paras(["# A", body, body, body, body])
+        windows = chunk_paragraphs(paras, 50)
+        assert [i for w in windows for i in w] == [0, 1, 2, 3, 4]
+        assert len(windows) == 2
+
+    def test_single_huge_paragraph(self):
+        paras = _paras(["x" * 4000, "y"])
+        assert chunk_paragraphs(paras, 50) == [[0], [1]]
+
+    def test_empty(self):
+        assert chunk_paragraphs([], 50) == []
+
+
+def test_deduper_ignores_case_and_punctuation():
+    deduper = CommentDeduper()
+    assert deduper.is_new("Add a summary.")
+    assert not deduper.is_new("add a summary")
+    assert deduper.is_new("Add a conclusion.")
+
+
+class _Stream:
+    def __init__(self, text):
+        self._text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        async def gen():
+            await asyncio.sleep(0.01)
+            yield self._text
+        return gen()
+
+    async def get_final_message(self):
+        usage = SimpleNamespace(
+            input_tokens=100, output_tokens=10, cache_read_input_tokens=0, cache_creation_input_tokens=0,
+        )
+        return SimpleNamespace(usage=usage)
+
+
+class _WindowClient:
+    """Comments on the first paragraph of each window, plus one remark repeated everywhere."""
+
+    def __init__(self):
+        self.messages = self
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    def stream(self, **kwargs):
+        self.calls += 1
+        first, last = map(int, re.search(r"paragraphs (\d+) to (\d+)", kwargs["messages"][0]["content"]).groups())
+        client = self
+
+        class _Tracked(_Stream):
+            async def __aenter__(self):
+                client.active += 1
+                client.peak = max(client.peak, client.active)
+                return self
+
+            async def __aexit__(self, *exc):
+                client.active -= 1
+                return False
+
+        return _Tracked(
+            f"[PARAGRAPH {first}] Start of section {first}. "
+            f"[PARAGRAPH {last}] Add an executive summary. "
+            f"[PARAGRAPH {last + 1}] Outside this window."
+        )
+
+
+@pytest.fixture
+def long_document():
+    sections = []
+    for s in range(6):
+        sections.append(f"# Section {s}")
+        sections.extend(f"Paragraph {s}.{p} " + "word " * 60 for p in range(3))
+    return "\n\n".join(sections)
+
+
+@pytest.mark.asyncio
+async def test_long_document_is_reviewed_in_windows(monkeypatch, long_document):
+    fake = _WindowClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+    service = ReviewService()
+    monkeypatch.setattr(service.settings, "review_chunk_threshold_tokens", 500)
+    monkeypatch.setattr(service.settings, "review_chunk_tokens", 250)
+    monkeypatch.setattr(service.settings, "review_chunk_parallelism", 2)
+    persona = service.list_personas()[0]
+    paragraphs = service._parse_document_structure(long_document)
+    windows = chunk_paragraphs(paragraphs, 250)
+    assert len(windows) > 2
+
+    events = [e async for e in service.review_document(
+        document_id="d1", content=long_document, version_hash="HEAD",
+        persona_ids=[persona.id], model="m", use_cache=False,
+    )]
+
+    assert fake.calls == len(windows)
+    assert fake.peak == 2
+    comments = [e["comment"] for e in events if e["type"] == "comment"]
+    section_comments = [c for c in comments if c["content"].startswith("Start of section")]
+    # Global paragraph numbers map back to the right lines
+    assert sorted(c["anchor"]["start_line"] for c in section_comments) == sorted(
+        paragraphs[w[0]]["start_line"] for w in windows
+    )
+    # The repeated remark survives once; out-of-window paragraphs are dropped
+    assert sum(c["content"] == "Add an executive summary." for c in comments) == 1
+    assert not any(c["content"] == "Outside this window." for c in comments)
+
+    statuses = [e["status"] for e in events if e["type"] == "persona_status"]
+    assert statuses == ["queued", "running", "completed"]
+    completed = next(e for e in events if e.get("status") == "completed")
+    assert completed["chunks"] == len(windows)
+    assert completed["usage"]["input_tokens"] == 100 * len(windows)
+    assert events[-1]["chunks"] == len(windows)
+
+
+def test_short_document_is_not_chunked():
+    service = ReviewService()
+    content = "# A\n\nShort."
+    assert service._chunk_windows(content, service._parse_document_structure(content)) is None
@@ -0,0 +1,107 @@
+"""Tests for incremental re-review: paragraph diffing and comment carry-forward."""
+import pytest
+
+from services.review_diff import carry_forward_comments, diff_paragraphs, with_context
+from services.review_service import ReviewService
+
+OLD = "# Title\n\nIntro paragraph.\n\nMiddle paragraph.\n\nClosing paragraph."
+NEW = "# Title\n\nIntro paragraph.\n\nA brand new paragraph.\n\nMiddle paragraph, edited.\n\nClosing paragraph."
+
+
+@pytest.fixture
+def service():
+    return ReviewService()
+
+
+class TestDiffParagraphs:
+    def test_identical(self, service):
+        paras = service._parse_document_structure(OLD)
+        diff = diff_paragraphs(paras, paras)
+        assert diff["changed"] == []
+        assert diff["unchanged"] == {0: 0, 1: 1, 2: 2, 3: 3}
+
+    def test_insert_and_edit(self, service):
+        old = service._parse_document_structure(OLD)
+        new = service._parse_document_structure(NEW)
+        diff = diff_paragraphs(old, new)
+        assert diff["changed"] == [2, 3]
+        assert diff["unchanged"] == {0: 0, 1: 1, 3: 4}
+
+    def test_with_context(self):
+        assert with_context([3], 10, 1) == [2, 3, 4]
+        assert with_context([0, 9], 10, 1) == [0, 1, 8, 9]
+        assert with_context([4], 10, 0) == [4]
+
+
+class TestCarryForward:
+    def test_remaps_unchanged_and_drops_edited(self, service):
+        old = service._parse_document_structure(OLD)
+        new = service._parse_document_structure(NEW)
+        diff = diff_paragraphs(old, new)
+        previous = [
+            {"persona_id": "p", "content": "on closing", "start_line": 6, "end_line": 6},
+            {"persona_id": "p", "content": "on middle", "start_line": 4, "end_line": 4},
+            {"persona_id": "p", "content": "on intro", "start_line": 2, "end_line": 2},
+        ]
+        carried = carry_forward_comments(previous, old, new, diff["unchanged"])
+        by_content = {c["content"]: c for c in carried}
+        assert set(by_content) == {"on closing", "on intro"}
+        assert by_content["on closing"]["start_line"] == 8
+        assert by_content["on closing"]["end_line"] == 8
+        assert by_content["on intro"]["start_line"] == 2
+
+
+@pytest.mark.asyncio
+async def test_incremental_review_only_sends_changed_paragraphs(service, monkeypatch):
+    persona = service.list_personas()[0]
+    calls = []
+
+    async def fake_review(persona, content, document_id, version_hash, paragraphs, model, focus=None, **kwargs):
+        calls.append(focus)
+        para = paragraphs[focus[0]]
+        yield service._make_comment(persona, "fresh", para["start_line"], para["end_line"], document_id, version_hash)
+
+    monkeypatch.setattr(service, "_review_with_persona", fake_review)
+    previous_review = {
+        "content": OLD,
+        "persona_ids": [persona.id],
+        "comments": [{"persona_id": persona.id, "content": "kept", "start_line": 6, "end_line": 6}],
+    }
+    events = [e async for e in service.review_document(
+        document_id="d1", content=NEW, version_hash="HEAD", persona_ids=[persona.id],
+        model="m", use_cache=False, previous_review=previous_review,
+    )]
+
+    assert calls == [[2, 3]]
+    comments = {e["comment"]["content"]: e["comment"] for e in events if e["type"] == "comment"}
+    assert comments["kept"]["anchor"]["start_line"] == 8
+    assert "fresh" in comments
+    completed = next(e for e in events if e.get("status") == "completed")
+    assert completed["carried_forward"] == 1
+    assert events[-1]["changed_paragraphs"] == 2
+
+
+@pytest.mark.asyncio
+async def test_incremental_review_skips_llm_when_unchanged(service, monkeypatch):
+    persona = service.list_personas()[0]
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("LLM should not be called for an unchanged document")
+
+    monkeypatch.setattr(service, "_review_with_persona", no_llm)
+    previous_review = {"content": OLD, "persona_ids": [persona.id], "comments": []}
+    events = [e async for e in service.review_document(
+        document_id="d1", content=OLD, version_hash="HEAD", persona_ids=[persona.id],
+        model="m", use_cache=False, previous_review=previous_review,
+    )]
+    assert events[-1]["type"] == "done"
+    assert events[-1]["changed_paragraphs"] == 0
+
+
+def test_focused_prompt_lists_changed_paragraphs(service):
+    paras = service._parse_document_structure(NEW)
+    document_block, instructions = service._build_prompt(NEW, paras, focus=[2])
+    prompt = document_block + instructions
+    assert "The changed paragraphs are: 2" in prompt
+    assert "A brand new paragraph." in prompt
+    assert "Closing paragraph." not in prompt
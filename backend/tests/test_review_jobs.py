@@ -0,0 +1,422 @@
+"""Tests for background review jobs, resumable job event streams and request coalescing."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from core.observability import metrics
+from database import DbComment, DbReview, DbReviewJob
+from services.db_writer import DbWriter, db_writer
+from services.llm_client import llm_pool
+from services.review_jobs import (
+    CommentWriter,
+    ReviewJobManager,
+    review_jobs,
+    review_request_key,
+)
+
+
+class _Stream:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        async def gen():
+            yield "[PARAGRAPH 0] Looks fine."
+        return gen()
+
+    async def get_final_message(self):
+        usage = SimpleNamespace(
+            input_tokens=50, output_tokens=5, cache_read_input_tokens=0, cache_creation_input_tokens=0,
+        )
+        return SimpleNamespace(usage=usage)
+
+
+class FakeClient:
+    def __init__(self):
+        self.messages = self
+        self.calls = 0
+
+    def stream(self, **kwargs):
+        self.calls += 1
+        return _Stream()
+
+
+def _parse_sse(text):
+    frames = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        frames.append((int(fields["id"]), json.loads(fields["data"])))
+    return frames
+
+
+@pytest.fixture
+async def fake_llm(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(llm_pool, "get_client", lambda provider="anthropic": fake)
+    yield fake
+    await review_jobs.shutdown()
+
+
+async def _create_doc(client):
+    resp = await client.post("/api/v1/documents/", json={"title": "Doc", "content": "Only paragraph."})
+    return resp.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_review_runs_as_job_and_persists(client, db, fake_llm):
+    doc_id = await _create_doc(client)
+    resp = await client.post(
+        f"/api/v1/reviews/{doc_id}/review",
+        json={"persona_ids": ["devils-advocate"], "bypass_cache": True},
+    )
+    assert resp.status_code == 200
+    frames = _parse_sse(resp.text)
+    ids = [i for i, _ in frames]
+    assert ids == list(range(1, len(frames) + 1))
+
+    first, last = frames[0][1], frames[-1][1]
+    assert first["type"] == "job"
+    assert first["job_id"] == resp.headers["x-job-id"]
+    assert last["type"] == "done"
+    assert last["review_id"] == first["review_id"]
+
+    job = db.query(DbReviewJob).filter(DbReviewJob.id == first["job_id"]).one()
+    assert job.status == "completed"
+    assert job.input_tokens == 50
+    review = db.query(DbReview).filter(DbReview.id == first["review_id"]).one()
+    assert review.status == "completed"
+    assert [c.content for c in db.query(DbComment).filter(DbComment.review_id == review.id)] == ["Looks fine."]
+
+
+@pytest.mark.asyncio
+async def test_resume_from_last_event_id(client, fake_llm):
+    doc_id = await _create_doc(client)
+    resp = await client.post(
+        f"/api/v1/reviews/{doc_id}/review",
+        json={"persona_ids": ["devils-advocate"], "bypass_cache": True},
+    )
+    frames = _parse_sse(resp.text)
+    job_id = frames[0][1]["job_id"]
+
+    resumed = await client.get(f"/api/v1/jobs/{job_id}/events", headers={"Last-Event-ID": "2"})
+    assert resumed.status_code == 200
+    assert _parse_sse(resumed.text) == frames[2:]
+    # Replaying the log does not call the LLM again
+    assert fake_llm.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_job_events_unknown_and_expired(client, db):
+    resp = await client.get("/api/v1/jobs/nope/events")
+    assert resp.status_code == 404
+
+    db.add(DbReviewJob(id="old1", document_id="d1", status="completed"))
+    db.commit()
+    resp = await client.get("/api/v1/jobs/old1/events")
+    assert resp.status_code == 410
+
+
+@pytest.mark.asyncio
+async def test_job_survives_subscriber_disconnect(db):
+    db.add(DbReviewJob(id="j1", document_id="d1", status="queued"))
+    db.add(DbReview(id="r1", document_id="d1", persona_ids=[], status="running", job_id="j1"))
+    db.commit()
+    manager = ReviewJobManager()
+    release = asyncio.Event()
+
+    async def run():
+        yield {"type": "persona_status", "status": "running"}
+        await release.wait()
+        yield {"type": "done", "total_comments": 0}
+
+    log = manager.submit("j1", "r1", "d1", run)
+    async for event_id, _event in log.follow():
+        if event_id == 2:
+            break  # client goes away mid-review
+
+    release.set()
+    while not log.finished:
+        await asyncio.sleep(0.01)
+    db.expire_all()
+    assert db.query(DbReviewJob).filter(DbReviewJob.id == "j1").one().status == "completed"
+    assert log.events[-1]["job_id"] == "j1"
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_is_bounded(monkeypatch):
+    manager = ReviewJobManager()
+    monkeypatch.setattr(manager.settings, "review_workers", 2)
+    release = asyncio.Event()
+    peak = 0
+
+    def make_run():
+        async def run():
+            nonlocal peak
+            peak = max(peak, manager.stats()["running"])
+            await release.wait()
+            yield {"type": "done", "total_comments": 0}
+        return run
+
+    logs = [manager.submit(f"j{i}", f"r{i}", "d1", make_run()) for i in range(5)]
+    await asyncio.sleep(0.05)
+    assert manager.stats()["running"] == 2
+    assert manager.stats()["queued"] == 3
+    release.set()
+    while not all(log.finished for log in logs):
+        await asyncio.sleep(0.01)
+    assert peak == 2
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_review_marks_job_failed(db):
+    db.add(DbReviewJob(id="j2", document_id="d1", status="queued"))
+    db.commit()
+    manager = ReviewJobManager()
+
+    async def run():
+        raise RuntimeError("boom")
+        yield  # pragma: no cover
+
+    log = manager.submit("j2", "r2", "d1", run)
+    events = [e async for _, e in log.follow()]
+    assert events[-1]["type"] == "error"
+    db.expire_all()
+    job = db.query(DbReviewJob).filter(DbReviewJob.id == "j2").one()
+    assert job.status == "failed"
+    await manager.shutdown()
+
+
+async def test_recover_interrupted_jobs(db):
+    db.add(DbReviewJob(id="stuck", document_id="d1", status="running"))
+    db.add(DbReview(id="r3", document_id="d1", persona_ids=[], status="running", job_id="stuck"))
+    db.add(DbReviewJob(id="ok", document_id="d1", status="completed"))
+    db.commit()
+
+    assert await ReviewJobManager().recover_interrupted() == 1
+    db.expire_all()
+    assert db.query(DbReviewJob).filter(DbReviewJob.id == "stuck").one().status == "failed"
+    assert db.query(DbReview).filter(DbReview.id == "r3").one().status == "failed"
+    assert db.query(DbReviewJob).filter(DbReviewJob.id == "ok").one().status == "completed"
+
+
+def test_request_key_ignores_persona_order():
+    assert review_request_key("doc", ["b", "a"], "m") == review_request_key("doc", ["a", "b"], "m")
+    assert review_request_key("doc", ["a"], "m") != review_request_key("doc", ["a", "b"], "m")
+    assert review_request_key("doc", ["a"], "m") != review_request_key("doc!", ["a"], "m")
+    assert review_request_key("doc", ["a"], "m") != review_request_key("doc", ["a"], "m", auto_meta=True)
+
+
+@pytest.mark.parametrize("option", [{"incremental": True}, {"bypass_cache": True}, {"priority": 1}])
+def test_request_key_includes_review_options(option):
+    assert review_request_key("doc", ["a"], "m") != review_request_key("doc", ["a"], "m", **option)
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_one_job(client, fake_llm, monkeypatch):
+    release = asyncio.Event()
+    started = asyncio.Event()
+
+    class _SlowStream(_Stream):
+        @property
+        def text_stream(self):
+            async def gen():
+                started.set()
+                await release.wait()
+                yield "[PARAGRAPH 0] Looks fine."
+            return gen()
+
+    def stream(**kwargs):
+        fake_llm.calls += 1
+        return _SlowStream()
+
+    monkeypatch.setattr(fake_llm, "stream", stream)
+    doc_id = await _create_doc(client)
+    body = {"persona_ids": ["devils-advocate", "casual-reader"], "bypass_cache": True}
+    before = metrics.snapshot()["review_coalescing"]
+
+    first = asyncio.create_task(client.post(f"/api/v1/reviews/{doc_id}/review", json=body))
+    await started.wait()
+    second = asyncio.create_task(client.post(
+        f"/api/v1/reviews/{doc_id}/review",
+        json={**body, "persona_ids": list(reversed(body["persona_ids"]))},
+    ))
+    await asyncio.sleep(0.05)
+    release.set()
+    first_resp, second_resp = await asyncio.gather(first, second)
+
+    assert second_resp.headers["x-coalesced"] == "true"
+    assert first_resp.headers["x-job-id"] == second_resp.headers["x-job-id"]
+    first_frames, second_frames = _parse_sse(first_resp.text), _parse_sse(second_resp.text)
+    assert first_frames == second_frames
+    assert first_frames[-1][1]["type"] == "done"
+    assert fake_llm.calls == 2  # one call per persona, not per request
+
+    after = metrics.snapshot()["review_coalescing"]
+    assert after["coalesced_requests"] == before["coalesced_requests"] + 1
+    assert after["persona_calls_saved"] == before["persona_calls_saved"] + 2
+    assert after["tokens_saved"] == before["tokens_saved"] + 110
+
+    # Once the job has finished, a new request starts a fresh review
+    third = await client.post(f"/api/v1/reviews/{doc_id}/review", json=body)
+    assert "x-coalesced" not in third.headers
+    assert third.headers["x-job-id"] != first_resp.headers["x-job-id"]
+
+
+def _comment(i: int) -> dict:
+    return {
+        "id": f"c{i}", "document_id": "d1", "persona_id": "p", "persona_name": "P", "persona_color": "#000",
+        "content": f"Comment {i}.", "anchor": {"start_line": i, "end_line": i},
+    }
+
+
+def _saved_comments(db, review_id: str) -> list[str]:
+    db.expire_all()
+    return sorted(c.id for c in db.query(DbComment).filter(DbComment.review_id == review_id))
+
+
+@pytest.fixture
+def comment_batches(monkeypatch):
+    def configure(manager, size: int, seconds: float):
+        monkeypatch.setattr(manager.settings, "review_comment_batch_size", size)
+        monkeypatch.setattr(manager.settings, "review_comment_flush_seconds", seconds)
+    return configure
+
+
+@pytest.mark.asyncio
+async def test_comments_are_saved_while_the_review_streams(db, comment_batches):
+    db.add(DbReviewJob(id="j5", document_id="d1", status="queued"))
+    db.add(DbReview(id="r5", document_id="d1", persona_ids=[], status="running", job_id="j5"))
+    db.commit()
+    manager = ReviewJobManager()
+    comment_batches(manager, size=2, seconds=0.05)
+    size_flushed, time_flushed, release = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+    async def run():
+        for i in range(3):
+            yield {"type": "comment", "comment": _comment(i)}
+        await size_flushed.wait()
+        await time_flushed.wait()
+        yield {"type": "comment", "comment": _comment(3)}
+        await release.wait()
+        yield {"type": "done", "total_comments": 4}
+
+    log = manager.submit("j5", "r5", "d1", run)
+    while _saved_comments(db, "r5") != ["c0", "c1"]:
+        await asyncio.sleep(0.01)  # the size trigger wrote the first two
+    size_flushed.set()
+    while _saved_comments(db, "r5") != ["c0", "c1", "c2"]:
+        await asyncio.sleep(0.01)  # the timer wrote the straggler
+    time_flushed.set()
+
+    release.set()
+    while not log.finished:
+        await asyncio.sleep(0.01)
+    assert _saved_comments(db, "r5") == ["c0", "c1", "c2", "c3"]
+    assert db.query(DbReview).filter(DbReview.id == "r5").one().status == "completed"
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_review_keeps_streamed_comments(db, comment_batches):
+    db.add(DbReviewJob(id="j6", document_id="d1", status="queued"))
+    db.add(DbReview(id="r6", document_id="d1", persona_ids=[], status="running", job_id="j6"))
+    db.commit()
+    manager = ReviewJobManager()
+    comment_batches(manager, size=2, seconds=60)
+
+    async def run():
+        for i in range(3):
+            yield {"type": "comment", "comment": _comment(i)}
+        raise RuntimeError("boom")
+
+    log = manager.submit("j6", "r6", "d1", run)
+    events = [e async for _, e in log.follow()]
+    assert events[-1]["type"] == "error"
+    assert _saved_comments(db, "r6") == ["c0", "c1", "c2"]
+    assert db.query(DbReview).filter(DbReview.id == "r6").one().status == "failed"
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_completion_marks_job_failed_and_keeps_comments(db, comment_batches):
+    db.add(DbReviewJob(id="j9", document_id="d1", status="queued"))
+    db.add(DbReview(id="r9", document_id="d1", persona_ids=[], status="running", job_id="j9"))
+    db.commit()
+
+    class _CompletionFails(DbWriter):
+        async def write(self, fn):
+            if fn.__name__ == "complete":
+                raise RuntimeError("disk I/O error")
+            return await super().write(fn)
+
+    manager = ReviewJobManager(_CompletionFails(db_writer.session_factory, serialize=False))
+    comment_batches(manager, size=2, seconds=60)
+
+    async def run():
+        for i in range(3):
+            yield {"type": "comment", "comment": _comment(i)}
+        yield {"type": "done", "total_comments": 3}
+
+    log = manager.submit("j9", "r9", "d1", run)
+    events = [e async for _, e in log.follow()]
+    assert events[-1]["type"] == "error"
+    # The straggler drained for the completion is saved with the failure instead
+    assert _saved_comments(db, "r9") == ["c0", "c1", "c2"]
+    assert db.query(DbReview).filter(DbReview.id == "r9").one().status == "failed"
+    assert db.query(DbReviewJob).filter(DbReviewJob.id == "j9").one().status == "failed"
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_comment_writer_never_delays_delivery():
+    writing = asyncio.Event()
+    release = asyncio.Event()
+
+    class _SlowSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, *args):
+            writing.set()
+            await release.wait()
+
+        async def commit(self):
+            pass
+
+    writer = CommentWriter(DbWriter(_SlowSession, serialize=True), "r7", batch_size=1, flush_seconds=60)
+    writer.add(_comment(0))  # starts a batch that blocks on the "database"
+    await writing.wait()
+    writer.add(_comment(1))  # returns at once, queued behind the first batch
+    writer.add(_comment(2))
+    release.set()
+    assert await writer.drain() == []
+
+
+@pytest.mark.asyncio
+async def test_failed_comment_batch_is_handed_back():
+    class _BrokenSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, *args):
+            raise RuntimeError("database is locked")
+
+    writer = CommentWriter(DbWriter(_BrokenSession, serialize=True), "r8", batch_size=2, flush_seconds=60)
+    for i in range(3):
+        writer.add(_comment(i))
+    # The failed batch comes back ahead of the unflushed comment, for the final transaction
+    assert [row["id"] for row in await writer.drain()] == ["c0", "c1", "c2"]
@@ -11,14 +11,14 @@ async def test_list_reviews_empty(client):
 
     resp = await client.get(f"/api/v1/reviews/{doc_id}/reviews")
     assert resp.status_code == 200
-    assert resp.json() == []
+    assert resp.json() == {"items": [], "next_cursor": None}
 
 
 @pytest.mark.asyncio
 async def test_list_reviews_for_nonexistent_doc(client):
     resp = await client.get("/api/v1/reviews/nonexistent/reviews")
     assert resp.status_code == 200
-    assert resp.json() == []
+    assert resp.json() == {"items": [], "next_cursor": None}
 
 
 @pytest.mark.asyncio
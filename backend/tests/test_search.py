@@ -0,0 +1,203 @@
+"""Full-text search: index sync, ranking, snippets, filters and the query language."""
+import re
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from core.config import get_settings
+from database import DbComment, DbDocument, DbMetaComment, DbReview
+from services.db_writer import db_writer
+from services.search import SearchQueryError, TsvectorBackend, parse_query, search_index
+
+CSRF = {"X-CSRF-Token": "test"}
+
+
+def _seed(db):
+    db.add(DbDocument(id="doc0", title="Deployment guide", content="# Deploy\n\nRoll the cluster one node at a time."))
+    db.add(DbDocument(id="doc1", title="Style guide", content="Prefer short sentences."))
+    db.add(DbReview(id="rev0", document_id="doc0", persona_ids=["sec", "ed"], status="completed"))
+    db.add(DbReview(id="rev1", document_id="doc1", persona_ids=["ed"], status="completed"))
+    db.add_all([
+        _comment("c0", "rev0", "doc0", "sec", "The rollback procedure never mentions the database migration."),
+        _comment("c1", "rev0", "doc0", "ed", "Rollback is spelled roll-back elsewhere; pick one."),
+        _comment("c2", "rev1", "doc1", "ed", "Short sentences read well, but this one is a fragment."),
+    ])
+    db.add(DbMetaComment(
+        id="m0", review_id="rev0", content="Document the rollback of the database migration.",
+        start_line=2, end_line=2, category="technical", priority="high",
+        sources=[{"persona_id": "sec", "persona_name": "Security", "persona_color": "#f00", "original_content": "x"}],
+    ))
+    db.commit()
+
+
+def _comment(comment_id: str, review_id: str, doc_id: str, persona: str, content: str) -> DbComment:
+    return DbComment(
+        id=comment_id, review_id=review_id, document_id=doc_id, persona_id=persona,
+        persona_name=persona.title(), persona_color="#000", content=content, start_line=2, end_line=2,
+    )
+
+
+async def _search(client, **params) -> list[dict]:
+    resp = await client.get("/api/v1/search/", params=params)
+    assert resp.status_code == 200, resp.text
+    return resp.json()["items"]
+
+
+async def test_hits_across_kinds_with_snippets(client, db):
+    _seed(db)
+    hits = await _search(client, q="rollback migration")
+
+    assert {(h["kind"], h["id"]) for h in hits} == {("comment", "c0"), ("meta_comment", "m0")}
+    comment = next(h for h in hits if h["kind"] == "comment")
+    assert comment["document_id"] == "doc0" and comment["document_title"] == "Deployment guide"
+    assert comment["review_id"] == "rev0" and comment["persona_id"] == "sec"
+    assert "<mark>rollback</mark>" in comment["snippet"] and "<mark>migration</mark>" in comment["snippet"]
+    meta = next(h for h in hits if h["kind"] == "meta_comment")
+    assert meta["document_id"] == "doc0" and (meta["category"], meta["priority"]) == ("technical", "high")
+    assert hits == sorted(hits, key=lambda h: h["score"], reverse=True)
+
+
+async def test_snippets_escape_the_text_around_matches(client, db):
+    db.add(DbDocument(id="doc", title="Embeds", content='Paste <script>alert("rollback")</script> & <b>rollback</b> here.'))
+    db.commit()
+    [hit] = await _search(client, q="rollback", kind="document")
+    snippet = hit["snippet"]
+    assert "<script>" not in snippet and "<b>" not in snippet
+    assert "&lt;script&gt;alert(&quot;<mark>rollback</mark>&quot;)&lt;/script&gt; &amp;" in snippet
+    assert "&lt;b&gt;<mark>rollback</mark>&lt;/b&gt;" in snippet
+
+
+async def test_documents_match_on_title_and_content(client, db):
+    _seed(db)
+    assert {h["id"] for h in await _search(client, q="guide", kind="document")} == {"doc0", "doc1"}
+    [hit] = await _search(client, q="cluster node", kind="document")
+    assert hit["id"] == "doc0" and hit["review_id"] is None
+
+
+async def test_stemming_phrases_and_prefixes(client, db):
+    _seed(db)
+    # porter stemming: "sentence" matches "sentences"
+    assert {h["id"] for h in await _search(client, q="sentence")} == {"doc1", "c2"}
+    assert {h["id"] for h in await _search(client, q='"database migration"')} == {"c0", "m0"}
+    assert await _search(client, q='"migration database"') == []
+    assert {h["id"] for h in await _search(client, q="roll*", kind="comment")} == {"c0", "c1"}
+
+
+async def test_index_follows_writes(client, db):
+    resp = await client.post("/api/v1/documents/", json={"title": "Runbook", "content": "Page the on-call engineer."})
+    doc_id = resp.json()["id"]
+    db.add(DbReview(id="rev", document_id=doc_id, persona_ids=["ed"], status="running"))
+    db.commit()
+    # The streamed-comment path: executemany through the single writer
+    rows = [
+        {"id": f"c{i}", "review_id": "rev", "document_id": doc_id, "persona_id": "ed", "persona_name": "Ed",
+         "persona_color": "#000", "content": f"Escalation step {i} is unclear.", "start_line": i, "end_line": i}
+        for i in range(3)
+    ]
+    await db_writer.write(lambda session: session.execute(insert(DbComment), rows))
+
+    assert [h["id"] for h in await _search(client, q="engineer")] == [doc_id]
+    assert len(await _search(client, q="escalation")) == 3
+
+    db.query(DbComment).filter(DbComment.id == "c0").update({"content": "Fine now."})
+    db.commit()
+    assert len(await _search(client, q="escalation")) == 2
+
+    assert (await client.delete(f"/api/v1/documents/{doc_id}", headers=CSRF)).status_code == 200
+    assert await _search(client, q="engineer") == []
+    assert await _search(client, q="escalation") == []
+
+
+async def test_filters(client, db):
+    _seed(db)
+    assert {h["id"] for h in await _search(client, q="rollback", persona="sec")} == {"c0", "m0"}
+    assert {h["id"] for h in await _search(client, q="rollback", persona="ed")} == {"c1"}
+    # Only meta comments have a category or priority
+    assert {h["id"] for h in await _search(client, q="rollback", category="technical")} == {"m0"}
+    assert await _search(client, q="rollback", priority="low") == []
+    assert {h["id"] for h in await _search(client, q="sentence", document_id="doc1")} == {"doc1", "c2"}
+    assert {h["id"] for h in await _search(client, q="rollback", document_id="doc0", kind="meta_comment")} == {"m0"}
+    assert await _search(client, q="sentence", document_id="doc0") == []
+
+
+async def test_limit_and_candidate_cap(client, db, monkeypatch):
+    db.add(DbDocument(id="doc", title="Doc", content="Text."))
+    db.add(DbReview(id="rev", document_id="doc", persona_ids=["ed"], status="completed"))
+    db.add_all(_comment(f"c{i}", "rev", "doc", "ed", "typo " * (1 + i % 3)) for i in range(10))
+    db.commit()
+
+    assert len(await _search(client, q="typo", limit=4)) == 4
+    # Only the newest matches get ranked once a term is this common
+    monkeypatch.setattr(get_settings(), "search_candidate_limit", 3)
+    assert {h["id"] for h in await _search(client, q="typo")} == {"c7", "c8", "c9"}
+
+
+@pytest.mark.parametrize("params", [{"q": ""}, {"q": "*** ()"}, {"q": "x", "kind": "review"}, {"q": "x", "limit": 0}])
+async def test_bad_requests(client, params):
+    assert (await client.get("/api/v1/search/", params=params)).status_code == 400
+
+
+async def test_engine_syntax_in_input_is_inert(client, db):
+    _seed(db)
+    # FTS5 column filters, grouping and stray quotes are just punctuation here
+    assert {h["id"] for h in await _search(client, q='(rollback: "migration')} == {"c0", "m0"}
+    # ...and operators just words, which nothing contains
+    assert await _search(client, q="rollback NOT migration") == []
+    assert await _search(client, q="NEAR(rollback migration)") == []
+
+
+def test_parse_query():
+    assert parse_query('Deploy "the  rollback" plan* -x') == [
+        (("Deploy",), False), (("the", "rollback"), False), (("plan",), True), (("x",), False),
+    ]
+    with pytest.raises(SearchQueryError):
+        parse_query('"" ---')
+
+
+async def test_rebuild_restores_the_index(client, db):
+    _seed(db)
+    db.connection().exec_driver_sql("INSERT INTO comments_fts(comments_fts) VALUES ('delete-all')")
+    db.commit()
+    assert await _search(client, q="rollback", kind="comment") == []
+
+    await search_index.rebuild()
+    assert {h["id"] for h in await _search(client, q="rollback", kind="comment")} == {"c0", "c1"}
+
+
+async def test_repair_rebuilds_indexes_whose_rowids_drifted(client, db):
+    _seed(db)
+    assert await search_index.repair() == []
+    # What a VACUUM may do to tables without an INTEGER PRIMARY KEY; no trigger sees it
+    db.connection().exec_driver_sql("UPDATE comments SET rowid = rowid + 100")
+    db.commit()
+    assert await _search(client, q="rollback", kind="comment") == []
+
+    assert await search_index.repair() == ["comments"]
+    assert {h["id"] for h in await _search(client, q="rollback", kind="comment")} == {"c0", "c1"}
+
+
+def test_postgres_queries_use_the_gin_index_expressions():
+    backend = TsvectorBackend()
+    terms = parse_query('rollback "database migration" plan*')
+    for kind, model in (("document", DbDocument), ("comment", DbComment), ("meta_comment", DbMetaComment)):
+        [index] = [i for i in model.__table__.indexes if i.name.endswith("_search")]
+        indexed = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        expression = re.search(r"\((to_tsvector\(.*\))\)$", indexed).group(1)
+        sql = str(backend.statement(kind, terms, {}, 20, 500).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True},
+        ))
+        # SQLAlchemy groups "(title || ' ') || content"; || is left-associative, so that's the same tree
+        assert expression in sql.replace(f"{model.__tablename__}.", "").replace("(title || ' ')", "title || ' '")
+        assert "to_tsquery('english', '''rollback'' & ''database'' <-> ''migration'' & ''plan'':*')" in sql
+
+
+def test_postgres_filters_compile():
+    statement = TsvectorBackend().statement(
+        "meta_comment", parse_query("rollback"),
+        {"persona": "sec", "category": "technical", "priority": "high", "document_id": "doc0"}, 20, 500,
+    )
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "CAST(meta_comments.sources AS JSONB) @>" in sql
+    assert "meta_comments.review_id IN (SELECT reviews.id" in sql
@@ -13,7 +13,7 @@ async def test_upload_raw(client):
     assert data["title"] == "My Document"
 
     # Verify document was created
-    doc_resp = await client.get(f"/api/v1/documents/{data['document_id']}")
+    doc_resp = await client.get(f"/api/v1/documents/{data['document_id']}/content")
     assert doc_resp.status_code == 200
     assert doc_resp.json()["content"] == "# My Document\n\nSome content here."
 
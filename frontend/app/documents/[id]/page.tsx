@@ -6,7 +6,7 @@ import Link from 'next/link';
 import ReactMarkdown from 'react-markdown';
 import {
   fetchDocument, fetchPersonas, fetchLatestComments, startReviewStream,
-  fetchReviews, fetchMetaComments, synthesizeMetaReview,
+  fetchReviews, fetchMetaComments, streamMetaReview,
   type Document, type Persona, type Comment, type PersonaStatus,
   type MetaComment,
 } from '@/lib/api';
@@ -73,7 +73,7 @@ export default function DocumentDetailPage() {
         if (existingComments.length > 0 && !autoReview) {
           setComments(existingComments);
           // Load cached meta comments from the latest completed review
-          const completedReview = reviews.find(r => r.status === 'completed');
+          const completedReview = reviews.items.find(r => r.status === 'completed');
           if (completedReview) {
             setCurrentReviewId(completedReview.id);
             try {
@@ -102,8 +102,12 @@ export default function DocumentDetailPage() {
 
   const triggerMetaSynthesis = async (reviewId: string) => {
     setIsSynthesizing(true);
+    setMetaComments([]);
     try {
-      const result = await synthesizeMetaReview(docId, reviewId);
+      const result = await streamMetaReview(docId, reviewId, (comment) => {
+        setMetaComments((prev) => [...prev, comment]);
+        setViewMode('meta');
+      });
       setMetaComments(result.comments);
       setViewMode('meta');
     } catch {
@@ -122,6 +126,8 @@ export default function DocumentDetailPage() {
     setShowPersonaPanel(false);
     setCurrentReviewId(null);
     setViewMode('individual'); // Show individual during streaming
+    // Meta findings streamed after the review replace any speculative preview
+    let finalMeta: MetaComment[] = [];
 
     abortRef.current = startReviewStream(
       docId,
@@ -140,21 +146,40 @@ export default function DocumentDetailPage() {
           });
         }
         if (event.type === 'comment' && event.comment) {
-          setComments((prev) => [...prev, event.comment!]);
+          setComments((prev) => [...prev, event.comment as Comment]);
+        }
+        if (event.type === 'meta_preview' && event.comments) {
+          setMetaComments(event.comments);
+        }
+        if (event.type === 'meta_comment' && event.comment) {
+          finalMeta = [...finalMeta, event.comment as MetaComment];
+          setMetaComments(finalMeta);
+          setViewMode('meta');
+        }
+        if (event.type === 'meta_verdict') {
+          setMetaComments(finalMeta);
+          setViewMode('meta');
+          setIsSynthesizing(false);
         }
         if (event.type === 'done') {
           setIsReviewing(false);
-          // Auto-trigger meta synthesis
           if (event.review_id) {
             setCurrentReviewId(event.review_id);
-            triggerMetaSynthesis(event.review_id);
+            if (event.auto_meta) {
+              // The server synthesizes the meta review on this same stream
+              setIsSynthesizing(true);
+            } else {
+              triggerMetaSynthesis(event.review_id);
+            }
           }
         }
       },
       (err) => {
         setError(err.message);
         setIsReviewing(false);
-      }
+        setIsSynthesizing(false);
+      },
+      true,
     );
   };
 
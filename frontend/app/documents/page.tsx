@@ -5,12 +5,14 @@ import Link from 'next/link';
 import { useRouter } from 'next/navigation';
 import {
   fetchDocuments, uploadFile, archiveDocument, restoreDocument, deleteDocument,
-  type Document,
+  type DocumentSummary,
 } from '@/lib/api';
 
 export default function DocumentsPage() {
-  const [documents, setDocuments] = useState<Document[]>([]);
+  const [documents, setDocuments] = useState<DocumentSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showArchived, setShowArchived] = useState(false);
   const [selectedIds, setSelectedIds] = useState<Set<string>>(new Set());
   const [bulkAction, setBulkAction] = useState(false);
@@ -19,11 +21,26 @@ export default function DocumentsPage() {
   const loadDocs = () => {
     setLoading(true);
     fetchDocuments(showArchived)
-      .then(setDocuments)
+      .then((page) => {
+        setDocuments(page.items);
+        setNextCursor(page.next_cursor);
+      })
       .catch(console.error)
       .finally(() => setLoading(false));
   };
 
+  const loadMore = () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    fetchDocuments(showArchived, nextCursor)
+      .then((page) => {
+        setDocuments((docs) => [...docs, ...page.items]);
+        setNextCursor(page.next_cursor);
+      })
+      .catch(console.error)
+      .finally(() => setLoadingMore(false));
+  };
+
   useEffect(() => {
     loadDocs();
   }, [showArchived]);
@@ -270,6 +287,15 @@ export default function DocumentsPage() {
                 </div>
               </div>
             ))}
+            {nextCursor && (
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="w-full py-3 text-sm text-neutral-400 hover:text-white disabled:opacity-50 transition-colors touch-manipulation"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            )}
           </div>
         )}
       </div>
@@ -35,17 +35,30 @@ async function throwApiError(res: Response, fallback: string): Promise<never> {
 
 // ---------- Interfaces ----------
 
-export interface Document {
+/** One page of a listing; pass `next_cursor` back to get the next page (null on the last one). */
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+/** A document as listed: everything but the body, which only comes from `/{id}/content`. */
+export interface DocumentSummary {
   id: string;
   title: string;
   description?: string;
-  content: string;
+  content_length: number;
+  line_count: number;
+  content_hash: string;
   is_archived: boolean;
   created_at: string;
   updated_at: string;
   review_count: number;
 }
 
+export interface Document extends DocumentSummary {
+  content: string;
+}
+
 export interface Persona {
   id: string;
   name: string;
@@ -109,17 +122,25 @@ export interface MetaReview {
   confidence: number;
 }
 
-export async function fetchDocuments(includeArchived = false): Promise<Document[]> {
-  const params = includeArchived ? '?include_archived=true' : '';
-  const res = await fetch(`${API_BASE_URL}/api/v1/documents/${params}`);
+export async function fetchDocuments(includeArchived = false, cursor?: string): Promise<Page<DocumentSummary>> {
+  const params = new URLSearchParams();
+  if (includeArchived) params.set('include_archived', 'true');
+  if (cursor) params.set('cursor', cursor);
+  const query = params.toString() ? `?${params}` : '';
+  const res = await fetch(`${API_BASE_URL}/api/v1/documents/${query}`);
   if (!res.ok) await throwApiError(res, 'Failed to fetch documents');
   return res.json();
 }
 
 export async function fetchDocument(id: string): Promise<Document> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/documents/${id}`);
-  if (!res.ok) await throwApiError(res, 'Failed to fetch document');
-  return res.json();
+  const [summaryRes, contentRes] = await Promise.all([
+    fetch(`${API_BASE_URL}/api/v1/documents/${id}`),
+    fetch(`${API_BASE_URL}/api/v1/documents/${id}/content`),
+  ]);
+  if (!summaryRes.ok) await throwApiError(summaryRes, 'Failed to fetch document');
+  if (!contentRes.ok) await throwApiError(contentRes, 'Failed to fetch document');
+  const { content } = await contentRes.json();
+  return { ...(await summaryRes.json()), content };
 }
 
 export async function fetchPersonas(): Promise<Persona[]> {
@@ -159,8 +180,9 @@ export async function uploadRaw(content: string, title?: string): Promise<{ docu
   return res.json();
 }
 
-export async function fetchReviews(docId: string): Promise<ReviewSummary[]> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/reviews/${docId}/reviews`);
+export async function fetchReviews(docId: string, cursor?: string): Promise<Page<ReviewSummary>> {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  const res = await fetch(`${API_BASE_URL}/api/v1/reviews/${docId}/reviews${query}`);
   if (!res.ok) await throwApiError(res, 'Failed to fetch reviews');
   return res.json();
 }
@@ -171,21 +193,72 @@ export async function fetchLatestComments(docId: string): Promise<Comment[]> {
   return res.json();
 }
 
-export async function synthesizeMetaReview(docId: string, reviewId: string): Promise<MetaReview> {
-  const res = await fetch(`${API_BASE_URL}/api/v1/reviews/${docId}/reviews/${reviewId}/meta`, {
+export async function synthesizeMetaReview(docId: string, reviewId: string, force = false): Promise<MetaReview> {
+  // Results are shared across reviews with the same comments; force recomputes
+  const query = force ? '?force=true' : '';
+  const res = await fetch(`${API_BASE_URL}/api/v1/reviews/${docId}/reviews/${reviewId}/meta${query}`, {
     method: 'POST',
   });
   if (!res.ok) await throwApiError(res, 'Failed to synthesize meta review');
   return res.json();
 }
 
+export async function streamMetaReview(
+  docId: string,
+  reviewId: string,
+  onComment: (comment: MetaComment) => void,
+  force = false,
+): Promise<MetaReview> {
+  // Findings arrive one at a time while the synthesis is still being written;
+  // the verdict comes last, once every finding is known.
+  const query = force ? '?force=true' : '';
+  const res = await fetch(`${API_BASE_URL}/api/v1/reviews/${docId}/reviews/${reviewId}/meta/stream${query}`, {
+    method: 'POST',
+  });
+  if (!res.ok) await throwApiError(res, 'Failed to synthesize meta review');
+
+  const reader = res.body?.getReader();
+  const decoder = new TextDecoder();
+  if (!reader) throw new Error('No response body');
+
+  const comments: MetaComment[] = [];
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() || '';
+
+    for (const line of lines) {
+      if (!line.startsWith('data: ')) continue;
+      let data;
+      try {
+        data = JSON.parse(line.slice(6));
+      } catch {
+        continue; // skip malformed SSE lines
+      }
+      if (data.type === 'meta_comment') {
+        comments.push(data.comment);
+        onComment(data.comment);
+      } else if (data.type === 'meta_verdict') {
+        return { comments, verdict: data.verdict, confidence: data.confidence };
+      } else if (data.type === 'error') {
+        throw new VosApiError(502, data.error || 'stream_error', data.detail || 'Meta review stream encountered an error');
+      }
+    }
+  }
+  throw new Error('Meta review stream ended before the verdict');
+}
+
 export async function fetchMetaComments(docId: string, reviewId: string): Promise<MetaReview> {
   const res = await fetch(`${API_BASE_URL}/api/v1/reviews/${docId}/reviews/${reviewId}/meta`);
   if (!res.ok) return { comments: [], verdict: 'ship_it', confidence: 0 };
   return res.json();
 }
 
-export async function archiveDocument(docId: string): Promise<Document> {
+export async function archiveDocument(docId: string): Promise<DocumentSummary> {
   const res = await fetch(`${API_BASE_URL}/api/v1/documents/${docId}/archive`, {
     method: 'POST',
   });
@@ -193,7 +266,7 @@ export async function archiveDocument(docId: string): Promise<Document> {
   return res.json();
 }
 
-export async function restoreDocument(docId: string): Promise<Document> {
+export async function restoreDocument(docId: string): Promise<DocumentSummary> {
   const res = await fetch(`${API_BASE_URL}/api/v1/documents/${docId}/restore`, {
     method: 'POST',
   });
@@ -208,6 +281,15 @@ export async function deleteDocument(docId: string): Promise<void> {
   if (!res.ok) await throwApiError(res, 'Failed to delete document');
 }
 
+async function resumeJobStream(jobId: string, lastEventId: number, signal: AbortSignal): Promise<Response> {
+  const res = await fetch(`${API_BASE_URL}/api/v1/jobs/${jobId}/events`, {
+    headers: { 'Last-Event-ID': String(lastEventId) },
+    signal,
+  });
+  if (!res.ok) await throwApiError(res, 'Failed to resume review stream');
+  return res;
+}
+
 export function startReviewStream(
   docId: string,
   personaIds: string[],
@@ -217,59 +299,90 @@ export function startReviewStream(
     persona_name?: string;
     persona_color?: string;
     status?: string;
-    comment?: Comment;
+    comment?: Comment | MetaComment;  // MetaComment on meta_comment events
+    comments?: MetaComment[];  // meta_preview
     total_comments?: number;
     review_id?: string;
+    auto_meta?: boolean;
+    verdict?: MetaReview['verdict'];
+    confidence?: number;
     error?: string;
     detail?: string;
   }) => void,
   onError: (err: Error) => void,
+  autoMeta = false,
 ): AbortController {
   const controller = new AbortController();
+  // The review runs as a server-side job; if the stream drops we resume it
+  // from the last event id instead of starting a new review.
+  let jobId: string | null = null;
+  let lastEventId = 0;
+  let finished = false;
+
+  const consume = async (res: Response) => {
+    const reader = res.body?.getReader();
+    const decoder = new TextDecoder();
+    if (!reader) throw new Error('No response body');
+
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop() || '';
+
+      for (const line of lines) {
+        if (line.startsWith('id: ')) {
+          lastEventId = Number(line.slice(4)) || lastEventId;
+        } else if (line.startsWith('data: ')) {
+          try {
+            const data = JSON.parse(line.slice(6));
+            if (data.type === 'job') {
+              jobId = data.job_id;
+            } else if (data.type === 'error') {
+              // Surface SSE error events as proper errors
+              finished = true;
+              onError(new VosApiError(
+                502,
+                data.error || 'stream_error',
+                data.detail || 'Review stream encountered an error',
+              ));
+            } else {
+              // With auto meta the job keeps streaming the meta review after done
+              if (data.type === 'done' && !data.auto_meta) finished = true;
+              if (data.type === 'meta_verdict') finished = true;
+              onEvent(data);
+            }
+          } catch {
+            // skip malformed SSE lines
+          }
+        }
+      }
+    }
+  };
 
   (async () => {
     try {
       const res = await fetch(`${API_BASE_URL}/api/v1/reviews/${docId}/review`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ persona_ids: personaIds }),
+        body: JSON.stringify({ persona_ids: personaIds, auto_meta: autoMeta }),
         signal: controller.signal,
       });
 
       if (!res.ok) await throwApiError(res, 'Failed to start review');
 
-      const reader = res.body?.getReader();
-      const decoder = new TextDecoder();
-      if (!reader) throw new Error('No response body');
-
-      let buffer = '';
-      while (true) {
-        const { done, value } = await reader.read();
-        if (done) break;
-
-        buffer += decoder.decode(value, { stream: true });
-        const lines = buffer.split('\n');
-        buffer = lines.pop() || '';
-
-        for (const line of lines) {
-          if (line.startsWith('data: ')) {
-            try {
-              const data = JSON.parse(line.slice(6));
-              // Surface SSE error events as proper errors
-              if (data.type === 'error') {
-                onError(new VosApiError(
-                  502,
-                  data.error || 'stream_error',
-                  data.detail || 'Review stream encountered an error',
-                ));
-              } else {
-                onEvent(data);
-              }
-            } catch {
-              // skip malformed SSE lines
-            }
-          }
+      for (let attempt = 0; ; attempt++) {
+        try {
+          await consume(attempt === 0 ? res : await resumeJobStream(jobId!, lastEventId, controller.signal));
+          if (finished || !jobId) break;
+        } catch (err) {
+          if (!jobId || controller.signal.aborted || attempt >= 3) throw err;
         }
+        if (attempt >= 3) throw new Error('Review stream ended before the review finished');
+        await new Promise((resolve) => setTimeout(resolve, 1000 * (attempt + 1)));
       }
     } catch (err) {
       if (err instanceof Error && err.name !== 'AbortError') {